@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Lower
+
+
+UserModel = get_user_model()
+
+
+class EmailOrUsernameBackend(ModelBackend):
+    """
+    Authenticate with a username or an email address, case-insensitively.
+
+    The account is resolved in a single query on LOWER(email) or
+    LOWER(username), which the functional indexes on core.User serve.
+    Usernames may contain '@', so an identifier is matched against both.
+    """
+
+    def get_candidates(self, identifier):
+        lowered = identifier.lower()
+        email, username = Q(lookup_email=lowered), Q(lookup_username=lowered)
+        # An identifier with '@' names an email first, a username second.
+        preferred = email if '@' in identifier else username
+        # Emails are not unique and usernames are unique only case-sensitively;
+        # prefer the expected kind of match, then an exact one, then the oldest account.
+        return UserModel._default_manager.alias(
+            lookup_email=Lower('email'),
+            lookup_username=Lower(UserModel.USERNAME_FIELD),
+            kind=Case(When(preferred, then=Value(0)), default=Value(1)),
+            exact=Case(
+                When(Q(email=identifier) | Q(**{UserModel.USERNAME_FIELD: identifier}), then=Value(0)),
+                default=Value(1),
+            ),
+        ).filter(email | username).order_by('kind', 'exact', 'date_joined')[:2]
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        candidates = list(self.get_candidates(username.strip()))
+        if not candidates:
+            # Run the hasher anyway so unknown accounts take as long as wrong passwords.
+            UserModel().set_password(password)
+            return None
+        for user in candidates:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
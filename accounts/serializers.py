@@ -1,5 +1,18 @@
 from rest_framework import serializers
+from rest_framework_simplejwt import serializers as jwt_serializers
 from core.models import User
+from core.roster import check_invite_token
+from .tokens import RefreshToken
+
+
+def validate_password_strength(value):
+    if not any(char.isupper() for char in value):
+        raise serializers.ValidationError("Password must contain at least one uppercase letter.")
+    if not any(char.islower() for char in value):
+        raise serializers.ValidationError("Password must contain at least one lowercase letter.")
+    if not any(char.isdigit() for char in value):
+        raise serializers.ValidationError("Password must contain at least one digit.")
+    return value
 
 
 class ParentRegisterSerializer(serializers.ModelSerializer):
@@ -17,13 +30,7 @@ class ParentRegisterSerializer(serializers.ModelSerializer):
 
     def validate_password(self, value):
         """Validate password strength"""
-        if not any(char.isupper() for char in value):
-            raise serializers.ValidationError("Password must contain at least one uppercase letter.")
-        if not any(char.islower() for char in value):
-            raise serializers.ValidationError("Password must contain at least one lowercase letter.")
-        if not any(char.isdigit() for char in value):
-            raise serializers.ValidationError("Password must contain at least one digit.")
-        return value
+        return validate_password_strength(value)
 
     def validate(self, data):
         """Validate fields and derive username if omitted"""
@@ -90,3 +97,27 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['user_id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone']
         read_only_fields = ['user_id', 'username']
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Refresh with the Bloom-filtered blacklist check"""
+    token_class = RefreshToken
+
+
+class AcceptInviteSerializer(serializers.Serializer):
+    """Body of /api/auth/invite/accept/: an invite token from a roster import and a first password"""
+    token = serializers.CharField()
+    password = serializers.CharField(write_only=True, min_length=8)
+    confirm_password = serializers.CharField(write_only=True, min_length=8)
+
+    def validate_password(self, value):
+        return validate_password_strength(value)
+
+    def validate(self, data):
+        if data['password'] != data['confirm_password']:
+            raise serializers.ValidationError({"password": "Passwords do not match."})
+        user = check_invite_token(data['token'])
+        if user is None:
+            raise serializers.ValidationError({"token": "This invite is invalid, expired or already used."})
+        data['user'] = user
+        return data
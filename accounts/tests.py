@@ -1,3 +1,109 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.exceptions import TokenError
+
+from accounts.tokens import BlacklistFilter, RefreshToken
+from core.tests.base import APITestCase, make_user
+
+
+class LoginLockoutTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        make_user('maria', email='maria@example.com')
+
+    def login(self, username, password):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password})
+
+    def test_failures_lock_out_the_identifier(self):
+        for _ in range(5):
+            self.assertEqual(self.login('maria', 'wrong').status_code, 401)
+        # Locked out however it is capitalised, even with the right password.
+        self.assertEqual(self.login('MARIA', 'Secret123').status_code, 429)
+
+    def test_success_clears_the_count(self):
+        for _ in range(4):
+            self.login('maria', 'wrong')
+        self.assertEqual(self.login('maria', 'Secret123').status_code, 200)
+        for _ in range(4):
+            self.assertEqual(self.login('maria', 'wrong').status_code, 401)
+        self.assertEqual(self.login('maria', 'Secret123').status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EmailOrUsernameBackendTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.maria = make_user('maria', email='Maria.Cruz@example.com')
+        self.at_name = make_user('rosa@home', email='rosa@example.com')
+
+    def login(self, identifier):
+        with CaptureQueriesContext(connection) as captured:
+            user = authenticate(username=identifier, password='Secret123')
+        self.assertEqual(len(captured), 1, [query['sql'] for query in captured])
+        return user
+
+    def test_email_or_username_in_any_case(self):
+        self.assertEqual(self.login('maria'), self.maria)
+        self.assertEqual(self.login('MARIA'), self.maria)
+        self.assertEqual(self.login('maria.cruz@example.com'), self.maria)
+        self.assertEqual(self.login(' MARIA.CRUZ@EXAMPLE.COM '), self.maria)
+        self.assertIsNone(self.login('nobody@example.com'))
+
+    def test_a_username_with_an_at_sign(self):
+        self.assertEqual(self.login('rosa@home'), self.at_name)
+        self.assertEqual(self.login('Rosa@Home'), self.at_name)
+        self.assertEqual(self.login('rosa@example.com'), self.at_name)
+
+    def test_an_email_match_comes_before_a_username_match(self):
+        # Another account, with the same password, whose username is maria's email.
+        make_user('maria.cruz@example.com', email='other@example.com')
+        self.assertEqual(self.login('maria.cruz@example.com'), self.maria)
+
+
+class BlacklistFilterTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('maria')
+
+    def shared_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location, ignore_errors=True)
+        return override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }})
+
+    def test_processes_learn_of_each_others_blacklisted_tokens(self):
+        # Two filters stand in for two worker processes sharing one cache.
+        with self.shared_cache():
+            first, second = BlacklistFilter(), BlacklistFilter()
+            token = RefreshToken.for_user(self.user)
+            jti = token['jti']
+            self.assertFalse(first.might_contain(jti))
+
+            token.blacklist()
+            second.record(jti)  # what the other process does after commit
+            self.assertTrue(first.might_contain(jti))
+
+            first.new_epoch()  # compact_expired: rebuild from the database
+            self.assertTrue(BlacklistFilter().might_contain(jti))
+
+    def test_a_per_process_cache_always_asks_the_database(self):
+        token = RefreshToken.for_user(self.user)
+        self.assertTrue(BlacklistFilter().might_contain(token['jti']))
+
+        token.blacklist()  # in a test transaction, so nothing is recorded in the log
+        with self.assertRaises(TokenError):
+            RefreshToken(str(token))
+
+    def test_refresh_rotation_refuses_the_old_token(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/auth/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 401)
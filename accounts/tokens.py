@@ -0,0 +1,144 @@
+"""
+Refresh tokens whose blacklist check usually skips the database.
+
+Every process keeps a Bloom filter of blacklisted JTIs. A miss proves the
+token is not blacklisted, so only probable hits (and false positives) run the
+usual `BlacklistedToken` query. Bloom filters must never miss a real entry,
+so each blacklist write is also appended to a short log in the shared cache;
+before each check a process replays the entries it has not seen. It rebuilds
+from the database on first use, when the log has been evicted past its
+position, or when `compact_expired` starts a new epoch.
+
+The log only reaches other processes through a shared cache. With a
+per-process cache (LocMemCache, DummyCache; see core.cache.is_shared) a
+process would never learn of tokens blacklisted elsewhere, so the filter
+is bypassed and every check queries the database.
+"""
+import hashlib
+import math
+import threading
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from core.cache import is_shared
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on blake2b)."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(value))
+
+
+class BlacklistFilter:
+    """Process-local Bloom filter kept in sync through a shared cache log."""
+    SEQUENCE_KEY = 'jwt-blacklist:sequence'
+    EPOCH_KEY = 'jwt-blacklist:epoch'
+    ENTRY_KEY = 'jwt-blacklist:entry:{}'
+    LOG_TIMEOUT = 86400
+    MIN_CAPACITY = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._sequence = 0
+        self._epoch = None
+
+    def _shared_state(self):
+        state = cache.get_many([self.SEQUENCE_KEY, self.EPOCH_KEY])
+        return state.get(self.SEQUENCE_KEY, 0), state.get(self.EPOCH_KEY)
+
+    def rebuild(self):
+        """Load the JTIs of unexpired blacklisted tokens."""
+        sequence, epoch = self._shared_state()
+        jtis = BlacklistedToken.objects.filter(
+            token__expires_at__gt=timezone.now()
+        ).values_list('token__jti', flat=True)
+        bloom = BloomFilter(max(jtis.count() * 2, self.MIN_CAPACITY))
+        for jti in jtis.iterator(chunk_size=5000):
+            bloom.add(jti)
+        # Entries logged while scanning are replayed by the next sync().
+        self._filter, self._sequence, self._epoch = bloom, sequence, epoch
+
+    def sync(self):
+        sequence, epoch = self._shared_state()
+        if self._filter is None or epoch != self._epoch or sequence < self._sequence:
+            self.rebuild()
+            return
+        if sequence == self._sequence:
+            return
+
+        wanted = [self.ENTRY_KEY.format(n) for n in range(self._sequence + 1, sequence + 1)]
+        entries = cache.get_many(wanted)
+        if len(entries) < len(wanted):
+            # Part of the log was evicted; the database is authoritative.
+            self.rebuild()
+            return
+        for jti in entries.values():
+            self._filter.add(jti)
+        self._sequence = sequence
+
+    def might_contain(self, jti):
+        """False only if `jti` is certainly not blacklisted."""
+        if not is_shared():
+            return True  # other processes' log entries never reach this one
+        with self._lock:
+            self.sync()
+            return jti in self._filter
+
+    def record(self, jti):
+        """Publish a newly blacklisted JTI to every process."""
+        cache.add(self.SEQUENCE_KEY, 0, None)
+        sequence = cache.incr(self.SEQUENCE_KEY)
+        cache.set(self.ENTRY_KEY.format(sequence), jti, self.LOG_TIMEOUT)
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+    def new_epoch(self):
+        """Force every process to rebuild, e.g. after expired rows are deleted."""
+        cache.set(self.EPOCH_KEY, timezone.now().isoformat(), None)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+@receiver(post_save, sender=BlacklistedToken, dispatch_uid='jwt-blacklist-filter')
+def record_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        # After commit, so a process rebuilding from the database meanwhile
+        # either sees the row or finds the log entry missing and rebuilds again.
+        jti = instance.token.jti
+        transaction.on_commit(lambda: blacklist_filter.record(jti))
+
+
+class RefreshToken(tokens.RefreshToken):
+    """simplejwt's RefreshToken with a Bloom filter in front of the blacklist query."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if blacklist_filter.might_contain(jti):
+            super().check_blacklist()
@@ -1,10 +1,13 @@
 from django.urls import path
+from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
 
 
 urlpatterns = [
     path('register/', views.register_parent, name='register_parent'),
     path('login/', views.login_view, name='login'),
+    path('invite/accept/', views.accept_invite, name='accept_invite'),
     path('logout/', views.logout_view, name='logout'),
+    path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('me/', views.user_info_view, name='user_info'),
 ]
@@ -1,15 +1,28 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.exceptions import Throttled
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.contrib.auth import authenticate
-from core.models import User
-from rest_framework_simplejwt.tokens import RefreshToken
-from .serializers import ParentRegisterSerializer, UserSerializer
+from django.utils import timezone
+from core.throttling import AuthRateThrottle, SlidingWindow, parse_rate
+from .serializers import AcceptInviteSerializer, ParentRegisterSerializer, UserSerializer
+from .tokens import RefreshToken
+
+
+# Per-identifier limits, on top of the per-client AuthRateThrottle
+LOGIN_FAILURES = SlidingWindow('login-failures', *parse_rate(settings.LOGIN_LOCKOUT_RATE))
+REGISTRATIONS = SlidingWindow('registrations', *parse_rate(settings.REGISTRATION_RATE))
+
+
+def _identifier(value):
+    return str(value or '').strip().lower()
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthRateThrottle])
 def register_parent(request):
     """
     Register a new parent account
@@ -28,6 +41,12 @@ def register_parent(request):
         "user": {user_data}
     }
     """
+    email = _identifier(request.data.get('email'))
+    if email:
+        wait = REGISTRATIONS.attempt(email)
+        if wait:
+            raise Throttled(wait=wait)
+
     serializer = ParentRegisterSerializer(data=request.data)
     
     if serializer.is_valid():
@@ -55,11 +74,13 @@ def register_parent(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthRateThrottle])
 def login_view(request):
     """
     Custom login endpoint that returns JWT token pair and user data.
     Expects: {"username": "...", "password": "..."}  # username OR email accepted
     Returns: {"access": "...", "refresh": "...", "user": {...}}
+    Repeated failures for one username/email lock it out (429) for a while.
     """
     identifier = request.data.get('username')
     password = request.data.get('password')
@@ -70,22 +91,23 @@ def login_view(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Allow login with email or username
-    login_username = identifier
-    if '@' in identifier:
-        try:
-            user_obj = User.objects.get(email__iexact=identifier)
-            login_username = user_obj.username
-        except User.DoesNotExist:
-            login_username = identifier  # fall back; will fail authenticate
-    
-    user = authenticate(username=login_username, password=password)
+    # Lock out the identifier, however it is capitalised. Every attempt
+    # counts up front, so concurrent guesses cannot pass the check together;
+    # a successful login clears the count.
+    lockout_key = _identifier(identifier)
+    wait = LOGIN_FAILURES.attempt(lockout_key)
+    if wait:
+        raise Throttled(wait=wait, detail='Too many failed login attempts. Try again later.')
+
+    # Username or email, resolved in one query (accounts.backends)
+    user = authenticate(request, username=identifier, password=password)
     if not user:
         return Response(
             {'error': 'Invalid credentials'}, 
             status=status.HTTP_401_UNAUTHORIZED
         )
     
+    LOGIN_FAILURES.reset(lockout_key)
     refresh = RefreshToken.for_user(user)
     access_token = str(refresh.access_token)
     refresh_token = str(refresh)
@@ -104,6 +126,46 @@ def login_view(request):
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([AuthRateThrottle])
+def accept_invite(request):
+    """
+    Set the first password of an account created by a roster import.
+    Expects: {"token": "...", "password": "...", "confirm_password": "..."}
+    Returns: {"access": "...", "refresh": "...", "user": {...}} like login.
+    """
+    serializer = AcceptInviteSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    user = serializer.validated_data['user']
+    invited_password = user.password
+    user.set_password(serializer.validated_data['password'])
+    # Only if the invite is still unused: two requests racing with one token
+    # cannot both set a password.
+    updated = type(user).objects.filter(pk=user.pk, password=invited_password).update(
+        password=user.password, updated_at=timezone.now(),
+    )
+    if not updated:
+        return Response({'token': ['This invite is invalid, expired or already used.']},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    refresh = RefreshToken.for_user(user)
+    return Response({
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+        'user': {
+            'user_id': str(user.user_id),
+            'username': user.username,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'role': user.role,
+        }
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
@@ -0,0 +1,61 @@
+"""
+Gunicorn configuration for production (see Procfile):
+
+    gunicorn -c python:ara.gunicorn_conf ara.asgi:application
+
+The master runs the cache deployment checks first and refuses to start on
+an error (core.E001: a per-process cache).
+
+The master loads the application once (preload_app) and forks the workers
+from it, so a worker can serve as soon as it is forked. Workers share the
+master's memory copy-on-write, instead of each importing Django, DRF,
+drf_spectacular and the project itself. Before forking, the master:
+
+- builds what requests would otherwise build lazily in every worker:
+  URL resolvers, translations and model metadata (core.warmup);
+- closes its database connections and pools, which must not cross a fork
+  (core.dbpool);
+- moves every object it holds into the garbage collector's permanent
+  generation (gc.freeze()). A collection in a worker then never writes to
+  those objects, which would copy the pages they live on into the worker.
+
+Garbage collection stays off in the master, so it does not leave freed
+gaps in the pages the workers share. Each worker turns it back on and
+starts filling its connection pools as soon as it is forked.
+
+Workers (WEB_CONCURRENCY) and the bind address (PORT) keep gunicorn's
+defaults. `manage.py bench_startup` measures startup time, first-request
+latency and memory with and without this configuration.
+"""
+import gc
+
+
+worker_class = 'uvicorn_worker.UvicornWorker'
+preload_app = True
+
+gc.disable()
+
+
+def when_ready(server):
+    from django.core import checks
+    from core.warmup import warm_up
+
+    messages = checks.run_checks(tags=[checks.Tags.caches], include_deployment_checks=True)
+    errors = [message for message in messages if message.is_serious()]
+    if errors:
+        raise RuntimeError('Deployment checks failed:\n' + '\n'.join(map(str, errors)))
+    warm_up()
+
+
+def pre_fork(server, worker):
+    from core.dbpool import close_pools
+
+    close_pools()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from core.dbpool import open_pools
+
+    gc.enable()
+    open_pools()
@@ -28,6 +28,9 @@ ALLOWED_HOSTS = [
 ]
 
 ## Local Postgres vs Heroku
+# Seconds a connection is kept open for reuse when it is not pooled
+# (DATABASE_POOL=False, or a database other than PostgreSQL).
+DATABASE_CONN_MAX_AGE = int(os.getenv('DATABASE_CONN_MAX_AGE', '600'))
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -36,7 +39,8 @@ DATABASES = {
         'PASSWORD': 'postgrace',
         'HOST': 'localhost',
         'PORT': '5432',
-        'CONN_MAX_AGE': 600,
+        # Pooled by default (DATABASE_POOL below), which sets this to 0.
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
         'OPTIONS': {'connect_timeout': 10},
     }
 }
@@ -44,7 +48,7 @@ DATABASES = {
 # Override with Heroku's DATABASE_URL if present (production)
 if os.environ.get('DATABASE_URL'):
     DATABASES['default'] = dj_database_url.config(
-        conn_max_age=600,
+        conn_max_age=DATABASE_CONN_MAX_AGE,
         conn_health_checks=True
     )
 
@@ -72,7 +76,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "core.static.WhiteNoiseMiddleware",  # async-capable WhiteNoise
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -81,6 +85,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.admission.AdmissionControlMiddleware',
+    'core.admission.StatementTimeoutMiddleware',
 ]
 
 ROOT_URLCONF = 'ara.urls'
@@ -132,6 +138,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom user model
 AUTH_USER_MODEL = 'core.User'
 
+# Username or email, case-insensitive, one query per login
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.EmailOrUsernameBackend',
+]
+
 # REST FRAMEWORK CONFIGURATION
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -140,7 +151,8 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # Opt into count-free pages with ?count=none|estimate|cached
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.OptionalCountPagination',
     'PAGE_SIZE': 50,
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -149,16 +161,30 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.MessagePackRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.ORJSONParser',
+        'core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Browsable API only in DEBUG or for staff (see core.negotiation)
+    'DEFAULT_CONTENT_NEGOTIATION_CLASS': 'core.negotiation.StaffBrowsableAPINegotiation',
+    # Sliding windows in the shared cache (see core.throttling)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'core.throttling.AnonSlidingWindowThrottle',
+        'core.throttling.UserSlidingWindowThrottle',
+        'core.throttling.ScopedSlidingWindowThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
-        'user': '1000/hour'
+        'user': '1000/hour',
+        'auth': '30/10m',
+        'exports': '30/hour',
+        'bulk': '60/hour',
     },
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
     # for development, you might want to enable the browsable API
@@ -267,12 +293,124 @@ CACHES = {
         'LOCATION': 'unique-snowflake',
     }
 }
+# Rate limits, lockouts and cache versions must be shared by every worker;
+# LocMemCache is per process and only suitable for development: `check --deploy`
+# reports it (core.E001) and gunicorn (ara/gunicorn_conf.py) refuses to start.
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# Failed logins per username/email before further attempts are refused,
+# and registration attempts per email address (see accounts.views)
+LOGIN_LOCKOUT_RATE = '5/15m'
+REGISTRATION_RATE = '5/h'
+
+# Lifetime of serialized detail fragments (core.cache); versions never expire
+FRAGMENT_CACHE_TIMEOUT = 3600
 
 # SESSION CONFIGURATION
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# SESSION_BACKEND: 'cached_db' (default; reads hit the cache, writes go through
+# to django_session), 'signed_cookies' (no server-side storage) or 'db'.
+# Expired rows are removed by `manage.py compact_expired`.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_BACKENDS[os.getenv('SESSION_BACKEND', 'cached_db')]
 SESSION_COOKIE_AGE = 1209600  # 2 weeks
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
+# STATUS EVENTS (Server-Sent Events at /api/events/, served under ASGI)
+# EVENTS_BROKER: 'postgres' fans events out with LISTEN/NOTIFY across workers;
+# 'local' only reaches subscribers in the publishing process (development).
+# Unset picks 'postgres' on PostgreSQL and 'local' otherwise.
+EVENTS_BROKER = os.getenv('EVENTS_BROKER')
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 3000
+SSE_QUEUE_SIZE = 100  # events buffered per client before it is disconnected
+SSE_TICKET_SECONDS = 60  # lifetime of a single-use /api/events/?ticket=
+
+# BACKGROUND JOBS (manage.py run_workers, see core.jobs)
+JOB_WORKER_PROCESSES = int(os.getenv('JOB_WORKER_PROCESSES', '2'))
+JOB_HEARTBEAT_INTERVAL = 30  # seconds between renewals of a running job's lock
+JOB_LOCK_TIMEOUT = 120  # seconds without a renewal before a running job is presumed orphaned
+JOB_REAP_INTERVAL = 60
+
+# AI GENERATION (see core.generation)
+# AI_GENERATOR: dotted path of the generator class; the stub is deterministic
+# and local, for development and tests.
+AI_GENERATOR = os.getenv('AI_GENERATOR', 'core.generation.StubGenerator')
+AI_GENERATION_MAX_REQUESTS = 50  # per /api/ai-generation-logs/generate/ call
+
+# READ REPLICAS (see core.replicas)
+# DATABASE_REPLICA_URLS: comma-separated URLs of streaming replicas of the
+# default database. Safe-method requests read from them unless the client
+# wrote within REPLICA_STICKY_SECONDS or the replica is more than
+# REPLICA_MAX_LAG seconds behind.
+# Read-your-writes pins live in the cache, which must then be shared (REDIS_URL).
+REPLICA_STICKY_SECONDS = 10
+REPLICA_MAX_LAG = 5  # seconds
+REPLICA_LAG_CHECK_INTERVAL = 5  # seconds between lag checks of a replica, per process
+# Seconds to wait for a replica connection (connect_timeout, and the pool's
+# wait for a free connection) before the replica is skipped.
+REPLICA_CONNECT_TIMEOUT = 2
+DATABASE_REPLICAS = []
+for _url in filter(None, (u.strip() for u in os.getenv('DATABASE_REPLICA_URLS', '').split(','))):
+    _alias = f'replica{len(DATABASE_REPLICAS) + 1}'
+    DATABASES[_alias] = dj_database_url.parse(_url, conn_max_age=DATABASE_CONN_MAX_AGE, conn_health_checks=True)
+    DATABASES[_alias].setdefault('OPTIONS', {}).setdefault('connect_timeout', REPLICA_CONNECT_TIMEOUT)
+    DATABASES[_alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(_alias)
+if DATABASE_REPLICAS:
+    DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+    MIDDLEWARE.append('core.replicas.ReplicaMiddleware')
+
+# CONNECTION POOLING (psycopg 3, see core.dbpool)
+# Every PostgreSQL alias is pooled, per process, unless DATABASE_POOL=False;
+# without the pool, connections persist for DATABASE_CONN_MAX_AGE instead.
+# pool_min_size, pool_max_size, pool_timeout, ... query parameters on
+# DATABASE_URL or DATABASE_REPLICA_URLS override DATABASE_POOL_OPTIONS for
+# that database (and turn pooling on for it).
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'True') == 'True'
+DATABASE_POOL_OPTIONS = {
+    'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+    'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+    'timeout': float(os.getenv('DATABASE_POOL_TIMEOUT', '10')),  # seconds to wait for a free connection
+    'max_idle': 300,  # close connections unused for this long, down to min_size
+    'max_lifetime': 3600,
+}
+# URL query parameters are strings (dj_database_url only converts integers).
+_POOL_OPTION_TYPES = {
+    'min_size': int, 'max_size': int, 'max_waiting': int,
+    'timeout': float, 'max_idle': float, 'max_lifetime': float, 'reconnect_timeout': float,
+}
+for _alias, _db in DATABASES.items():
+    _options = _db.setdefault('OPTIONS', {})
+    _url_pool = {key[len('pool_'):]: _options.pop(key) for key in list(_options) if key.startswith('pool_')}
+    _url_pool = {key: _POOL_OPTION_TYPES.get(key, str)(value) for key, value in _url_pool.items()}
+    if _db['ENGINE'] == 'django.db.backends.postgresql' and (DATABASE_POOL or _url_pool):
+        _replica = {'timeout': REPLICA_CONNECT_TIMEOUT} if _alias in DATABASE_REPLICAS else {}
+        _options['pool'] = {**DATABASE_POOL_OPTIONS, **_replica, **_url_pool}
+        _db['CONN_MAX_AGE'] = 0  # the pool replaces persistent connections
+        _db['CONN_HEALTH_CHECKS'] = True  # check connections as they leave the pool
+
+# STATEMENT TIMEOUTS AND LOAD SHEDDING (see core.admission)
+# Queries of a request are cancelled after the view's statement_timeout
+# budget (`statement_timeout` / `statement_timeouts` on the view), by default
+# STATEMENT_TIMEOUT milliseconds.
+STATEMENT_TIMEOUT = int(os.getenv('STATEMENT_TIMEOUT', '15000'))
+# Concurrent requests per worker process for each expensive class; past the
+# limit a request gets 503 with Retry-After instead of waiting. Classes are the
+# views' throttle scopes, and 'search' for ?search= requests.
+ADMISSION_LIMITS = {'search': 4, 'bulk': 2, 'exports': 2}
+ADMISSION_RETRY_AFTER = 5  # seconds
+
+# ROSTER IMPORT (manage.py import_roster, see core.roster)
+ROSTER_INVITE_MAX_AGE = 14 * 24 * 3600  # seconds an invite token stays valid
+
 # FILE UPLOAD SETTINGS
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -287,7 +425,9 @@ CSRF_TRUSTED_ORIGINS = [
 # SIMPLE JWT CONFIGURATION
 SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.TokenRefreshSerializer',
     'USER_ID_FIELD': 'user_id',
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -1,6 +1,14 @@
-from django.contrib import admin
+import csv
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
 from .models import *
+from .roster import RosterError, import_roster
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -14,6 +22,12 @@ class UserAdmin(admin.ModelAdmin):
     )
 
 
+class RosterImportForm(forms.Form):
+    csv_file = forms.FileField(label='Roster CSV')
+    dry_run = forms.BooleanField(required=False, initial=True,
+                                 help_text='Validate and report without saving anything')
+
+
 @admin.register(Child)
 class ChildAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'date_of_birth', 'age_calculated', 'parent', 'grade_level')
@@ -21,6 +35,39 @@ class ChildAdmin(admin.ModelAdmin):
     search_fields = ('first_name', 'last_name')
     readonly_fields = ('age_calculated',)
 
+    def get_urls(self):
+        return [
+            path('import-roster/', self.admin_site.admin_view(self.import_roster_view),
+                 name='core_child_import_roster'),
+        ] + super().get_urls()
+
+    def import_roster_view(self, request):
+        """Upload a roster CSV (see core.roster); shows the per-row report and any invite tokens"""
+        if not (request.user.has_perm('core.add_child') and request.user.has_perm('core.add_user')):
+            raise PermissionDenied
+        report = invites_csv = None
+        form = RosterImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            stream = io.TextIOWrapper(form.cleaned_data['csv_file'].file, encoding='utf-8-sig', newline='')
+            try:
+                report = import_roster(stream, dry_run=form.cleaned_data['dry_run'])
+            except (RosterError, UnicodeDecodeError) as exc:
+                messages.error(request, f'The file could not be imported: {exc}')
+            else:
+                if report['invites']:
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows((i['email'], i['token']) for i in report['invites'])
+                    invites_csv = buffer.getvalue()
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Import roster',
+            'opts': self.model._meta,
+            'form': form,
+            'report': report,
+            'invites_csv': invites_csv,
+        }
+        return TemplateResponse(request, 'admin/core/child/import_roster.html', context)
+
 
 @admin.register(Assessment)
 class AssessmentAdmin(admin.ModelAdmin):
@@ -69,5 +116,29 @@ admin.site.register(WeeklyGoalsProgress)
 admin.site.register(WeeklyProgressSummary)
 admin.site.register(ProgressReportAggregate)
 admin.site.register(AuditLog)
-admin.site.register(AIGenerationLog)
 admin.site.register(AssessmentRequest)
+admin.site.register(SpecialistAvailability)
+admin.site.register(AvailabilityException)
+admin.site.register(AssessmentBooking)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'status', 'priority', 'run_at', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'dedup_key')
+    readonly_fields = ('created_at', 'updated_at', 'finished_at', 'locked_by', 'locked_at')
+
+
+@admin.register(AIGenerationLog)
+class AIGenerationLogAdmin(admin.ModelAdmin):
+    list_display = ('generation_type', 'ai_model_version', 'confidence_score', 'cache_hit', 'duration_ms',
+                    'human_review_status', 'generated_at')
+    list_filter = ('generation_type', 'cache_hit', 'human_review_status')
+
+
+@admin.register(AIGeneratedContent)
+class AIGeneratedContentAdmin(admin.ModelAdmin):
+    list_display = ('generation_type', 'ai_model_version', 'confidence_score', 'hits', 'created_at', 'last_used_at')
+    list_filter = ('generation_type', 'ai_model_version')
+    search_fields = ('content_hash',)
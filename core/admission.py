@@ -0,0 +1,284 @@
+"""
+Per-request statement timeouts and admission control.
+
+Statement timeouts: every query a request runs on PostgreSQL is bounded by
+a statement_timeout budget in milliseconds. The budget is, in order:
+
+- the view's `statement_timeouts = {'list': 5000, ...}` entry for the action;
+- the view's `statement_timeout` (class attribute or function attribute);
+- settings.STATEMENT_TIMEOUT.
+
+An execute wrapper, installed on each connection as it is created, SETs the
+budget on the connection before the first query of a request and only
+again when it changes. A rollback undoes a SET made inside the transaction,
+so that one is only trusted until the transaction ends or rolls back to a
+savepoint. Code outside a request runs without a budget: a
+connection that a request tuned (pooled, or kept alive) is RESET before it
+is used without one. A query that runs out of budget is cancelled by the
+server, and the request gets a 503 instead of holding the worker.
+
+Admission control: requests of an expensive class are capped per worker
+process by settings.ADMISSION_LIMITS. The class is the view's
+`throttle_scope` ('bulk', 'exports'), or 'search' for a ?search= request to a
+view with SearchFilter. Past the cap, the request is shed with an immediate
+503 and Retry-After rather than queueing behind the slow ones. A slot is
+held until the response body is produced: for a streamed response, until
+its content iterator is exhausted or closed.
+"""
+import contextvars
+import logging
+import threading
+import weakref
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import OperationalError
+from django.db.backends.signals import connection_created
+from django.http import JsonResponse
+from psycopg.pq import TransactionStatus
+from rest_framework import filters
+
+
+logger = logging.getLogger(__name__)
+
+QUERY_CANCELED = '57014'  # SQLSTATE of a query cancelled by statement_timeout
+
+# The statement_timeout budget of the current request: {'timeout': ms}. None outside a request.
+_budget = contextvars.ContextVar('statement_budget', default=None)
+# raw connection -> (statement_timeout last SET on it, whether the SET ran inside a transaction)
+_applied = weakref.WeakKeyDictionary()
+UNKNOWN = object()  # the connection's statement_timeout after a rollback
+
+
+# ---- view settings ----
+def view_action(request, view_func):
+    """The DRF action `view_func` runs for this request, if it is a viewset."""
+    actions = getattr(view_func, 'actions', None) or {}
+    method = request.method.lower()
+    return actions.get(method) or (actions.get('get') if method == 'head' else None)
+
+
+def view_attribute(view_func, name, default=None):
+    """`name` from the @action initkwargs, the view function or its class."""
+    initkwargs = getattr(view_func, 'initkwargs', None) or {}
+    if name in initkwargs:
+        return initkwargs[name]
+    if hasattr(view_func, name):
+        return getattr(view_func, name)
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    return getattr(view_class, name, default)
+
+
+def statement_budget(request, view_func):
+    """The statement_timeout (ms) for a request to `view_func`."""
+    action = view_action(request, view_func)
+    per_action = view_attribute(view_func, 'statement_timeouts') or {}
+    if action in per_action:
+        return per_action[action]
+    return view_attribute(view_func, 'statement_timeout', settings.STATEMENT_TIMEOUT)
+
+
+def admission_class(request, view_func):
+    """The ADMISSION_LIMITS class of a request, or None when it is not capped."""
+    scope = view_attribute(view_func, 'throttle_scope')
+    if scope in settings.ADMISSION_LIMITS:
+        return scope
+    search_param = filters.SearchFilter.search_param
+    if request.GET.get(search_param) and filters.SearchFilter in (view_attribute(view_func, 'filter_backends') or ()):
+        return 'search'
+    return None
+
+
+# ---- statement timeouts ----
+def apply_statement_timeout(execute, sql, params, many, context):
+    """Execute wrapper: give the connection the current budget, then run the query."""
+    budget = _budget.get()
+    timeout = budget['timeout'] if budget else None
+    connection = context['connection']
+    raw = connection.connection
+    applied, tentative = _applied.get(raw, (None, False))
+    if tentative and raw.info.transaction_status == TransactionStatus.IDLE:
+        applied = UNKNOWN  # SET inside a transaction that has since committed or rolled back
+    if applied != timeout:
+        with connection.wrap_database_errors, raw.cursor() as cursor:  # the raw cursor skips the wrappers
+            if timeout is None:
+                cursor.execute('RESET statement_timeout')
+            else:
+                cursor.execute(f'SET statement_timeout = {int(timeout)}')
+        # A SET inside a transaction is undone if it rolls back; only trust it until the transaction ends.
+        _applied[raw] = (timeout, raw.info.transaction_status != TransactionStatus.IDLE)
+    result = execute(sql, params, many, context)
+    if isinstance(sql, str) and sql.startswith('ROLLBACK TO SAVEPOINT') and _applied.get(raw, (None, False))[1]:
+        _applied[raw] = (UNKNOWN, False)  # may have undone the SET
+    return result
+
+
+def install_statement_timeout(sender, connection, **kwargs):
+    if connection.vendor == 'postgresql' and apply_statement_timeout not in connection.execute_wrappers:
+        connection.execute_wrappers.append(apply_statement_timeout)
+
+
+connection_created.connect(install_statement_timeout, dispatch_uid='core.admission.statement_timeout')
+
+
+def query_cancelled(exc):
+    cause = exc.__cause__
+    return isinstance(exc, OperationalError) and (
+        getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+    ) == QUERY_CANCELED
+
+
+def unavailable(detail):
+    response = JsonResponse({'detail': detail}, status=503)
+    response['Retry-After'] = str(settings.ADMISSION_RETRY_AFTER)
+    return response
+
+
+class StatementTimeoutMiddleware:
+    """Run each request's queries under its view's statement_timeout budget."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _budget.set({'timeout': settings.STATEMENT_TIMEOUT})
+        try:
+            return self.get_response(request)
+        finally:
+            _budget.reset(token)
+
+    async def __acall__(self, request):
+        token = _budget.set({'timeout': settings.STATEMENT_TIMEOUT})
+        try:
+            return await self.get_response(request)
+        finally:
+            _budget.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        budget = _budget.get()
+        if budget is not None:
+            budget['timeout'] = statement_budget(request, view_func)
+        return None
+
+    def process_exception(self, request, exception):
+        if query_cancelled(exception):
+            logger.warning('Cancelled a query over its statement_timeout: %s %s', request.method, request.path)
+            return unavailable('The request took too long and was cancelled. Narrow it or try again later.')
+        return None
+
+
+# ---- admission control ----
+class Slots:
+    """Concurrent requests per admission class in this process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_use = {}
+
+    def acquire(self, name):
+        with self.lock:
+            if self.in_use.get(name, 0) >= settings.ADMISSION_LIMITS[name]:
+                return False
+            self.in_use[name] = self.in_use.get(name, 0) + 1
+            return True
+
+    def release(self, name):
+        with self.lock:
+            self.in_use[name] -= 1
+
+
+slots = Slots()
+
+
+class Held:
+    """Streaming content that calls `release` once exhausted, or closed with the response."""
+
+    def __init__(self, content, release):
+        self.content = content
+        self.release = release
+
+    def close(self):
+        # The response calls this when it is closed, also when the stream never started.
+        self.release()
+
+
+class HeldContent(Held):
+    def __iter__(self):
+        try:
+            yield from self.content
+        finally:
+            self.release()
+
+
+class AsyncHeldContent(Held):
+    # No __iter__: the response would take it for sync content.
+    async def __aiter__(self):
+        try:
+            async for part in self.content:
+                yield part
+        finally:
+            self.release()
+
+
+class AdmissionControlMiddleware:
+    """Shed expensive requests past their class's per-process limit with a fast 503."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            self.release(request)
+            raise
+        return self.hold(request, response)
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            self.release(request)
+            raise
+        return self.hold(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        name = admission_class(request, view_func)
+        if name is None:
+            return None
+        if not slots.acquire(name):
+            logger.warning('Shed a %s request: %s %s', name, request.method, request.path)
+            return unavailable(f'Too many {name} requests in progress. Try again shortly.')
+        request.admission_slot = name
+        return None
+
+    def hold(self, request, response):
+        """Keep the slot of a streamed response until its body has been sent."""
+        if not getattr(request, 'admission_slot', None):
+            return response
+        if not response.streaming:
+            self.release(request)
+        else:
+            held = AsyncHeldContent if response.is_async else HeldContent
+            response.streaming_content = held(response.streaming_content, lambda: self.release(request))
+        return response
+
+    def release(self, request):
+        name = getattr(request, 'admission_slot', None)
+        if name:
+            request.admission_slot = None
+            slots.release(name)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import checks  # noqa: F401  (registers system checks)
+        from core import signals  # noqa: F401  (fragment cache invalidation)
+        from core import tasks  # noqa: F401  (registers background tasks)
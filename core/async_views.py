@@ -0,0 +1,227 @@
+"""
+Async-native endpoints for the ASGI deployment.
+
+The DRF viewsets are synchronous: under ASGI each request borrows a thread
+for its whole lifetime, including the time spent waiting on a slow client.
+These plain Django async views only use a thread for the moments a
+synchronous call needs one.
+
+Each endpoint runs the synchronous viewset's own machinery: permission and
+throttle classes, content negotiation, get_queryset, filter_backends
+(filters, ?search=, ?ordering=, sparse fieldsets) and the paginator; an
+error is rendered by the viewset's handle_exception. The JWT user is
+loaded with the async ORM. The checks and the filters run in one short
+sync_to_async call: throttles use the cache and filter forms may validate
+against the database, but neither reads the rows. The rows are read with
+the async ORM (acount, async for, aget; see
+OptionalCountPagination.apaginate_queryset).
+
+Serialization runs on the event loop and is async-safe because every
+relation a serializer reads is loaded by select_related / prefetch_related in
+the query. `serializer.data` is then pure Python, and a forgotten relation
+fails loudly with SynchronousOnlyOperation instead of blocking the event loop.
+
+The middleware chain is async-capable (core.static replaces WhiteNoise's
+sync-only middleware), so Django does not run these views behind a
+SyncToAsync adapter.
+
+Read-only mirrors of the synchronous endpoints, same payloads and scoping:
+
+    /api/async/me/                  UserViewSet.me
+    /api/async/specialists/         SpecialistDirectoryViewSet.list
+    /api/async/children/            ChildViewSet.list
+    /api/async/ieps/<uuid>/         IEPViewSet.retrieve
+
+`/api/events/`, the Server-Sent Events stream, lives here too.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.events import aredeem_ticket, format_event, hub
+from core.models import User
+from core.views import ChildViewSet, IEPViewSet, SpecialistDirectoryViewSet, UserViewSet
+
+
+async def aget_user(validated_token):
+    """JWTAuthentication.get_user() with the async ORM."""
+    try:
+        user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+    except KeyError as exc:
+        raise InvalidToken(_('Token contained no recognizable user identification')) from exc
+    try:
+        user = await User.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist as exc:
+        raise AuthenticationFailed(_('User not found'), code='user_not_found') from exc
+    if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+    if jwt_settings.CHECK_REVOKE_TOKEN and (
+        validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+    ):
+        raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+    return user
+
+
+async def aauthenticate(request, raise_exception=False):
+    """
+    (user, token) for the JWT access token in the Authorization header, or
+    None without one. An invalid token raises, or gives None unless
+    `raise_exception`.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        validated = authenticator.get_validated_token(raw_token)
+        return await aget_user(validated), validated
+    except (InvalidToken, AuthenticationFailed):
+        if raise_exception:
+            raise
+        return None
+
+
+# ---- viewsets ----
+def _viewset(viewset_class, action, request, **kwargs):
+    """A viewset instance for `action`, set up as as_view() and dispatch() would."""
+    view = viewset_class(action_map={'get': action}, args=(), kwargs=kwargs)
+    view.request = view.initialize_request(request, **kwargs)
+    view.headers = view.default_response_headers
+    return view
+
+
+async def _respond(view, read, serialize):
+    """
+    Authenticate, run the viewset's checks and `read(view)`, then
+    `serialize(view, rows)` here. Rendering is left to Django's handler.
+    """
+    try:
+        user, token = await aauthenticate(view.request, raise_exception=True) or (AnonymousUser(), None)
+        # Set here, DRF's authenticators never run (they would query synchronously).
+        view.request.user, view.request.auth = user, token
+        response = serialize(view, await read(view))
+    except Exception as exc:
+        response = view.handle_exception(exc)
+    return view.finalize_response(view.request, response)
+
+
+def _checked_queryset(view):
+    """The viewset's checks, then its filtered queryset (unevaluated)."""
+    view.initial(view.request)
+    return view.filter_queryset(view.get_queryset())
+
+
+async def _page(view):
+    queryset = await sync_to_async(_checked_queryset)(view)
+    if view.paginator is None:
+        return [row async for row in queryset]
+    return await view.paginator.apaginate_queryset(queryset, view.request, view=view)
+
+
+async def _object(view):
+    """get_object() with aget()."""
+    queryset = await sync_to_async(_checked_queryset)(view)
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        instance = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404
+    view.check_object_permissions(view.request, instance)
+    return instance
+
+
+async def _user(view):
+    await sync_to_async(view.initial)(view.request)
+    return view.request.user
+
+
+def _serialize_page(view, page):
+    if view.paginator is None:
+        return Response(view.get_serializer(page, many=True).data)
+    return view.get_paginated_response(view.get_serializer(page, many=True).data)
+
+
+def _serialize_one(view, instance):
+    return Response(view.get_serializer(instance).data)
+
+
+# ---- endpoints ----
+@require_GET
+async def me_view(request):
+    """The signed-in user"""
+    view = _viewset(UserViewSet, 'me', request)
+    return await _respond(view, _user, _serialize_one)
+
+
+@require_GET
+async def specialist_directory_view(request):
+    """Specialists accepting new assessments (?specialization=, ?search=, ?ordering=, ?page=)"""
+    view = _viewset(SpecialistDirectoryViewSet, 'list', request)
+    return await _respond(view, _page, _serialize_page)
+
+
+@require_GET
+async def child_list_view(request):
+    """Children visible to the signed-in user (?gender=, ?grade_level=, ?parent=, ?search=, ?ordering=, ?page=)"""
+    view = _viewset(ChildViewSet, 'list', request)
+    return await _respond(view, _page, _serialize_page)
+
+
+@require_GET
+async def iep_detail_view(request, pk):
+    """One IEP with its goals, performance levels and accommodations"""
+    view = _viewset(IEPViewSet, 'retrieve', request, pk=pk)
+    return await _respond(view, _object, _serialize_one)
+
+
+# ---- event stream ----
+async def _event_frames(subscription):
+    try:
+        yield f'retry: {settings.SSE_RETRY_MS}\n\n'
+        while not subscription.overflowed:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@require_GET
+async def event_stream_view(request):
+    """
+    Server-Sent Events for assessment request and child assessment status
+    changes. Authenticates with the Authorization header or, for EventSource,
+    a ?ticket= from /api/events/ticket/.
+    """
+    if not isinstance(request, ASGIRequest):
+        # A WSGI worker would hold a thread for the life of the connection.
+        return JsonResponse({'error': 'The event stream is only served under ASGI'}, status=501)
+    authenticated = await aauthenticate(request)
+    user = authenticated[0] if authenticated else None
+    if user is None and request.GET.get('ticket'):
+        user_id = await aredeem_ticket(request.GET['ticket'])
+        user = await User.objects.filter(pk=user_id, is_active=True).afirst() if user_id else None
+    if user is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided or are invalid'}, status=401)
+
+    response = StreamingHttpResponse(_event_frames(hub.subscribe(user)), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
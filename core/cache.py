@@ -0,0 +1,120 @@
+"""
+Versioned fragment cache for serialized detail payloads.
+
+A fragment is the `serializer.data` of one row, keyed by model, primary key,
+the row's `updated_at`, a version stamp and the requested representation
+(serializer class plus ?fields/omit/expand). Saving or deleting a dependent
+row (a goal, skill area, eligibility, ...) bumps its parent's stamp through
+`core.signals`, and renaming a user bumps the stamps of the rows whose
+payload names them, so stale fragments are never read again and simply age
+out of the cache. Bulk writes send no signals and bump explicitly
+(core.signals.bulk_written).
+
+Every model also has a collection stamp, bumped whenever any of its rows is
+saved or deleted. List ETags (core.mixins.ConditionalGetMixin) are built
+from the collection stamps of the models a list response reads, so a
+conditional list request costs cache reads and no query.
+
+Stamps are random tokens rather than counters: if a stamp is evicted, the
+replacement can never collide with a fragment written under the old one.
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+FRAGMENT_PREFIX = 'fragment'
+COLLECTION_SCOPE = 'list'
+
+
+def is_shared(alias='default'):
+    """Whether every worker process sees the same cache (not LocMem or Dummy)."""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+
+def _new_stamp():
+    return uuid.uuid4().hex[:12]
+
+
+def _version_key(label, pk):
+    return f'{FRAGMENT_PREFIX}:version:{label}:{pk}'
+
+
+def get_version(label, pk):
+    key = _version_key(label, pk)
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, _new_stamp(), None)
+        stamp = cache.get(key)
+    return stamp
+
+
+def bump_version(label, pk):
+    cache.set(_version_key(label, pk), _new_stamp(), None)
+
+
+def bump_versions(label, pks):
+    if pks:
+        cache.set_many({_version_key(label, pk): _new_stamp() for pk in pks}, None)
+
+
+def bump_collection(label):
+    bump_version(label, COLLECTION_SCOPE)
+
+
+def collection_versions(labels):
+    """The collection stamp of each model label, read in one round trip."""
+    keys = {label: _version_key(label, COLLECTION_SCOPE) for label in labels}
+    stamps = cache.get_many(keys.values())
+    for key in keys.values():
+        if key not in stamps:
+            cache.add(key, _new_stamp(), None)
+            stamps[key] = cache.get(key)
+    return {label: stamps[key] for label, key in keys.items()}
+
+
+def fragment_version(label, pk):
+    """The row's stamp; changes whenever its payload may."""
+    return get_version(label, pk)
+
+
+def fragment_key(label, pk, updated_at, variant):
+    updated = updated_at.isoformat() if updated_at else ''
+    version = fragment_version(label, pk)
+    return f'{FRAGMENT_PREFIX}:{label}:{pk}:{updated}:{version}:{variant}'
+
+
+# ---- hit / miss accounting ----
+def _stats_key(label, outcome):
+    return f'{FRAGMENT_PREFIX}:stats:{label}:{outcome}'
+
+
+def record(label, outcome):
+    key = _stats_key(label, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_stats(labels):
+    stats = {}
+    for label in labels:
+        counts = cache.get_many([_stats_key(label, 'hit'), _stats_key(label, 'miss')])
+        hits = counts.get(_stats_key(label, 'hit'), 0)
+        misses = counts.get(_stats_key(label, 'miss'), 0)
+        total = hits + misses
+        stats[label] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 4) if total else None,
+        }
+    return stats
+
+
+def fragment_timeout():
+    return getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 3600)
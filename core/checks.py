@@ -0,0 +1,187 @@
+"""
+System checks for the core API.
+
+`check_shared_cache` (deployment checks) refuses a per-process cache, which
+would give every worker its own rate limits, login lockouts and version
+stamps. `check_replica_pins` refuses one whenever read replicas are
+configured, development included: a client's read-your-writes pin would
+only hold in the worker that served its write.
+
+`check_viewset_queries` walks every viewset registered on the core router,
+follows the relationships its serializer touches (dotted `source=` paths,
+nested serializers, many-related fields) and reports the ones the viewset
+queryset does not `select_related` / `prefetch_related`. Each warning carries
+the exact call to add, so N+1 queries show up in `manage.py check` instead of
+under load.
+"""
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import relations, serializers
+
+
+N1_TAG = 'queries'
+
+
+@checks.register(checks.Tags.caches, deploy=True)
+def check_shared_cache(app_configs=None, **kwargs):
+    from core.cache import is_shared
+
+    if is_shared():
+        return []
+    return [checks.Error(
+        'The default cache is per process, so every worker keeps its own rate limits, '
+        'login lockouts and fragment versions.',
+        hint='Set REDIS_URL (see CACHES in ara/settings.py).',
+        id='core.E001',
+    )]
+
+
+@checks.register(checks.Tags.caches, checks.Tags.database)
+def check_replica_pins(app_configs=None, **kwargs):
+    from core.cache import is_shared
+
+    if not settings.DATABASE_REPLICAS or is_shared():
+        return []
+    return [checks.Error(
+        'Read replicas are configured but the default cache is per process, so a client that '
+        'wrote is only pinned to the primary in the worker that served the write.',
+        hint='Set REDIS_URL (see CACHES in ara/settings.py), or unset DATABASE_REPLICA_URLS.',
+        id='core.E002',
+    )]
+
+
+def serializer_relations(serializer, model, prefix='', in_prefetch=False):
+    """
+    Yield (kind, lookup) pairs for every relation the serializer traverses.
+
+    kind is 'select' for forward FK / one-to-one hops that can be joined and
+    'prefetch' for to-many hops, or for anything below a to-many hop.
+    """
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            nested = field.child
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = field
+        else:
+            nested = None
+
+        attrs = list(field.source_attrs)
+        # A bare FK rendered as its primary key reads `<fk>_id` and never queries.
+        if (
+            isinstance(field, relations.RelatedField)
+            and field.use_pk_only_optimization()
+            and len(attrs) == 1
+        ):
+            continue
+
+        current, path, prefetch = model, prefix, in_prefetch
+        for attr in attrs:
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation or model_field.related_model is None:
+                break
+            path = f'{path}__{attr}' if path else attr
+            if model_field.one_to_many or model_field.many_to_many:
+                prefetch = True
+            yield ('prefetch' if prefetch else 'select'), path
+            current = model_field.related_model
+        else:
+            if nested is not None and path != prefix:
+                yield from serializer_relations(nested, current, path, prefetch)
+
+
+def select_related_paths(select_related, prefix=''):
+    """Flatten Query.select_related ({'a': {'b': {}}}) into {'a', 'a__b'}."""
+    paths = set()
+    if isinstance(select_related, dict):
+        for name, nested in select_related.items():
+            path = f'{prefix}__{name}' if prefix else name
+            paths.add(path)
+            paths |= select_related_paths(nested, path)
+    return paths
+
+
+def _queryset_coverage(queryset):
+    """Return (selected, prefetched, select_all) lookup sets for a queryset."""
+    select_all = queryset.query.select_related is True
+    selected = select_related_paths(queryset.query.select_related)
+    prefetched = set()
+    for lookup in queryset._prefetch_related_lookups:
+        if isinstance(lookup, Prefetch):
+            path = lookup.prefetch_to
+            if lookup.queryset is not None:
+                # Joins declared on the Prefetch queryset count as prefetched.
+                for nested in select_related_paths(lookup.queryset.query.select_related):
+                    prefetched.add(f'{path}__{nested}')
+        else:
+            path = lookup
+        parts = path.split('__')
+        for i in range(1, len(parts) + 1):
+            prefetched.add('__'.join(parts[:i]))
+    return selected, prefetched, select_all
+
+
+def _viewsets():
+    from core.urls import router
+    seen = set()
+    for prefix, viewset, basename in router.registry:
+        if viewset not in seen:
+            seen.add(viewset)
+            yield prefix, viewset
+
+
+@checks.register(N1_TAG)
+def check_viewset_queries(app_configs=None, **kwargs):
+    errors = []
+    for prefix, viewset in _viewsets():
+        queryset = getattr(viewset, 'queryset', None)
+        serializer_class = getattr(viewset, 'serializer_class', None)
+        if queryset is None or serializer_class is None:
+            continue
+
+        selected, prefetched, select_all = _queryset_coverage(queryset)
+        missing_select, missing_prefetch = [], []
+        for kind, path in serializer_relations(serializer_class(), queryset.model):
+            if path in prefetched:
+                continue
+            if kind == 'select':
+                if select_all or path in selected:
+                    continue
+                if path not in missing_select:
+                    missing_select.append(path)
+            elif path not in missing_prefetch:
+                missing_prefetch.append(path)
+
+        # Prefetching 'a__b' already fetches 'a'; only suggest the leaves.
+        missing_prefetch = [
+            path for path in missing_prefetch
+            if not any(other.startswith(path + '__') for other in missing_prefetch)
+        ]
+
+        label = f'{viewset.__module__}.{viewset.__name__}'
+        if missing_select:
+            args = ', '.join(repr(path) for path in missing_select)
+            errors.append(checks.Warning(
+                f'{serializer_class.__name__} on /api/{prefix}/ follows '
+                f'{", ".join(missing_select)} without select_related().',
+                hint=f'Add .select_related({args}) to {label}.queryset.',
+                obj=viewset,
+                id='core.W001',
+            ))
+        if missing_prefetch:
+            args = ', '.join(repr(path) for path in missing_prefetch)
+            errors.append(checks.Warning(
+                f'{serializer_class.__name__} on /api/{prefix}/ follows '
+                f'{", ".join(missing_prefetch)} without prefetch_related().',
+                hint=f'Add .prefetch_related({args}) to {label}.queryset.',
+                obj=viewset,
+                id='core.W002',
+            ))
+    return errors
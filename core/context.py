@@ -0,0 +1,332 @@
+"""
+Normalized child context: what is known about a child, gathered from the
+intake and assessment records, as plain JSON-ready data.
+
+The result only depends on record content. Ids and timestamps are left out,
+empty values are dropped, free text is whitespace-collapsed and multi-select
+lists are de-duplicated and sorted. Two children with the same inputs give
+equal contexts, and re-saving an unchanged form does not change anything
+downstream. core.generation hashes the context to key its result cache.
+
+build_contexts() loads any number of children with one query per source
+table, however many children are asked for.
+
+The context is also materialized per child in ChildContextSnapshot, so a
+read is one primary-key lookup instead of ten-odd queries. A save or delete
+of a source row (SOURCES) marks the matching section of the child's
+snapshot stale (core.signals): it queues a 'context.refresh' job in the same
+transaction, so nothing is queued for work that rolls back and the request
+itself never rebuilds anything. The worker rebuilds only the stale sections
+and merges them in. The snapshot's version is bumped only when the content
+actually changed, which makes it usable as an ETag.
+
+Bump CONTEXT_VERSION whenever the shape or normalization changes. Snapshots
+from an older version are rebuilt in full on their next read.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.jobs import enqueue
+from core.models import (
+    Assessment, AssessmentSkillArea, Child, ChildContextSnapshot, ChildrenEligibility,
+    DevelopmentalHistory, DisorderScreening, ParentInput, SpecialistInput, TeacherInput,
+)
+
+
+CONTEXT_VERSION = 2
+
+PARENT_FIELDS = [
+    'grade_level', 'primary_language', 'eligibility_criteria', 'medical_alerts', 'medications',
+    'sat_up_age', 'crawled_age', 'walked_age', 'first_words_age', 'formed_sentences_age',
+    'special_education_services_received', 'has_prior_iep', 'prior_services', 'other_prior_services',
+    'areas_of_concern', 'primary_concerns', 'goals_for_child', 'strategies_approaches_that_work',
+    'behavioral_difficulties', 'behavior_description_home_social', 'behavior_frustration_triggers',
+    'triggers_examples', 'calming_strategies_work', 'communication_style', 'communication_other',
+    'primary_communication_method', 'peer_adult_interaction', 'peer_interaction_level',
+    'comfort_environment', 'preferred_environment', 'sensory_sensitivities',
+    'sensory_sensitivity_other', 'physical_accommodations_needed', 'physical_accommodations_details',
+    'motor_needs', 'goals_timeframe', 'goals_this_year', 'goals_3_5_years',
+    'strategies_routines_home', 'additional_support_resources_needed', 'child_strengths',
+    'eating_independence', 'dressing_independence', 'toilet_skills', 'sleep_quality',
+    'daily_living_notes',
+]
+
+TEACHER_SUBJECTS = ['prewriting', 'english', 'math', 'science', 'arts_fine_motor', 'classroom_behavior']
+
+
+def _clean(value):
+    """JSON-ready, order-independent form of a field value; None when empty."""
+    if isinstance(value, str):
+        value = ' '.join(value.split())
+        return value or None
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        items = {_clean(item) for item in value if isinstance(item, str)}
+        others = [_clean(item) for item in value if not isinstance(item, str)]
+        items.discard(None)
+        return sorted(items) + [item for item in others if item is not None] or None
+    if isinstance(value, dict):
+        cleaned = {str(key): _clean(item) for key, item in value.items()}
+        return {key: item for key, item in sorted(cleaned.items()) if item is not None} or None
+    return value
+
+
+def _fields(instance, names):
+    values = {name: _clean(getattr(instance, name)) for name in names}
+    return {name: value for name, value in values.items() if value is not None and value is not False}
+
+
+def _parent(parent_input):
+    return _fields(parent_input, PARENT_FIELDS)
+
+
+def _teacher(teacher_input):
+    subjects = {}
+    for subject in TEACHER_SUBJECTS:
+        entry = _fields(teacher_input, [f'{subject}_progress', f'{subject}_notes'])
+        if entry:
+            subjects[subject] = {key.rsplit('_', 1)[1]: value for key, value in entry.items()}
+    return {
+        'submitted': teacher_input.submission_date.isoformat(),
+        **_fields(teacher_input, ['grade_level', 'sessions_attended', 'overall_comments']),
+        **({'subjects': subjects} if subjects else {}),
+    }
+
+
+def _specialist(specialist_input):
+    return {
+        'submitted': specialist_input.submission_date.isoformat(),
+        **_fields(specialist_input, [
+            'specialist_type', 'areas_of_concern', 'strengths_identified',
+            'disorder_screening_results', 'additional_information',
+        ]),
+    }
+
+
+def _assessment(assessment):
+    skills = sorted(
+        (_fields(area, ['category', 'skill_name', 'rating', 'comments']) for area in assessment.skill_areas.all()),
+        key=lambda area: (area.get('category', ''), area.get('skill_name', '')),
+    )
+    screenings = sorted(
+        (_fields(screening, ['disorder_type', 'risk_level', 'screening_items', 'notes'])
+         for screening in assessment.disorder_screenings.all()),
+        key=lambda screening: screening.get('disorder_type', ''),
+    )
+    return {
+        'type': assessment.assessment_type,
+        'date': assessment.assessment_date.isoformat(),
+        'complete': assessment.is_complete,
+        **({'skill_areas': skills} if skills else {}),
+        **({'screenings': screenings} if screenings else {}),
+    }
+
+
+def _by_child(queryset, build):
+    sections = defaultdict(list)
+    for row in queryset:
+        sections[row.child_id].append(build(row))
+    return sections
+
+
+def _child_section(child_ids):
+    children = Child.objects.filter(pk__in=child_ids).only(
+        'child_id', 'date_of_birth', 'gender', 'grade_level', 'primary_language',
+    )
+    return {child.pk: _fields(child, ['date_of_birth', 'gender', 'grade_level', 'primary_language'])
+            for child in children}
+
+
+def _parent_section(child_ids):
+    # Parents revise one form over time: only the latest submission counts.
+    latest = {}
+    for row in ParentInput.objects.filter(child__in=child_ids).order_by('child', '-submission_date', '-created_at'):
+        latest.setdefault(row.child_id, _parent(row))
+    return latest
+
+
+def _teachers_section(child_ids):
+    return _by_child(
+        TeacherInput.objects.filter(child__in=child_ids).order_by('-submission_date', '-created_at'), _teacher,
+    )
+
+
+def _specialists_section(child_ids):
+    return _by_child(
+        SpecialistInput.objects.filter(child__in=child_ids).order_by('-submission_date', '-created_at'),
+        _specialist,
+    )
+
+
+def _assessments_section(child_ids):
+    return _by_child(
+        Assessment.objects.filter(child__in=child_ids).order_by('-assessment_date', '-created_at')
+        .prefetch_related('skill_areas', 'disorder_screenings'),
+        _assessment,
+    )
+
+
+def _history_section(child_ids):
+    return {
+        row.child_id: _fields(row, [
+            'sat_up_age', 'crawled_age', 'walked_age', 'first_words_age', 'formed_sentences_age',
+            'previous_school_name', 'previous_school_level', 'prior_special_ed_services',
+            'prior_services_description', 'prior_iep_existed', 'other_prior_services',
+        ])
+        for row in DevelopmentalHistory.objects.filter(child__in=child_ids)
+    }
+
+
+def _eligibilities_section(child_ids):
+    return _by_child(
+        ChildrenEligibility.objects.filter(child__in=child_ids).order_by('date_identified', 'eligibility_type'),
+        lambda row: _fields(row, ['eligibility_type', 'eligibility_other', 'date_identified']),
+    )
+
+
+# section -> loader returning {child id: section value} for a list of child ids
+SECTIONS = {
+    'child': _child_section,
+    'parent': _parent_section,
+    'teachers': _teachers_section,
+    'specialists': _specialists_section,
+    'assessments': _assessments_section,
+    'developmental_history': _history_section,
+    'eligibilities': _eligibilities_section,
+}
+
+
+def _assessment_child(assessment_id):
+    return Assessment.objects.filter(pk=assessment_id).values_list('child_id', flat=True).first()
+
+
+# source model -> (section it feeds, callable returning the child id of a row,
+#                  fields the section reads or None for all of them)
+SOURCES = {
+    Child: ('child', lambda obj: obj.pk, {'date_of_birth', 'gender', 'grade_level', 'primary_language'}),
+    ParentInput: ('parent', lambda obj: obj.child_id, {'child', 'submission_date', *PARENT_FIELDS}),
+    TeacherInput: ('teachers', lambda obj: obj.child_id, None),
+    SpecialistInput: ('specialists', lambda obj: obj.child_id, None),
+    Assessment: ('assessments', lambda obj: obj.child_id, None),
+    AssessmentSkillArea: ('assessments', lambda obj: _assessment_child(obj.assessment_id), None),
+    DisorderScreening: ('assessments', lambda obj: _assessment_child(obj.assessment_id), None),
+    DevelopmentalHistory: ('developmental_history', lambda obj: obj.child_id, None),
+    ChildrenEligibility: ('eligibilities', lambda obj: obj.child_id, None),
+}
+
+
+def build_contexts(child_ids, sections=None):
+    """
+    {child id: context} for the given children (missing ids are left out).
+
+    With `sections`, only those sections are built: the result is partial,
+    for merging into a stored snapshot, and has no 'version' key.
+    """
+    child_ids = list(child_ids)
+    if sections is None:
+        contexts = {pk: {'version': CONTEXT_VERSION, 'child': data}
+                    for pk, data in _child_section(child_ids).items()}
+        child_ids = list(contexts)
+        sections = [name for name in SECTIONS if name != 'child']
+    else:
+        contexts = {pk: {} for pk in child_ids}
+    for name in sections:
+        for pk, data in SECTIONS[name](child_ids).items():
+            if data and pk in contexts:
+                contexts[pk][name] = data
+    return contexts
+
+
+def build_context(child_id):
+    return build_contexts([child_id]).get(child_id)
+
+
+# ---- snapshots ----
+def refresh_snapshots(child_ids, sections=None):
+    """
+    Bring the children's ChildContextSnapshot rows up to date and return them
+    as {child id: snapshot}.
+
+    A missing snapshot, or one from an older CONTEXT_VERSION, is built in
+    full. Otherwise only `sections` are rebuilt and merged in (all of them
+    when None). The version only moves when the content digest changes. The
+    rows are locked for the merge so that concurrent refreshes of different
+    sections cannot lose each other's work.
+    """
+    child_ids = set(child_ids)
+    now = timezone.now()
+    with transaction.atomic():
+        snapshots = ChildContextSnapshot.objects.select_for_update().in_bulk(list(child_ids))
+        partial = [pk for pk, snap in snapshots.items() if snap.context_version == CONTEXT_VERSION]
+        full = child_ids - set(partial)
+
+        changed, created = [], []
+        for pk, context in build_contexts(full).items():
+            snapshot = snapshots.get(pk) or ChildContextSnapshot(child_id=pk, version=0)
+            snapshot.context_version = CONTEXT_VERSION
+            if _store(snapshot, context, now):
+                (changed if pk in snapshots else created).append(snapshot)
+            snapshots[pk] = snapshot
+
+        if partial and sections != []:
+            names = list(SECTIONS) if sections is None else list(sections)
+            for pk, rebuilt in build_contexts(partial, names).items():
+                snapshot = snapshots[pk]
+                context = {key: value for key, value in snapshot.data.items() if key not in names}
+                context.update(rebuilt)
+                if _store(snapshot, context, now):
+                    changed.append(snapshot)
+
+        ChildContextSnapshot.objects.bulk_create(created, ignore_conflicts=True)
+        ChildContextSnapshot.objects.bulk_update(changed, ['context_version', 'version', 'digest', 'data', 'built_at'])
+    return snapshots
+
+
+def _store(snapshot, context, now):
+    new_digest = hashlib.sha256(
+        json.dumps(context, sort_keys=True, separators=(',', ':')).encode()
+    ).hexdigest()
+    if new_digest == snapshot.digest:
+        return False
+    snapshot.data, snapshot.digest, snapshot.built_at = context, new_digest, now
+    snapshot.version += 1
+    return True
+
+
+def get_contexts(child_ids):
+    """{child id: context}, from the snapshots; missing or outdated ones are built first."""
+    child_ids = set(child_ids)
+    rows = dict(
+        ChildContextSnapshot.objects.filter(child__in=child_ids, context_version=CONTEXT_VERSION)
+        .values_list('child_id', 'data')
+    )
+    stale = child_ids - set(rows)
+    if stale:
+        rows.update((pk, snapshot.data) for pk, snapshot in refresh_snapshots(stale).items())
+    return rows
+
+
+def mark_stale(child_id, section):
+    """
+    Queue a rebuild of one section of a child's snapshot, as part of the
+    current transaction. A rebuild of it that is already queued covers this
+    change too; one already running may have read the old rows, so another
+    is queued behind it.
+    """
+    if child_id is None:
+        return
+    payload = {'child': str(child_id), 'sections': [section]}
+    job = enqueue('context.refresh', payload, dedup_key=f'context.refresh:{child_id}:{section}')
+    if job.status == 'RUNNING':
+        enqueue('context.refresh', payload)
@@ -0,0 +1,264 @@
+"""
+Status change events, fanned out to Server-Sent Events subscribers.
+
+Publishing happens inside the writing transaction so subscribers only hear
+about committed changes:
+
+- 'postgres' broker: SELECT pg_notify('ara_events', <json>). PostgreSQL
+  delivers the notification at COMMIT to every worker LISTENing on the
+  channel, so events cross processes and hosts.
+- 'local' broker: the event is handed to this process's hub on commit. It
+  is a stand-in for development and sqlite; other workers never see it.
+
+Each worker runs one Hub on its event loop. With the postgres broker the hub
+holds a single LISTEN connection, opened in the loop's executor and then
+watched with loop.add_reader, so no stream waits on the connect and there
+is no thread per client or per worker: an idle subscriber is an
+asyncio.Queue and a suspended generator. Every event names its audience
+(user ids); staff receive everything.
+
+EventSource cannot set an Authorization header, and an access token in the
+query string would end up in access logs. A client first POSTs to
+/api/events/ticket/ with its usual header and opens
+/api/events/?ticket=<ticket>. A ticket is a random token in the shared
+cache, valid for SSE_TICKET_SECONDS and for one stream only.
+"""
+import asyncio
+import json
+import logging
+import secrets
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from core.models import AssessmentRequest, Child
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'ara_events'
+RECONNECT_DELAY = 5
+
+
+def broker():
+    configured = getattr(settings, 'EVENTS_BROKER', None)
+    if configured:
+        return configured
+    return 'postgres' if connections['default'].vendor == 'postgresql' else 'local'
+
+
+def publish(event, audience):
+    """Queue `event` (a dict) for the users in `audience` once the transaction commits."""
+    payload = json.dumps({
+        **event,
+        'event_id': uuid.uuid4().hex,
+        'at': timezone.now().isoformat(),
+        'audience': sorted({str(pk) for pk in audience if pk is not None}),
+    })
+    if broker() == 'postgres':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+    else:
+        transaction.on_commit(lambda: hub.dispatch_threadsafe(payload))
+
+
+# ---- stream tickets ----
+def _ticket_key(ticket):
+    return f'sse-ticket:{ticket}'
+
+
+def issue_ticket(user):
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_ticket_key(ticket), user.pk, settings.SSE_TICKET_SECONDS)
+    return ticket
+
+
+async def aredeem_ticket(ticket):
+    """The pk of the user a ticket was issued to, or None; a ticket works once."""
+    key = _ticket_key(ticket)
+    user_id = await cache.aget(key)
+    # Only the caller whose delete removed the key may use it.
+    if user_id is None or not await cache.adelete(key):
+        return None
+    return user_id
+
+
+# ---- status events ----
+def request_audience(assessment_request):
+    return [assessment_request.parent_id, assessment_request.specialist_id]
+
+
+def child_audience(child):
+    specialists = AssessmentRequest.objects.filter(child=child).values_list('specialist_id', flat=True)
+    return [child.parent_id, child.secondary_parent_id, *specialists]
+
+
+# Model -> (status field, event name, audience)
+STATUS_EVENTS = {
+    AssessmentRequest: ('status', 'assessment_request.status', request_audience),
+    Child: ('assessment_status', 'child.assessment_status', child_audience),
+}
+
+
+def status_event(sender, instance, previous):
+    """(event, audience) for a status change of `instance`."""
+    field, name, audience = STATUS_EVENTS[sender]
+    event = {
+        'event': name,
+        'id': str(instance.pk),
+        'status': getattr(instance, field),
+        'previous': previous,
+    }
+    if sender is AssessmentRequest:
+        event['child'] = str(instance.child_id)
+    return event, audience(instance)
+
+
+class Subscription:
+    def __init__(self, user):
+        self.user_id = str(user.pk)
+        self.is_staff = user.is_staff
+        self.queue = asyncio.Queue(maxsize=getattr(settings, 'SSE_QUEUE_SIZE', 100))
+        self.overflowed = False
+
+    def wants(self, event):
+        return self.is_staff or self.user_id in event['audience']
+
+    def offer(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind reconnects and refetches instead.
+            self.overflowed = True
+
+
+class Hub:
+    """Per-process fan-out from the broker to subscriber queues."""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.loop = None
+        self.listener = None
+
+    # ---- subscribers ----
+    def subscribe(self, user):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self._stop_listening()
+            self.loop, self.subscribers = loop, set()
+        if broker() == 'postgres' and self.listener is None:
+            self._listen()
+        subscription = Subscription(user)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    # ---- fan-out ----
+    def dispatch(self, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning('Dropping malformed event payload %r', payload[:200])
+            return
+        for subscription in list(self.subscribers):
+            if subscription.wants(event):
+                subscription.offer(event)
+
+    def dispatch_threadsafe(self, payload):
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.dispatch, payload)
+
+    # ---- postgres LISTEN ----
+    # A dedicated connection, never a pooled one: it is held for as long as
+    # the worker has subscribers. It is opened in the loop's executor, so the
+    # loop keeps serving the other streams while it connects; until then
+    # self.listener is the pending future.
+    def _listen(self):
+        self.listener = self.loop.run_in_executor(None, _connect_listener)
+        self.listener.add_done_callback(self._on_connected)
+
+    def _on_connected(self, future):
+        if self.listener is not future:
+            # Stopped listening while it connected.
+            if not future.cancelled() and future.exception() is None:
+                future.result().close()
+            return
+        if future.exception() is not None:
+            logger.error('Could not LISTEN on %s; retrying in %ss', CHANNEL, RECONNECT_DELAY,
+                         exc_info=future.exception())
+            self.listener = self.loop.call_later(RECONNECT_DELAY, self._reconnect)
+            return
+        conn = self.listener = future.result()
+        self.loop.add_reader(conn.fileno(), self._on_readable)
+
+    def _on_readable(self):
+        try:
+            payloads = _read_notifies(self.listener)
+        except _driver().Error:
+            logger.exception('Lost the LISTEN connection; reconnecting in %ss', RECONNECT_DELAY)
+            self._stop_listening()
+            self.listener = self.loop.call_later(RECONNECT_DELAY, self._reconnect)
+            return
+        for payload in payloads:
+            self.dispatch(payload)
+
+    def _reconnect(self):
+        self.listener = None
+        if self.subscribers:
+            self._listen()
+
+    def _stop_listening(self):
+        listener, self.listener = self.listener, None
+        if isinstance(listener, asyncio.TimerHandle):
+            listener.cancel()
+        elif isinstance(listener, asyncio.Future):
+            pass  # _on_connected closes the connection when it arrives
+        elif listener is not None:
+            try:
+                self.loop.remove_reader(listener.fileno())
+            except (ValueError, OSError, RuntimeError):
+                pass
+            listener.close()
+
+
+# The LISTEN connection uses whichever driver Django's backend does.
+def _driver():
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    if is_psycopg3:
+        import psycopg
+        return psycopg
+    import psycopg2
+    return psycopg2
+
+
+def _connect_listener():
+    params = connections['default'].get_connection_params()
+    conn = _driver().connect(**params)
+    conn.autocommit = True
+    conn.cursor().execute(f'LISTEN {CHANNEL}')
+    return conn
+
+
+def _read_notifies(conn):
+    """Payloads of the notifications that have arrived on `conn`, without blocking."""
+    if _driver().__name__ == 'psycopg':
+        return [notify.payload for notify in conn.notifies(timeout=0)]
+    conn.poll()
+    payloads = [notify.payload for notify in conn.notifies]
+    conn.notifies.clear()
+    return payloads
+
+
+hub = Hub()
+
+
+def format_event(event):
+    """One SSE frame; the audience stays on the server."""
+    data = {key: value for key, value in event.items() if key != 'audience'}
+    return f"id: {event['event_id']}\nevent: {event['event']}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,224 @@
+"""
+AI content generation: IEP drafts, goals, progress reports and grammar
+corrections.
+
+generate() takes a list of requests:
+
+    {'generation_type': 'GOAL_CREATION', 'child': <uuid>, 'instructions': {...}}
+
+For each one it reads the child's context snapshot (core.context, one
+query for the whole list), hashes the request and looks
+the hash up in AIGeneratedContent. Only cache misses reach the generator.
+Identical misses are sent once, in batches of the generator's batch_size.
+Every request is logged in AIGenerationLog with the model version,
+confidence_score, whether the cache answered it, and the wall time of the
+call that produced it.
+
+The generator is the class named by the AI_GENERATOR setting. It needs a
+`model_version` and a `generate(requests)` that returns one
+{'content': ..., 'confidence': 0..1} per request, in order. StubGenerator
+is a deterministic local stand-in for development and tests. Because the
+model version is part of the hash, switching generators never serves the
+old one's output.
+
+Generation runs as the 'ai.generate' background job (core.tasks).
+"""
+import hashlib
+import json
+import time
+import uuid
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.context import CONTEXT_VERSION, get_contexts
+from core.models import AIGeneratedContent, AIGenerationLog
+
+
+GENERATION_TYPES = [value for value, _ in AIGenerationLog.GENERATION_TYPES]
+
+
+class Generator:
+    model_version = ''
+    batch_size = 8
+
+    def generate(self, requests):
+        raise NotImplementedError
+
+
+class StubGenerator(Generator):
+    """Deterministic output built from the context alone; no model, no network."""
+    model_version = 'stub-1'
+
+    RATING_GAPS = {'POOR', 'FAIR'}
+
+    def generate(self, requests):
+        return [self.generate_one(request) for request in requests]
+
+    def generate_one(self, request):
+        context = request['context'] or {}
+        handler = getattr(self, request['generation_type'].lower())
+        return {'content': handler(context, request['instructions']), 'confidence': self.confidence(context)}
+
+    def confidence(self, context):
+        """Share of the four sources that have something to say, floored at 0.25."""
+        sources = sum(1 for key in ('parent', 'teachers', 'specialists', 'assessments') if context.get(key))
+        return max(sources, 1) / 4
+
+    def needs(self, context):
+        needs = list((context.get('parent') or {}).get('areas_of_concern') or [])
+        for assessment in context.get('assessments', []):
+            for area in assessment.get('skill_areas', []):
+                if area.get('rating') in self.RATING_GAPS and area.get('skill_name') not in needs:
+                    needs.append(area['skill_name'])
+        return needs
+
+    def goal_creation(self, context, instructions):
+        limit = instructions.get('max_goals', 5)
+        return {'goals': [
+            {
+                'goal_number': number,
+                'goal_category': need,
+                'goal_statement': f'Within 10 months, the child will show measurable progress in {need.lower()}, '
+                                  f'meeting 80% of objectives across three consecutive observations.',
+                'measurement_method': 'Weekly observation and progress reports',
+            }
+            for number, need in enumerate(self.needs(context)[:limit], start=1)
+        ]}
+
+    def iep_generation(self, context, instructions):
+        parent = context.get('parent') or {}
+        return {
+            'present_levels': [
+                {'source': f"{assessment['type']} ({assessment['date']})",
+                 'skills': {area['skill_name']: area.get('rating') for area in assessment.get('skill_areas', [])}}
+                for assessment in context.get('assessments', [])
+            ],
+            'goals': self.goal_creation(context, instructions)['goals'],
+            'accommodations': [
+                f'Sensory support for {item.lower()}' for item in parent.get('sensory_sensitivities', [])
+            ] + [f'Use {item.lower()} at school as at home' for item in parent.get('calming_strategies_work', [])],
+        }
+
+    def progress_report(self, context, instructions):
+        notes = [
+            f"{subject.replace('_', ' ')}: {entry.get('progress', 'n/a').lower()}"
+            for teacher in context.get('teachers', [])[:1]
+            for subject, entry in sorted(teacher.get('subjects', {}).items())
+        ]
+        return {'summary': '; '.join(notes) or 'No teacher input on file.',
+                'focus_areas': self.needs(context)[:3]}
+
+    def grammar_correction(self, context, instructions):
+        text = ' '.join(str(instructions.get('text', '')).split())
+        sentences = [s.strip() for s in text.replace('!', '.').replace('?', '.').split('.') if s.strip()]
+        return {'text': ' '.join(s[0].upper() + s[1:] + '.' for s in sentences)}
+
+
+@lru_cache(maxsize=None)
+def get_generator():
+    return import_string(settings.AI_GENERATOR)()
+
+
+def digest(value):
+    """sha256 of `value` as canonical JSON."""
+    canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def content_hash(generation_type, context, instructions, model_version):
+    """The AIGeneratedContent cache key of a request."""
+    return digest([CONTEXT_VERSION, model_version, generation_type, context, instructions])
+
+
+def generate(requests, user=None, generator=None):
+    """
+    Run generation requests, cache first; returns one result per request:
+    {'generation_type', 'child', 'content', 'confidence_score', 'cached', 'content_id', 'log'}.
+    """
+    generator = generator or get_generator()
+    requests = [
+        {**request, 'child': uuid.UUID(str(request['child'])) if request.get('child') else None}
+        for request in requests
+    ]
+    contexts = get_contexts({r['child'] for r in requests if r.get('child')})
+
+    prepared = []
+    for request in requests:
+        context = contexts.get(request['child'])
+        instructions = request.get('instructions') or {}
+        prepared.append({
+            'generation_type': request['generation_type'],
+            'child': request['child'],
+            'context': context,
+            'instructions': instructions,
+            'hash': content_hash(request['generation_type'], context, instructions, generator.model_version),
+        })
+
+    hashes = {p['hash'] for p in prepared}
+    stored = AIGeneratedContent.objects.in_bulk(list(hashes), field_name='content_hash')
+    hits = set(stored)
+    if hits:
+        AIGeneratedContent.objects.filter(content_hash__in=hits).update(
+            hits=F('hits') + 1, last_used_at=timezone.now(),
+        )
+
+    # One generator call per distinct miss, batch_size at a time.
+    misses = list({p['hash']: p for p in prepared if p['hash'] not in hits}.values())
+    durations = {}
+    for offset in range(0, len(misses), generator.batch_size):
+        batch = misses[offset:offset + generator.batch_size]
+        started = time.perf_counter()
+        outputs = generator.generate(batch)
+        elapsed = round((time.perf_counter() - started) * 1000)
+        if len(outputs) != len(batch):
+            raise ValueError(f'{type(generator).__name__} returned {len(outputs)} results for {len(batch)} requests')
+        AIGeneratedContent.objects.bulk_create([
+            AIGeneratedContent(
+                content_hash=p['hash'], generation_type=p['generation_type'],
+                ai_model_version=generator.model_version, content=output['content'],
+                confidence_score=_score(output.get('confidence')),
+            )
+            for p, output in zip(batch, outputs)
+        ], ignore_conflicts=True)  # a concurrent run may have stored the same hash
+        durations.update({p['hash']: elapsed for p in batch})
+    if misses:
+        stored.update(AIGeneratedContent.objects.in_bulk([p['hash'] for p in misses], field_name='content_hash'))
+
+    logs = AIGenerationLog.objects.bulk_create([
+        AIGenerationLog(
+            generation_type=p['generation_type'],
+            source_data_id=p['child'],
+            generated_content_id=stored[p['hash']].pk,
+            ai_model_version=stored[p['hash']].ai_model_version,
+            confidence_score=stored[p['hash']].confidence_score,
+            human_review_status='PENDING',
+            content_hash=p['hash'],
+            cache_hit=p['hash'] in hits,
+            duration_ms=durations.get(p['hash'], 0),
+            requested_by=user,
+        )
+        for p in prepared
+    ])
+    return [
+        {
+            'generation_type': p['generation_type'],
+            'child': p['child'],
+            'content': stored[p['hash']].content,
+            'confidence_score': stored[p['hash']].confidence_score,
+            'cached': p['hash'] in hits,
+            'content_id': stored[p['hash']].pk,
+            'log': log.pk,
+        }
+        for p, log in zip(prepared, logs)
+    ]
+
+
+def _score(confidence):
+    if confidence is None:
+        return None
+    return Decimal(str(min(max(confidence, 0), 1))).quantize(Decimal('0.01'))
@@ -0,0 +1,230 @@
+"""
+Database-backed background jobs.
+
+Work is stored as core.models.Job rows. Handlers enqueue a row and return
+straight away; since the INSERT is part of the request's transaction, a job
+never runs for a request that rolled back. `manage.py run_workers` executes
+the jobs.
+
+Claiming uses SELECT ... FOR UPDATE SKIP LOCKED over the partial
+core_job_ready_idx index: concurrent workers each take different rows
+without blocking one another, highest priority first, then oldest run_at.
+A failed attempt is requeued with exponential backoff until max_attempts.
+While a job runs, a heartbeat thread renews its lock (locked_at) every
+JOB_HEARTBEAT_INTERVAL seconds. A job whose worker died stops being renewed
+and is requeued by reap_stale() once its lock is older than
+JOB_LOCK_TIMEOUT, however long the job itself legitimately takes.
+
+Tasks are plain functions registered with @task and called with the job's
+payload as keyword arguments; their return value (JSON-serializable) is
+stored as the job's result.
+
+Status changes are QuerySet.update() calls, which send no signals; they go
+through _update(), which bumps the core.job collection stamp once the write
+commits so GET /api/jobs/ does not answer 304 with a stale status.
+"""
+import logging
+import random
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.cache import bump_collection
+from core.models import Job
+
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+class Task:
+    def __init__(self, func, name, max_attempts, backoff, priority):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.priority = priority
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, payload=None, **options):
+        return enqueue(self.name, payload, **options)
+
+    def retry_delay(self, attempt):
+        """Exponential backoff with +/-20% jitter, capped at an hour."""
+        delay = min(self.backoff * 2 ** (attempt - 1), 3600)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def task(name=None, max_attempts=5, backoff=30, priority=0):
+    """Register a function as a background task."""
+    def register(func):
+        registered = Task(func, name or f'{func.__module__}.{func.__name__}',
+                          max_attempts, backoff, priority)
+        TASKS[registered.name] = registered
+        return registered
+    return register
+
+
+def enqueue(task_name, payload=None, *, priority=None, run_at=None, delay=None,
+            dedup_key=None, user=None):
+    """
+    Queue a job and return it.
+
+    With a `dedup_key`, an already queued or running job with the same key is
+    returned instead of creating a second one.
+    """
+    registered = TASKS.get(task_name)
+    if registered is None:
+        raise UnknownTask(task_name)
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    job = Job(
+        task=task_name,
+        payload=payload or {},
+        priority=registered.priority if priority is None else priority,
+        run_at=run_at,
+        max_attempts=registered.max_attempts,
+        dedup_key=dedup_key,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    if dedup_key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        existing = Job.objects.filter(dedup_key=dedup_key, status__in=Job.ACTIVE_STATUSES).first()
+        if existing is None:  # finished between the INSERT and this lookup
+            job.save()
+            return job
+        return existing
+    return job
+
+
+def claim(worker_id, limit=1):
+    """Lock and mark RUNNING up to `limit` ready jobs for this worker."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='QUEUED', run_at__lte=now)
+            .order_by('-priority', 'run_at')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        _update(
+            Job.objects.filter(pk__in=ids, status='QUEUED'),
+            status='RUNNING', locked_by=worker_id, locked_at=now,
+            attempts=F('attempts') + 1, updated_at=now,
+        )
+        return list(Job.objects.filter(pk__in=ids, locked_by=worker_id, status='RUNNING')
+                    .order_by('-priority', 'run_at'))
+
+
+def _update(queryset, **fields):
+    """QuerySet.update() that bumps the job list's stamp when it changed rows."""
+    updated = queryset.update(**fields)
+    if updated:
+        transaction.on_commit(lambda: bump_collection(Job._meta.label_lower))
+    return updated
+
+
+def _finish(job, **fields):
+    fields['updated_at'] = timezone.now()
+    _update(Job.objects.filter(pk=job.pk, status='RUNNING', locked_by=job.locked_by), **fields)
+
+
+class Heartbeat(threading.Thread):
+    """Renews a running job's lock every `interval` seconds until stopped."""
+
+    def __init__(self, job, interval):
+        super().__init__(name=f'job-heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                now = timezone.now()
+                try:
+                    renewed = _update(Job.objects.filter(
+                        pk=self.job.pk, status='RUNNING', locked_by=self.job.locked_by,
+                    ), locked_at=now, updated_at=now)
+                except DatabaseError:
+                    logger.exception('Could not renew the lock of job %s', self.job.pk)
+                    continue
+                if not renewed:
+                    return  # reaped meanwhile; the lock is no longer ours
+        finally:
+            connections.close_all()  # this thread's own connections
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run(job):
+    """Execute one claimed job and record the outcome."""
+    registered = TASKS.get(job.task)
+    if registered is None:
+        _finish(job, status='FAILED', last_error=f'Unknown task {job.task!r}',
+                finished_at=timezone.now())
+        return
+
+    heartbeat = Heartbeat(job, getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 30))
+    heartbeat.start()
+    try:
+        result = registered(**job.payload)
+    except Exception:
+        error = traceback.format_exc(limit=20)
+        if job.attempts < job.max_attempts:
+            retry_at = timezone.now() + registered.retry_delay(job.attempts)
+            logger.warning('Job %s (%s) failed, attempt %s of %s; retrying at %s',
+                           job.pk, job.task, job.attempts, job.max_attempts, retry_at)
+            _finish(job, status='QUEUED', run_at=retry_at, last_error=error, locked_by='', locked_at=None)
+        else:
+            logger.error('Job %s (%s) failed permanently after %s attempts',
+                         job.pk, job.task, job.attempts)
+            _finish(job, status='FAILED', last_error=error, finished_at=timezone.now())
+        return
+    finally:
+        heartbeat.stop()
+
+    _finish(job, status='SUCCEEDED', result=result, finished_at=timezone.now())
+
+
+def reap_stale(timeout=None):
+    """Requeue RUNNING jobs whose lock went unrenewed for `timeout` seconds (their worker died)."""
+    timeout = timeout or getattr(settings, 'JOB_LOCK_TIMEOUT', 120)
+    now = timezone.now()
+    stale = Job.objects.filter(status='RUNNING', locked_at__lt=now - timedelta(seconds=timeout))
+    # A job that keeps killing its worker must not be retried forever.
+    _update(
+        stale.filter(attempts__gte=F('max_attempts')),
+        status='FAILED', last_error='Worker died while running the job', finished_at=now, updated_at=now,
+    )
+    return _update(stale, status='QUEUED', run_at=now, locked_by='', locked_at=None, updated_at=now)
+
+
+def cancel(job_id):
+    """Cancel a job that has not started; returns whether it was cancelled."""
+    now = timezone.now()
+    return bool(_update(
+        Job.objects.filter(pk=job_id, status='QUEUED'),
+        status='CANCELLED', finished_at=now, updated_at=now,
+    ))
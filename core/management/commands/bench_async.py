@@ -0,0 +1,205 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+User = get_user_model()
+USERNAME = 'bench-async'
+
+# endpoint -> (synchronous DRF path, async-native path)
+ENDPOINTS = {
+    'me': ('/api/users/me/', '/api/async/me/'),
+    'specialists': ('/api/specialists/', '/api/async/specialists/'),
+    'children': ('/api/children/', '/api/async/children/'),
+}
+
+# mode -> (application, gunicorn worker class, which path)
+MODES = {
+    'wsgi': ('ara.wsgi:application', 'gthread', 0),
+    'asgi-sync': ('ara.asgi:application', 'uvicorn_worker.UvicornWorker', 0),
+    'asgi-async': ('ara.asgi:application', 'uvicorn_worker.UvicornWorker', 1),
+}
+
+
+def _children(pid):
+    """pid and all its descendants, from /proc."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    parents.setdefault(int(f.read().rsplit(')', 1)[1].split()[1]), []).append(int(entry))
+            except OSError:
+                continue
+    tree, todo = [], [pid]
+    while todo:
+        current = todo.pop()
+        tree.append(current)
+        todo.extend(parents.get(current, []))
+    return tree
+
+
+def _rss_bytes(pids):
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            continue
+    return total
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, pid, interval=0.25):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, _rss_bytes(_children(self.pid)))
+            self.stopped.wait(self.interval)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput, latency and server memory for sync WSGI and async ASGI '
+        'under many concurrent slow clients (Linux; needs gunicorn and uvicorn-worker)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='me')
+        parser.add_argument('--modes', default=','.join(MODES),
+                            help=f'Comma-separated subset of {", ".join(MODES)}')
+        parser.add_argument('--clients', type=int, default=500, help='Concurrent clients')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds per mode')
+        parser.add_argument('--trickle', type=float, default=0.2,
+                            help='Seconds a client waits between request header lines')
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gthread (WSGI) worker')
+        parser.add_argument('--port', type=int, default=8701)
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f'Unknown mode(s): {", ".join(sorted(unknown))}')
+
+        user, _ = User.objects.get_or_create(
+            username=USERNAME, defaults={'email': f'{USERNAME}@example.com', 'role': 'PARENT'},
+        )
+        token = str(AccessToken.for_user(user))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{options["clients"]} clients, {options["duration"]:.0f}s per mode, '
+            f'{options["trickle"]}s between header lines, {options["workers"]} workers'
+        ))
+        for offset, mode in enumerate(modes):
+            app, worker_class, path_index = MODES[mode]
+            path = ENDPOINTS[options['endpoint']][path_index]
+            port = options['port'] + offset
+            server = self.start_server(app, worker_class, port, options)
+            sampler = MemorySampler(server.pid)
+            try:
+                sampler.start()
+                latencies, errors, elapsed = asyncio.run(self.load(port, path, token, options))
+            finally:
+                sampler.stopped.set()
+                server.terminate()
+                server.wait(timeout=30)
+            self.report(mode, path, latencies, errors, elapsed, sampler.peak)
+
+    def start_server(self, app, worker_class, port, options):
+        command = [
+            sys.executable, '-m', 'gunicorn', app,
+            '--bind', f'127.0.0.1:{port}',
+            '--workers', str(options['workers']),
+            '--worker-class', worker_class,
+            '--timeout', '120',
+            '--backlog', str(max(2048, options['clients'] * 2)),
+            '--log-level', 'warning',
+        ]
+        if worker_class == 'gthread':
+            command += ['--threads', str(options['threads'])]
+        server = subprocess.Popen(command, env=os.environ.copy())
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(
+                    f'{app} ({worker_class}) exited with status {server.returncode}; '
+                    'ASGI modes need uvicorn and uvicorn-worker installed'
+                )
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'{app} did not start listening on port {port}')
+
+    async def load(self, port, path, token, options):
+        latencies, errors = [], []
+        headers = [
+            f'GET {path} HTTP/1.1\r\n',
+            f'Host: 127.0.0.1:{port}\r\n',
+            f'Authorization: Bearer {token}\r\n',
+            'Accept: application/json\r\n',
+            'Connection: close\r\n',
+            '\r\n',
+        ]
+        start = time.monotonic()
+        deadline = start + options['duration']
+
+        async def client():
+            while time.monotonic() < deadline:
+                began = time.monotonic()
+                try:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    for line in headers:
+                        writer.write(line.encode())
+                        await writer.drain()
+                        if line != '\r\n':
+                            await asyncio.sleep(options['trickle'])
+                    response = await reader.read()
+                    writer.close()
+                except OSError as exc:
+                    errors.append(type(exc).__name__)
+                    await asyncio.sleep(0.1)
+                    continue
+                status_line = response.split(b'\r\n', 1)[0]
+                if b' 200 ' in status_line:
+                    latencies.append(time.monotonic() - began)
+                else:
+                    errors.append(status_line.decode(errors='replace') or 'empty response')
+
+        await asyncio.gather(*(client() for _ in range(options['clients'])))
+        return latencies, errors, time.monotonic() - start
+
+    def report(self, mode, path, latencies, errors, elapsed, peak_rss):
+        latencies.sort()
+        if latencies:
+            p50 = statistics.median(latencies)
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        else:
+            p50 = p99 = float('nan')
+        self.stdout.write(
+            f'  {mode:<10} {path:<26} {len(latencies) / elapsed:8.1f} req/s  '
+            f'p50 {p50 * 1000:8.1f} ms  p99 {p99 * 1000:8.1f} ms  '
+            f'errors {len(errors):>5}  peak RSS {peak_rss / 2**20:7.1f} MiB'
+        )
+        if errors:
+            common = max(set(errors), key=errors.count)
+            self.stdout.write(f'             most common error: {common} ({errors.count(common)}x)')
@@ -0,0 +1,144 @@
+import statistics
+import threading
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.dbpool import close_pools, pool_stats
+
+
+User = get_user_model()
+DEFAULT_PATHS = ['/api/users/me/', '/api/specialists/']
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure request latency on the default database with a new connection per request '
+        '(CONN_MAX_AGE = 0) and with a psycopg connection pool'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS, help='GET paths to request')
+        parser.add_argument('--requests', type=int, default=300, help='Requests per path and mode')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent client threads')
+        parser.add_argument('--user', help='Username to authenticate as (default: first superuser)')
+        parser.add_argument('--max-size', type=int, default=None,
+                            help='Pool max_size (default: the configured pool, or --threads)')
+
+    def handle(self, *args, **options):
+        wrapper = connections['default']
+        if wrapper.vendor != 'postgresql':
+            raise CommandError('Connection pooling needs PostgreSQL')
+        settings_dict = wrapper.settings_dict
+        configured = settings_dict['OPTIONS'].get('pool')
+        pool_options = dict(configured) if isinstance(configured, dict) else {}
+        pool_options['max_size'] = options['max_size'] or pool_options.get('max_size') or options['threads']
+        pool_options['min_size'] = min(pool_options.get('min_size', 1), pool_options['max_size'])
+
+        user = (User.objects.filter(username=options['user']) if options['user']
+                else User.objects.filter(is_superuser=True)).first()
+        if user is None:
+            raise CommandError('No user to authenticate as; pass --user')
+        token = str(AccessToken.for_user(user))
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Connection setup'))
+        connect_ms = self.connect_cost(wrapper, settings_dict, 20)
+        self.stdout.write(f'  {connect_ms:.2f} ms per new connection (median of 20)')
+
+        conn_max_age = settings_dict['CONN_MAX_AGE']
+        # Rate limits would cut the run short; no scope is throttled while it lasts.
+        unthrottled = mock.patch.object(
+            SimpleRateThrottle, 'THROTTLE_RATES', dict.fromkeys(SimpleRateThrottle.THROTTLE_RATES),
+        )
+        try:
+            unthrottled.start()
+            for path in options['paths']:
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f"GET {path}: {options['requests']} requests, {options['threads']} threads"
+                ))
+                for label, pool in (('direct', None), ('pooled', pool_options)):
+                    result = self.measure(settings_dict, pool, path, token, options['requests'], options['threads'])
+                    self.stdout.write(
+                        f"  {label:<7} p50 {result['p50']:7.2f} ms  p99 {result['p99']:7.2f} ms  "
+                        f"{result['rps']:7.1f} req/s  {result['connections']:4d} connections opened"
+                        + (f"  avg pool wait {result['wait']:.2f} ms" if pool else '')
+                    )
+        finally:
+            unthrottled.stop()
+            close_pools()
+            settings_dict['CONN_MAX_AGE'] = conn_max_age
+            settings_dict['OPTIONS'].pop('pool', None)
+            if configured:
+                settings_dict['OPTIONS']['pool'] = configured
+
+    def connect_cost(self, wrapper, settings_dict, samples):
+        close_pools()
+        settings_dict['OPTIONS'].pop('pool', None)
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            wrapper.ensure_connection()
+            timings.append((time.perf_counter() - started) * 1000)
+            wrapper.close()
+        return statistics.median(timings)
+
+    def measure(self, settings_dict, pool, path, token, total, threads):
+        close_pools()
+        settings_dict['CONN_MAX_AGE'] = 0
+        if pool:
+            settings_dict['OPTIONS']['pool'] = pool
+        else:
+            settings_dict['OPTIONS'].pop('pool', None)
+
+        opened = []
+        counter = lambda sender, connection, **kwargs: opened.append(1)  # noqa: E731
+        connection_created.connect(counter)
+        latencies, errors = [], []
+        per_thread = max(total // threads, 1)
+
+        def client():
+            api = APIClient()
+            api.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            for _ in range(per_thread):
+                started = time.perf_counter()
+                response = api.get(path)
+                # The test client keeps connections open between requests; the
+                # request handler would close them (or return them to the pool) here.
+                close_old_connections()
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+
+        if pool:
+            connections['default'].pool.open(wait=True)  # start from a warm pool
+        started = time.perf_counter()
+        workers = [threading.Thread(target=client) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        connection_created.disconnect(counter)
+        if errors:
+            raise CommandError(f'GET {path} failed with status {errors[0]} ({len(errors)} errors)')
+
+        stats = pool_stats()['pools'].get('default', {}) if pool else {}
+        latencies.sort()
+        return {
+            'p50': statistics.median(latencies),
+            'p99': _percentile(latencies, 0.99),
+            'rps': len(latencies) / elapsed,
+            'connections': stats.get('connections_made', 0) if pool else len(opened),
+            'wait': stats.get('wait_ms', 0) / max(stats.get('requests', 0), 1),
+        }
@@ -0,0 +1,105 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from accounts.backends import EmailOrUsernameBackend
+
+
+User = get_user_model()
+PREFIX = 'bench-login-'
+PASSWORD = 'Bench-login-1'
+
+
+def legacy_login(identifier, password):
+    """The previous login path: email__iexact lookup, then ModelBackend by username."""
+    username = identifier
+    if '@' in identifier:
+        try:
+            username = User.objects.get(email__iexact=identifier).username
+        except User.DoesNotExist:
+            pass
+    return ModelBackend().authenticate(None, username=username, password=password)
+
+
+def backend_login(identifier, password):
+    return EmailOrUsernameBackend().authenticate(None, username=identifier, password=password)
+
+
+class Command(BaseCommand):
+    help = 'Measure queries and latency per login for the legacy and single-query login paths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000,
+                            help='Synthetic users to ensure exist (e.g. 1000000)')
+        parser.add_argument('--logins', type=int, default=2000, help='Logins per path')
+        parser.add_argument('--fast-hasher', action='store_true',
+                            help='Hash with MD5 so the lookup, not PBKDF2, dominates latency')
+        parser.add_argument('--cleanup', action='store_true', help='Delete the synthetic users afterwards')
+
+    def seed(self, total, hasher):
+        existing = User.objects.filter(username__startswith=PREFIX).count()
+        if existing >= total:
+            return
+        password = make_password(PASSWORD, hasher=hasher)
+        self.stdout.write(f'Creating {total - existing} users...')
+        batch = []
+        for i in range(existing, total):
+            batch.append(User(
+                username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@example.com',
+                password=password, role='PARENT',
+            ))
+            if len(batch) == 5000:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'ANALYZE {User._meta.db_table}')
+
+    def measure(self, login, identifiers):
+        latencies, queries = [], 0
+        for identifier in identifiers:
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                user = login(identifier, PASSWORD)
+                latencies.append(time.perf_counter() - start)
+            if user is None:
+                raise RuntimeError(f'Login failed for {identifier}')
+            queries += len(captured)
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        return queries / len(identifiers), statistics.median(latencies), p99
+
+    def handle(self, *args, **options):
+        hasher = 'md5' if options['fast_hasher'] else 'default'
+        hashers = ['django.contrib.auth.hashers.MD5PasswordHasher'] if options['fast_hasher'] else None
+        with override_settings(**({'PASSWORD_HASHERS': hashers} if hashers else {})):
+            self.seed(options['users'], hasher)
+
+            population = min(options['users'], User.objects.filter(username__startswith=PREFIX).count())
+            identifiers = []
+            for _ in range(options['logins']):
+                i = random.randrange(population)
+                # Half by email (in mixed case), half by username.
+                identifiers.append(f'{PREFIX}{i}@Example.com' if random.random() < 0.5 else f'{PREFIX}{i}')
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{len(identifiers)} logins against {population} synthetic users ({hasher} hasher)'
+            ))
+            for label, login in (('legacy', legacy_login), ('single-query', backend_login)):
+                per_login, p50, p99 = self.measure(login, identifiers)
+                self.stdout.write(
+                    f'  {label:<13} {per_login:4.2f} queries/login  '
+                    f'p50 {p50 * 1000:7.2f} ms  p99 {p99 * 1000:7.2f} ms'
+                )
+
+        if options['cleanup']:
+            deleted, _ = User.objects.filter(username__startswith=PREFIX).delete()
+            self.stdout.write(f'Deleted {deleted} rows')
@@ -0,0 +1,117 @@
+import io
+import timeit
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+
+from core.serializers import (
+    IEPSerializer, ParentInputSerializer, WeeklyProgressReportSerializer
+)
+
+
+# (renderer, parser) pairs; the first pair is the baseline for speedups and
+# the reference structure every other pair must round-trip to once its parsed
+# body is re-encoded by the first pair (msgpack keeps UUIDs, dates and Decimals).
+FORMATS = [
+    ('rest_framework.renderers.JSONRenderer', 'rest_framework.parsers.JSONParser'),
+    ('core.renderers.ORJSONRenderer', 'core.parsers.ORJSONParser'),
+    ('core.renderers.MessagePackRenderer', 'core.parsers.MessagePackParser'),
+]
+
+
+def fake_representation(serializer, fanout):
+    """
+    Build a payload shaped like serializer.data without touching the database.
+
+    Values are the *internal* Python types the serializer would emit when
+    fields are not coerced to strings (UUID, date, Decimal), so renderers are
+    exercised on the same types they meet in production.
+    """
+    data = {}
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            data[name] = [fake_representation(field.child, fanout) for _ in range(fanout)]
+        elif isinstance(field, serializers.BaseSerializer):
+            data[name] = fake_representation(field, fanout)
+        elif isinstance(field, (drf_fields.UUIDField, relations.RelatedField)):
+            data[name] = uuid.uuid4()
+        elif isinstance(field, drf_fields.DateTimeField):
+            data[name] = datetime(2025, 1, 6, 9, 30, tzinfo=timezone.utc).isoformat()
+        elif isinstance(field, drf_fields.DateField):
+            data[name] = date(2025, 1, 6).isoformat()
+        elif isinstance(field, drf_fields.DecimalField):
+            data[name] = Decimal('0.87')
+        elif isinstance(field, drf_fields.BooleanField):
+            data[name] = True
+        elif isinstance(field, drf_fields.IntegerField):
+            data[name] = 3
+        elif isinstance(field, drf_fields.JSONField):
+            data[name] = ['Communication', 'Motor Skills', 'Social Interaction']
+        else:
+            data[name] = f'Sample {name.replace("_", " ")} text for benchmarking.'
+    return data
+
+
+class Command(BaseCommand):
+    help = 'Compare API renderers and parsers on large IEP, weekly report and intake payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200, help='Top-level objects per payload')
+        parser.add_argument('--fanout', type=int, default=5, help='Items per nested list')
+        parser.add_argument('--repeat', type=int, default=20, help='Iterations per measurement')
+
+    def _time(self, func, repeat):
+        return min(timeit.repeat(func, number=repeat, repeat=3)) / repeat
+
+    def _as_reference(self, reference_format, parsed):
+        renderer, parser = reference_format
+        body = renderer.render(parsed, renderer.media_type, {})
+        return parser.parse(io.BytesIO(body), parser.media_type, {})
+
+    def handle(self, *args, **options):
+        rows, fanout, repeat = options['rows'], options['fanout'], options['repeat']
+        payloads = {
+            serializer_class.__name__: [
+                fake_representation(serializer_class(), fanout) for _ in range(rows)
+            ]
+            for serializer_class in (
+                IEPSerializer, WeeklyProgressReportSerializer, ParentInputSerializer
+            )
+        }
+        formats = [
+            (import_string(renderer)(), import_string(parser)())
+            for renderer, parser in FORMATS
+        ]
+
+        for label, payload in payloads.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{label}: {rows} rows x {fanout} nested items'
+            ))
+            reference = baseline = None
+            for renderer, parser in formats:
+                body = renderer.render(payload, renderer.media_type, {})
+                parsed = parser.parse(io.BytesIO(body), parser.media_type, {})
+                if reference is None:
+                    reference = parsed
+                round_trip = 'ok' if self._as_reference(formats[0], parsed) == reference else 'MISMATCH'
+
+                render_s = self._time(
+                    lambda: renderer.render(payload, renderer.media_type, {}), repeat
+                )
+                parse_s = self._time(
+                    lambda: parser.parse(io.BytesIO(body), parser.media_type, {}), repeat
+                )
+                if baseline is None:
+                    baseline = render_s
+                self.stdout.write(
+                    f'  {type(renderer).__name__:<22} render {render_s * 1000:8.2f} ms '
+                    f'(x{baseline / render_s:4.1f})  parse {parse_s * 1000:8.2f} ms  '
+                    f'{len(body) / 1024:8.1f} KiB  round-trip {round_trip}'
+                )
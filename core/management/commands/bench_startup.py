@@ -0,0 +1,159 @@
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.management.commands.bench_async import _children
+
+
+User = get_user_model()
+USERNAME = 'bench-startup'
+PID_PATH = '/api/db-pool/stats/'  # reports the pid of the worker that served it
+
+# mode -> gunicorn arguments before the bind address
+MODES = {
+    'plain': ['ara.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker'],
+    'preload': ['--config', 'python:ara.gunicorn_conf', 'ara.asgi:application'],
+}
+
+
+def _memory(pid):
+    """Rss, Pss and Private (USS) of one process in bytes, from /proc."""
+    values = {'Rss': 0, 'Pss': 0, 'Private': 0}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss'):
+                    values[key] = int(rest.split()[0]) * 1024
+                elif key in ('Private_Clean', 'Private_Dirty'):
+                    values['Private'] += int(rest.split()[0]) * 1024
+    except OSError:
+        pass
+    return values
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare startup time, first-request latency and per-worker memory of gunicorn '
+        'with and without ara.gunicorn_conf (preload, warm-up, gc.freeze); Linux only'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/users/me/', help='GET path to time')
+        parser.add_argument('--modes', default=','.join(MODES),
+                            help=f'Comma-separated subset of {", ".join(MODES)}')
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=100, help='Requests after every worker has served one')
+        parser.add_argument('--settle', type=float, default=5,
+                            help='Seconds to let every worker boot before the first-request timings')
+        parser.add_argument('--port', type=int, default=8711)
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f'Unknown mode(s): {", ".join(sorted(unknown))}')
+
+        user, _ = User.objects.get_or_create(
+            username=USERNAME,
+            defaults={'email': f'{USERNAME}@example.com', 'role': 'ADMIN', 'is_staff': True},
+        )
+        if not user.is_staff:
+            User.objects.filter(pk=user.pk).update(is_staff=True)
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}', 'Accept': 'application/json'}
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"GET {options['path']}, {options['workers']} workers, {options['requests']} requests"
+        ))
+        for offset, mode in enumerate(modes):
+            port = options['port'] + offset
+            started = time.monotonic()
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', *MODES[mode], '--bind', f'127.0.0.1:{port}',
+                 '--workers', str(options['workers']), '--log-level', 'warning'],
+                env=os.environ.copy(),
+            )
+            try:
+                answered, warmed = self.wait_for_response(server, port, options['path'], headers)
+                startup = answered - started
+                time.sleep(options['settle'])
+                first, later = self.first_requests(port, options['path'], headers, options['workers'], warmed)
+                for _ in range(options['requests']):
+                    later.append(self.timed_get(port, options['path'], headers)[0])
+                memory = {pid: _memory(pid) for pid in _children(server.pid)}
+            finally:
+                server.terminate()
+                server.wait(timeout=30)
+            self.report(mode, server.pid, startup, first, later, memory)
+
+    def timed_get(self, port, path, headers, then=None):
+        """Latency (ms) of GET `path` on a new connection, and the response to `then` on the same one."""
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        try:
+            started = time.perf_counter()
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status != 200:
+                raise CommandError(f'GET {path} returned {response.status}')
+            if then is None:
+                return elapsed, None
+            connection.request('GET', then, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200:
+                raise CommandError(f'GET {then} returned {response.status}')
+            return elapsed, body
+        finally:
+            connection.close()
+
+    def wait_for_response(self, server, port, path, headers):
+        """When the server first answered `path`, and the pid of the worker that did."""
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'gunicorn exited with status {server.returncode}')
+            try:
+                _, body = self.timed_get(port, path, headers, then=PID_PATH)
+                return time.monotonic(), json.loads(body)['pid']
+            except OSError:
+                time.sleep(0.05)
+        server.terminate()
+        raise CommandError(f'The server did not answer on port {port}')
+
+    def first_requests(self, port, path, headers, workers, warmed):
+        """The latency of the first `path` request in each worker but `warmed`, and of the rest."""
+        first, later = {}, []
+        for _ in range(workers * 20):
+            if len(first) >= workers - 1:
+                break
+            elapsed, body = self.timed_get(port, path, headers, then=PID_PATH)
+            pid = json.loads(body)['pid']
+            if pid == warmed or pid in first:
+                later.append(elapsed)
+            else:
+                first[pid] = elapsed
+        return list(first.values()), later
+
+    def report(self, mode, master, startup, first, later, memory):
+        workers = [values for pid, values in memory.items() if pid != master]
+        per_worker = lambda key: statistics.mean(v[key] for v in workers) / 2**20 if workers else 0  # noqa: E731
+        self.stdout.write(
+            f'  {mode:<8} startup {startup:6.2f} s  '
+            f'first request {statistics.mean(first) if first else float("nan"):7.1f} ms  '
+            f'later p50 {statistics.median(later) if later else float("nan"):6.1f} ms'
+        )
+        self.stdout.write(
+            f'           per worker: RSS {per_worker("Rss"):6.1f} MiB  '
+            f'PSS {per_worker("Pss"):6.1f} MiB  private {per_worker("Private"):6.1f} MiB  '
+            f'total PSS {sum(v["Pss"] for v in memory.values()) / 2**20:6.1f} MiB'
+        )
@@ -0,0 +1,68 @@
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired sessions and expired JWT outstanding tokens (with their '
+        'blacklist entries) in small batches, so no statement holds long locks'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count expired rows')
+        parser.add_argument(
+            '--every', type=float, default=None,
+            help='Keep running and compact again every N seconds (for a periodic worker)'
+        )
+
+    def expired_querysets(self, now):
+        if apps.is_installed('django.contrib.sessions'):
+            from django.contrib.sessions.models import Session
+            yield 'sessions', Session.objects.filter(expire_date__lt=now)
+        if apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+            from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+            yield 'outstanding tokens', OutstandingToken.objects.filter(expires_at__lte=now)
+
+    def compact(self, queryset, batch_size, pause):
+        """Delete matching rows batch by batch; return deleted counts per model."""
+        deleted = Counter()
+        while True:
+            ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                _, per_model = queryset.model.objects.filter(pk__in=ids).delete()
+            deleted.update(per_model)
+            if len(ids) < batch_size:
+                break
+            time.sleep(pause)
+        return deleted
+
+    def handle(self, *args, **options):
+        while True:
+            self.run_once(options)
+            if options['every'] is None:
+                break
+            time.sleep(options['every'])
+
+    def run_once(self, options):
+        now = timezone.now()
+        for label, queryset in self.expired_querysets(now):
+            if options['dry_run']:
+                self.stdout.write(f'{label}: {queryset.count()} expired')
+                continue
+
+            deleted = self.compact(queryset, options['batch_size'], options['pause'])
+            summary = ', '.join(f'{count} {model}' for model, count in sorted(deleted.items()))
+            self.stdout.write(self.style.SUCCESS(f'{label}: deleted {summary or "nothing"}'))
+            if deleted.get('token_blacklist.BlacklistedToken'):
+                # Let every process drop the deleted JTIs from its Bloom filter.
+                from accounts.tokens import blacklist_filter
+                blacklist_filter.new_epoch()
@@ -0,0 +1,61 @@
+import csv
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.roster import COLUMNS, RosterError, import_roster
+
+
+class Command(BaseCommand):
+    help = (
+        'Import parents and children from a roster CSV with COPY and set-based merges '
+        f'(PostgreSQL). Columns: {", ".join(COLUMNS)}'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help="Roster CSV file ('-' for stdin)")
+        parser.add_argument('--dry-run', action='store_true', help='Validate and report, then roll back')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Password hashing processes (default: one per CPU)')
+        parser.add_argument('--invites', metavar='FILE',
+                            help='Write email,token for parents created without a password to FILE')
+        parser.add_argument('--max-errors', type=int, default=50, help='Row errors to print')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            if options['csv_file'] == '-':
+                report = import_roster(sys.stdin, dry_run=options['dry_run'], processes=options['processes'])
+            else:
+                with open(options['csv_file'], newline='', encoding='utf-8-sig') as stream:
+                    report = import_roster(stream, dry_run=options['dry_run'], processes=options['processes'])
+        except (OSError, RosterError) as exc:
+            raise CommandError(str(exc))
+        elapsed = time.monotonic() - started
+
+        for error in report['errors'][:options['max_errors']]:
+            self.stderr.write(f"  row {error['row']}: {error['error']}")
+        if len(report['errors']) > options['max_errors']:
+            self.stderr.write(f"  ... and {len(report['errors']) - options['max_errors']} more")
+
+        if report['invites'] and options['invites']:
+            with open(options['invites'], 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['email', 'token'])
+                writer.writerows((invite['email'], invite['token']) for invite in report['invites'])
+
+        prefix = 'Dry run: would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {report['rows']} row(s) in {elapsed:.1f}s: "
+            f"{report['parents_created']} new parent(s), {report['parents_matched']} existing, "
+            f"{report['children_created']} new child(ren), {report['children_existing']} already present, "
+            f"{len(report['errors'])} row(s) with errors"
+        ))
+        if report['invites'] and not options['invites']:
+            self.stdout.write(self.style.WARNING(
+                f"{len(report['invites'])} parent(s) were created without a password; "
+                'send each their invite token (email,token):'
+            ))
+            for invite in report['invites']:
+                self.stdout.write(f"{invite['email']},{invite['token']}")
@@ -0,0 +1,119 @@
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connections
+
+from core import jobs
+from core.dbpool import close_pools
+
+
+logger = logging.getLogger(__name__)
+
+class Stop:
+    """Set from a signal handler; checked between jobs. (Never touch locks in a handler.)"""
+    requested = False
+
+    @classmethod
+    def request(cls, *args):
+        cls.requested = True
+
+
+def work(worker_id, poll, batch, max_jobs):
+    """Worker process: claim and run jobs until SIGTERM or `max_jobs` is reached."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the supervisor handles Ctrl-C
+    signal.signal(signal.SIGTERM, Stop.request)
+    done = 0
+    while not Stop.requested and (not max_jobs or done < max_jobs):
+        close_old_connections()
+        try:
+            claimed = jobs.claim(worker_id, limit=batch)
+        except DatabaseError:
+            logger.exception('Worker %s could not claim jobs', worker_id)
+            connections.close_all()
+            claimed = []
+        if not claimed:
+            time.sleep(poll)
+            continue
+        for job in claimed:
+            jobs.run(job)
+            done += 1
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers: a supervisor and a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int,
+                            default=getattr(settings, 'JOB_WORKER_PROCESSES', os.cpu_count() or 1),
+                            help='Worker processes')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--batch', type=int, default=1, help='Jobs claimed per query')
+        parser.add_argument('--max-jobs', type=int, default=1000,
+                            help='Replace a worker after this many jobs (0 = never)')
+        parser.add_argument('--once', action='store_true',
+                            help='Run ready jobs in this process until the queue is empty, then exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self.drain(options)
+            return
+
+        context = multiprocessing.get_context('fork')
+        host = socket.gethostname()
+        workers = {}
+
+        def start(slot):
+            close_pools()  # the supervisor's own connections and pools must not cross the fork
+            worker_id = f'{host}:{os.getpid()}:{slot}'
+            process = context.Process(
+                target=work, name=f'job-worker-{slot}',
+                args=(worker_id, options['poll'], options['batch'], options['max_jobs']),
+            )
+            process.start()
+            workers[slot] = process
+
+        signal.signal(signal.SIGINT, Stop.request)
+        signal.signal(signal.SIGTERM, Stop.request)
+        for slot in range(options['processes']):
+            start(slot)
+        self.stdout.write(f'Started {options["processes"]} job workers (pid {os.getpid()})')
+        self.stdout.flush()
+
+        reap_every = getattr(settings, 'JOB_REAP_INTERVAL', 60)
+        next_reap = 0
+        while not Stop.requested:
+            if time.monotonic() >= next_reap:
+                reaped = jobs.reap_stale()
+                close_old_connections()
+                if reaped:
+                    self.stdout.write(f'Requeued {reaped} stale job(s)')
+                next_reap = time.monotonic() + reap_every
+            for slot, process in list(workers.items()):
+                if not process.is_alive():
+                    process.join()
+                    start(slot)  # recycled after max_jobs, or crashed
+            time.sleep(1)
+
+        self.stdout.write('Stopping job workers after their current job...')
+        for process in workers.values():
+            if process.is_alive():
+                process.terminate()  # SIGTERM: finish the current job, then exit
+        for process in workers.values():
+            process.join()
+        connections.close_all()
+
+    def drain(self, options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}:once'
+        done = 0
+        while claimed := jobs.claim(worker_id, limit=options['batch']):
+            for job in claimed:
+                jobs.run(job)
+                done += 1
+        self.stdout.write(f'Ran {done} job(s)')
@@ -0,0 +1,89 @@
+"""
+Workload-aware specialist ranking for a child.
+
+Each active specialist is scored on three signals, each scaled to 0..1:
+
+- concerns:   share of the child's ParentInput.areas_of_concern found in the
+              specialist's focus_areas (case-insensitive)
+- load:       1 / (1 + open requests), where open means PENDING or APPROVED
+- experience: years_experience, capped at EXPERIENCE_CAP years
+
+The score is their weighted sum. All specialists are scored in one pass over
+prefetched rows. Load counts come from per-specialist cache counters that are
+filled by one grouped COUNT for the misses. AssessmentRequest saves and bulk
+transitions invalidate them, and they expire after LOAD_TIMEOUT regardless.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.models import AssessmentRequest, ParentInput
+
+
+WEIGHTS = {'concerns': 0.5, 'load': 0.3, 'experience': 0.2}
+EXPERIENCE_CAP = 20
+OPEN_STATUSES = ('PENDING', 'APPROVED')
+LOAD_TIMEOUT = 300
+
+
+def _load_key(specialist_id):
+    return f'specialist-load:{specialist_id}'
+
+
+def specialist_loads(specialist_ids):
+    """{specialist id: open request count}, from the cache where possible."""
+    keys = {_load_key(pk): pk for pk in specialist_ids}
+    cached = cache.get_many(list(keys))
+    loads = {keys[key]: count for key, count in cached.items()}
+
+    missing = [pk for pk in specialist_ids if pk not in loads]
+    if missing:
+        counted = dict(
+            AssessmentRequest.objects.filter(specialist_id__in=missing, status__in=OPEN_STATUSES)
+            .order_by().values_list('specialist_id').annotate(n=Count('pk'))
+        )
+        fresh = {pk: counted.get(pk, 0) for pk in missing}
+        cache.set_many({_load_key(pk): n for pk, n in fresh.items()}, LOAD_TIMEOUT)
+        loads.update(fresh)
+    return loads
+
+
+def invalidate_loads(specialist_ids):
+    cache.delete_many([_load_key(pk) for pk in set(specialist_ids)])
+
+
+def child_concerns(child):
+    """areas_of_concern from the child's latest parent input."""
+    concerns = (
+        ParentInput.objects.filter(child=child).order_by('-submission_date')
+        .values_list('areas_of_concern', flat=True).first()
+    )
+    if not isinstance(concerns, list):
+        return set()
+    return {str(area).strip().casefold() for area in concerns if str(area).strip()}
+
+
+def rank_specialists(specialists, concerns):
+    """Return [(specialist, score, breakdown)] sorted best first."""
+    specialists = list(specialists)
+    loads = specialist_loads([s.pk for s in specialists])
+
+    ranked = []
+    for specialist in specialists:
+        focus = {str(area).strip().casefold(): str(area).strip() for area in (specialist.focus_areas or [])}
+        matched = sorted(focus[area] for area in concerns & focus.keys())
+        load = loads.get(specialist.pk, 0)
+        signals = {
+            'concerns': len(matched) / len(concerns) if concerns else 0.0,
+            'load': 1 / (1 + load),
+            'experience': min(specialist.years_experience or 0, EXPERIENCE_CAP) / EXPERIENCE_CAP,
+        }
+        score = sum(WEIGHTS[name] * value for name, value in signals.items())
+        breakdown = {
+            **{name: round(value, 4) for name, value in signals.items()},
+            'matched_areas': matched,
+            'open_requests': load,
+        }
+        ranked.append((specialist, round(score, 4), breakdown))
+
+    ranked.sort(key=lambda item: (-item[1], item[0].last_name, item[0].first_name))
+    return ranked
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:49
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+EXCLUSION_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS btree_gist',
+    '''
+    ALTER TABLE core_assessmentbooking
+    ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist (
+        specialist_id WITH =,
+        tstzrange(starts_at, ends_at, '[)') WITH &&
+    ) WHERE (status = 'BOOKED')
+    ''',
+]
+
+
+def add_booking_exclusion(apps, schema_editor):
+    # Other backends rely on the row lock in core.scheduling.book_slot alone.
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in EXCLUSION_SQL:
+            schema_editor.execute(sql)
+
+
+def remove_booking_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE core_assessmentbooking DROP CONSTRAINT IF EXISTS booking_no_overlap'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_user_lower_email_username_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentBooking',
+            fields=[
+                ('booking_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('BOOKED', 'Booked'), ('CANCELLED', 'Cancelled')], default='BOOKED', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('assessment_request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='booking', to='core.assessmentrequest')),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessment_bookings', to='core.child')),
+                ('specialist', models.ForeignKey(limit_choices_to={'role': 'SPECIALIST'}, on_delete=django.db.models.deletion.PROTECT, related_name='assessment_bookings', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['starts_at'],
+                'indexes': [models.Index(fields=['specialist', 'starts_at'], name='core_assess_special_3d7eca_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('ends_at__gt', models.F('starts_at'))), name='booking_end_after_start')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AvailabilityException',
+            fields=[
+                ('exception_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('start_time', models.TimeField(blank=True, null=True)),
+                ('end_time', models.TimeField(blank=True, null=True)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('specialist', models.ForeignKey(limit_choices_to={'role': 'SPECIALIST'}, on_delete=django.db.models.deletion.CASCADE, related_name='availability_exceptions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date', 'start_time'],
+                'indexes': [models.Index(fields=['specialist', 'date'], name='core_availa_special_803c5d_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SpecialistAvailability',
+            fields=[
+                ('availability_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('slot_minutes', models.PositiveIntegerField(default=60, validators=[django.core.validators.MinValueValidator(15)])),
+                ('valid_from', models.DateField(blank=True, null=True)),
+                ('valid_until', models.DateField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('specialist', models.ForeignKey(limit_choices_to={'role': 'SPECIALIST'}, on_delete=django.db.models.deletion.CASCADE, related_name='availability_slots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['weekday', 'start_time'],
+                'indexes': [models.Index(fields=['specialist', 'weekday'], name='core_specia_special_cc3c71_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('end_time__gt', models.F('start_time'))), name='availability_end_after_start')],
+            },
+        ),
+        migrations.RunPython(add_booking_exclusion, remove_booking_exclusion),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_specialist_availability'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assessmentrequest',
+            index=models.Index(fields=['specialist', 'status', 'created_at'], name='core_assess_special_bd03d3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='child',
+            index=models.Index(fields=['assessment_status', 'intake_status'], name='core_child_assessm_a9d196_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:10
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIGeneratedContent',
+            fields=[
+                ('content_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('generation_type', models.CharField(choices=[('IEP_GENERATION', 'IEP Generation'), ('GOAL_CREATION', 'Goal Creation'), ('PROGRESS_REPORT', 'Progress Report'), ('GRAMMAR_CORRECTION', 'Grammar Correction')], max_length=50)),
+                ('ai_model_version', models.CharField(blank=True, max_length=100)),
+                ('content', models.JSONField(default=dict)),
+                ('confidence_score', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('hits', models.PositiveIntegerField(default=0, help_text='Requests answered from this row')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'AI generated content',
+            },
+        ),
+        migrations.AddField(
+            model_name='aigenerationlog',
+            name='cache_hit',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='aigenerationlog',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='aigenerationlog',
+            name='duration_ms',
+            field=models.PositiveIntegerField(blank=True, help_text='Wall time of the generator call; 0 for cache hits', null=True),
+        ),
+        migrations.AddField(
+            model_name='aigenerationlog',
+            name='requested_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requested_generations', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
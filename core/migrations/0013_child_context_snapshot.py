@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# JSONB is TOAST-compressed only past ~2 kB; a lower tuple target compresses
+# typical context documents too, and lz4 (PostgreSQL 14+, when built with it)
+# decompresses faster than the default pglz.
+COMPRESSION_SQL = """
+ALTER TABLE core_childcontextsnapshot SET (toast_tuple_target = 256);
+DO $$
+BEGIN
+    ALTER TABLE core_childcontextsnapshot ALTER COLUMN data SET COMPRESSION lz4;
+EXCEPTION WHEN syntax_error OR feature_not_supported OR invalid_parameter_value THEN
+    NULL;
+END $$;
+"""
+
+
+def compress_snapshots(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(COMPRESSION_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_ai_generation_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChildContextSnapshot',
+            fields=[
+                ('child', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='context_snapshot', serialize=False, to='core.child')),
+                ('context_version', models.PositiveSmallIntegerField(help_text='core.context.CONTEXT_VERSION it was built with')),
+                ('version', models.PositiveIntegerField(default=1, help_text='Bumped whenever the content changes')),
+                ('digest', models.CharField(max_length=64)),
+                ('data', models.JSONField(default=dict)),
+                ('built_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(compress_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,351 @@
+"""
+Viewset mixins shared by the core API.
+"""
+import copy
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Prefetch
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import exceptions
+from rest_framework.response import Response
+
+from core.cache import collection_versions, fragment_key, fragment_timeout, fragment_version
+from core.cache import record as record_fragment
+from core.checks import select_related_paths, serializer_relations
+
+
+# ==================== SPARSE FIELDSETS ====================
+class SparseFieldsetMixin:
+    """
+    Sparse fieldsets and compact list representations.
+
+    - `list_serializer_class` (optional) is used for the `list` action.
+    - `?fields=a,b` keeps only the named fields, `?omit=a,b` drops fields and
+      `?expand=a,b` adds nested fields declared on the serializer class but
+      left out of its Meta.fields (e.g. `eligibilities` on ChildListSerializer).
+
+    Unknown names in any of the three parameters are a 400.
+
+    On list/retrieve the filtered queryset is trimmed to the rendered fields:
+    joins and prefetches the serializer no longer reads are dropped and the
+    row is narrowed with `.only()`. Trimming happens in filter_queryset(), so
+    a get_queryset() that reads rows itself still loads them whole. A field
+    whose source is not a model field (a SerializerMethodField or property)
+    disables `.only()` unless the serializer lists its columns in
+    `Meta.computed_from = {'age': ['date_of_birth']}`.
+    """
+    list_serializer_class = None
+    sparse_actions = ('list', 'retrieve')
+
+    def get_serializer_class(self):
+        if self.action == 'list' and self.list_serializer_class is not None:
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def _sparse_param(self, name):
+        request = getattr(self, 'request', None)
+        if request is None:
+            return set()
+        raw = request.query_params.get(name, '')
+        return {part.strip() for part in raw.split(',') if part.strip()}
+
+    def sparse_enabled(self):
+        request = getattr(self, 'request', None)
+        return (
+            request is not None
+            and request.method == 'GET'
+            and self.action in self.sparse_actions
+        )
+
+    def apply_sparse_fieldset(self, serializer):
+        """Add expanded fields and drop unrequested ones, in place."""
+        fields = self._sparse_param('fields')
+        omit = self._sparse_param('omit')
+        expand = self._sparse_param('expand')
+
+        declared = getattr(type(serializer), '_declared_fields', {})
+        known = set(serializer.fields) | set(declared)
+        unknown = {'fields': fields - known, 'omit': omit - known, 'expand': expand - known}
+        errors = {
+            param: [f'Unknown field(s): {", ".join(sorted(names))}.']
+            for param, names in unknown.items() if names
+        }
+        if errors:
+            raise exceptions.ValidationError(errors)
+
+        for name in expand:
+            if name not in serializer.fields and name in declared:
+                serializer.fields[name] = copy.deepcopy(declared[name])
+
+        for name in list(serializer.fields):
+            if (fields and name not in fields and name not in expand) or name in omit:
+                serializer.fields.pop(name)
+        return serializer
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.sparse_enabled():
+            self.apply_sparse_fieldset(getattr(serializer, 'child', serializer))
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self.sparse_enabled():
+            return queryset
+
+        serializer_class = self.get_serializer_class()
+        prototype = self.apply_sparse_fieldset(
+            serializer_class(context=self.get_serializer_context())
+        )
+        return trim_queryset(queryset, prototype)
+
+
+def trim_queryset(queryset, serializer):
+    """Narrow a queryset to the joins, prefetches and columns a serializer reads."""
+    model = queryset.model
+    needed_select, needed_prefetch = set(), set()
+    for kind, path in serializer_relations(serializer, model):
+        (needed_select if kind == 'select' else needed_prefetch).add(path)
+
+    if isinstance(queryset.query.select_related, dict):
+        keep = [
+            path for path in select_related_paths(queryset.query.select_related)
+            if path in needed_select
+        ]
+        queryset = queryset.select_related(None)
+        if keep:
+            queryset = queryset.select_related(*keep)
+
+    lookups = queryset._prefetch_related_lookups
+    if lookups:
+        roots = {path.split('__')[0] for path in needed_prefetch}
+        keep = [
+            lookup for lookup in lookups
+            if (lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup).split('__')[0] in roots
+        ]
+        queryset = queryset.prefetch_related(None)
+        if keep:
+            queryset = queryset.prefetch_related(*keep)
+
+    columns = _required_columns(serializer, model)
+    concrete = {field.name for field in model._meta.concrete_fields}
+    if columns is not None and columns < concrete:
+        # Joined relations must stay loaded, or only() refuses the select_related.
+        joined = set(select_related_paths(queryset.query.select_related)) \
+            if isinstance(queryset.query.select_related, dict) else set()
+        queryset = queryset.only(*(columns | {p for p in joined if '__' not in p}))
+    return queryset
+
+
+def _required_columns(serializer, model):
+    """
+    Return the set of local field names the serializer reads, or None if any
+    field resolves to something other than a model field.
+    """
+    computed = getattr(getattr(serializer, 'Meta', None), 'computed_from', {})
+    columns = {model._meta.pk.name}
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if name in computed:
+            columns.update(computed[name])
+            continue
+        if not field.source_attrs:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if model_field.concrete:
+            columns.add(model_field.name)
+        elif not model_field.is_relation:
+            return None
+    return columns
+
+
+# ==================== CONDITIONAL GET ====================
+class DetailStampMixin:
+    """
+    Cheap per-request lookup of a detail row's `last_modified_field`.
+
+    The lookup runs against the filtered queryset, so it doubles as the row
+    visibility check for code paths that skip get_object().
+    """
+    last_modified_field = 'updated_at'
+
+    def _model(self):
+        queryset = self.queryset if self.queryset is not None else self.get_queryset()
+        return queryset.model
+
+    def _has_last_modified_field(self):
+        model = self._model()
+        try:
+            model._meta.get_field(self.last_modified_field)
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    def get_detail_stamp(self):
+        """Return (pk, last_modified) for the requested row, or None."""
+        if hasattr(self, '_detail_stamp'):
+            return self._detail_stamp
+
+        self._detail_stamp = None
+        if not self._has_last_modified_field():
+            return None
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        try:
+            row = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            ).values_list('pk', self.last_modified_field).first()
+        except (TypeError, ValueError, ValidationError):
+            # Malformed lookup; let get_object() produce the usual 404.
+            return None
+        self._detail_stamp = row
+        return row
+
+
+class ConditionalGetMixin(DetailStampMixin):
+    """
+    ETag / Last-Modified for list and retrieve, answered before serializing.
+
+    The models a response reads are the viewset's model, the relations its
+    queryset joins or prefetches and those the (sparse, expanded) serializer
+    follows. A list ETag comes from the collection stamps of all of them; it
+    costs no query, and lists carry no Last-Modified. A detail ETag comes
+    from the row's `last_modified_field`, its fragment version (see
+    core.cache) and the collection stamps of the related models, so a
+    change to any row it embeds or names also changes it. Both are salted
+    with the model, the requesting user, the negotiated media type and the
+    query string (fields, omit, expand, filters, page), so a sparse fieldset
+    or msgpack response never matches a JSON ETag. A matching If-None-Match /
+    If-Modified-Since gets 304 Not Modified.
+
+    Viewsets whose model has no `last_modified_field` are left untouched.
+    """
+
+    def _etag(self, *parts):
+        request = self.request
+        accepted = getattr(request, 'accepted_media_type', '') or ''
+        salt = [
+            self._model()._meta.label_lower,
+            str(getattr(request.user, 'pk', '')),
+            accepted,
+            request.META.get('QUERY_STRING', ''),
+        ]
+        digest = hashlib.sha1('|'.join(salt + [str(p) for p in parts]).encode()).hexdigest()
+        return f'W/"{digest}"'
+
+    def get_detail_validators(self):
+        row = self.get_detail_stamp()
+        if row is None or row[1] is None:
+            return None
+        pk, last_modified = row
+        model = self._model()
+        version = fragment_version(model._meta.label_lower, pk)
+        return self._etag(pk, last_modified.isoformat(), version, *self._collection_stamps(
+            related for related in self.get_response_models() if related is not model
+        )), last_modified
+
+    def get_response_models(self):
+        """The models a list or detail response reads, for its ETag."""
+        model = self._model()
+        paths = set()
+        if self.queryset is not None:  # not get_queryset(), which may read rows
+            paths |= select_related_paths(self.queryset.query.select_related)
+            paths |= {
+                lookup.prefetch_to if isinstance(lookup, Prefetch) else lookup
+                for lookup in self.queryset._prefetch_related_lookups
+            }
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        if hasattr(self, 'apply_sparse_fieldset') and self.sparse_enabled():
+            self.apply_sparse_fieldset(serializer)
+        paths |= {path for _, path in serializer_relations(serializer, model)}
+
+        models = {model}
+        for path in paths:
+            current = model
+            for attr in path.split('__'):
+                try:
+                    current = current._meta.get_field(attr).related_model
+                except FieldDoesNotExist:
+                    break
+                if current is None:
+                    break
+                models.add(current)
+        return models
+
+    def _collection_stamps(self, models):
+        labels = sorted(model._meta.label_lower for model in models)
+        versions = collection_versions(labels)
+        return [f'{label}={versions[label]}' for label in labels]
+
+    def get_list_validators(self):
+        if not self._has_last_modified_field():
+            return None
+        return self._etag(*self._collection_stamps(self.get_response_models())), None
+
+    def _conditional(self, request, validators, handler, *args, **kwargs):
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = validators
+        last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+        not_modified = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified_ts
+        )
+        response = not_modified or handler(request, *args, **kwargs)
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response.headers['ETag'] = etag
+            if last_modified_ts is not None:
+                response.headers['Last-Modified'] = http_date(last_modified_ts)
+            patch_vary_headers(response, ['Accept', 'Authorization'])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, self.get_list_validators(), super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, self.get_detail_validators(), super().retrieve, *args, **kwargs)
+
+
+# ==================== FRAGMENT CACHE ====================
+class FragmentCacheMixin(DetailStampMixin):
+    """
+    Serve retrieve() from the versioned fragment cache (core.cache).
+
+    The row lookup shared with ConditionalGetMixin confirms the row is visible
+    to the requester and supplies `updated_at`; on a hit the serializer and its
+    nested prefetches never run.
+    """
+    fragment_variant_params = ('fields', 'omit', 'expand')
+
+    def get_fragment_variant(self):
+        params = self.request.query_params
+        parts = [self.get_serializer_class().__name__] + [
+            f'{name}={params.get(name, "")}' for name in self.fragment_variant_params
+        ]
+        return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+    def retrieve(self, request, *args, **kwargs):
+        row = self.get_detail_stamp()
+        if row is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        label = self._model()._meta.label_lower
+        pk, last_modified = row
+        key = fragment_key(label, pk, last_modified, self.get_fragment_variant())
+        data = cache.get(key)
+        if data is not None:
+            record_fragment(label, 'hit')
+            return Response(data)
+
+        record_fragment(label, 'miss')
+        response = super().retrieve(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, dict(response.data), fragment_timeout())
+        return response
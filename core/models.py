@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -60,6 +61,9 @@ class User(AbstractUser):
         indexes = [
             models.Index(fields=['role']),
             models.Index(fields=['email']),
+            # Case-insensitive login lookups (accounts.backends)
+            models.Index(Lower('email'), name='core_user_email_lower_idx'),
+            models.Index(Lower('username'), name='core_user_username_lower_idx'),
         ]
 
     def __str__(self):
@@ -126,6 +130,7 @@ class Child(models.Model):
         indexes = [
             models.Index(fields=['parent']),
             models.Index(fields=['date_of_birth']),
+            models.Index(fields=['assessment_status', 'intake_status']),
         ]
         ordering = ['first_name', 'last_name']
     
@@ -178,12 +183,106 @@ class AssessmentRequest(models.Model):
             models.Index(fields=["child"]),
             models.Index(fields=["specialist"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["specialist", "status", "created_at"]),
         ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return f"Assessment request for {self.child} → {self.specialist} ({self.status})"
 
+# ==================== SPECIALIST AVAILABILITY ====================
+class SpecialistAvailability(models.Model):
+    """A recurring weekly window, split into bookable slots of `slot_minutes`."""
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+        (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday'),
+    ]
+
+    availability_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    specialist = models.ForeignKey(User, on_delete=models.CASCADE,
+                                   related_name='availability_slots',
+                                   limit_choices_to={'role': 'SPECIALIST'})
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_minutes = models.PositiveIntegerField(default=60, validators=[MinValueValidator(15)])
+    valid_from = models.DateField(blank=True, null=True)
+    valid_until = models.DateField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['specialist', 'weekday'])]
+        ordering = ['weekday', 'start_time']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_time__gt=models.F('start_time')),
+                name='availability_end_after_start',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.specialist} - {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+
+class AvailabilityException(models.Model):
+    """Time off: the whole day when no times are given, else that window."""
+    exception_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    specialist = models.ForeignKey(User, on_delete=models.CASCADE,
+                                   related_name='availability_exceptions',
+                                   limit_choices_to={'role': 'SPECIALIST'})
+    date = models.DateField()
+    start_time = models.TimeField(blank=True, null=True)
+    end_time = models.TimeField(blank=True, null=True)
+    reason = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['specialist', 'date'])]
+        ordering = ['date', 'start_time']
+
+    def __str__(self):
+        return f"{self.specialist} unavailable {self.date}"
+
+
+class AssessmentBooking(models.Model):
+    """
+    A booked assessment slot. On PostgreSQL an exclusion constraint on
+    tstzrange(starts_at, ends_at) keeps a specialist's BOOKED rows disjoint.
+    """
+    STATUS_CHOICES = [
+        ('BOOKED', 'Booked'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+
+    booking_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    specialist = models.ForeignKey(User, on_delete=models.PROTECT,
+                                   related_name='assessment_bookings',
+                                   limit_choices_to={'role': 'SPECIALIST'})
+    child = models.ForeignKey(Child, on_delete=models.CASCADE, related_name='assessment_bookings')
+    assessment_request = models.OneToOneField(AssessmentRequest, on_delete=models.CASCADE,
+                                              related_name='booking')
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='BOOKED')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['specialist', 'starts_at'])]
+        ordering = ['starts_at']
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(ends_at__gt=models.F('starts_at')),
+                name='booking_end_after_start',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.child} with {self.specialist} at {self.starts_at}"
+
 # ==================== CHILDREN ELIGIBILITY ====================
 class ChildrenEligibility(models.Model):
     ELIGIBILITY_TYPES = [
@@ -1046,6 +1145,12 @@ class AIGenerationLog(models.Model):
     confidence_score = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
     human_review_status = models.CharField(max_length=20, choices=REVIEW_STATUS, blank=True)
     reviewer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='requested_generations')
+    content_hash = models.CharField(max_length=64, blank=True)
+    cache_hit = models.BooleanField(default=False)
+    duration_ms = models.PositiveIntegerField(blank=True, null=True,
+                                              help_text="Wall time of the generator call; 0 for cache hits")
     generated_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -1054,3 +1159,89 @@ class AIGenerationLog(models.Model):
     
     def __str__(self):
         return f"{self.get_generation_type_display()} - {self.generated_at}"
+
+
+class AIGeneratedContent(models.Model):
+    """Generator output, keyed by the hash of its request (see core.generation)."""
+    content_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    content_hash = models.CharField(max_length=64, unique=True)
+    generation_type = models.CharField(max_length=50, choices=AIGenerationLog.GENERATION_TYPES)
+    ai_model_version = models.CharField(max_length=100, blank=True)
+    content = models.JSONField(default=dict)
+    confidence_score = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
+    hits = models.PositiveIntegerField(default=0, help_text="Requests answered from this row")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name_plural = "AI generated content"
+
+    def __str__(self):
+        return f"{self.get_generation_type_display()} ({self.ai_model_version}) {self.content_hash[:12]}"
+
+
+class ChildContextSnapshot(models.Model):
+    """A child's materialized context document for IEP generation (see core.context)."""
+    child = models.OneToOneField(Child, on_delete=models.CASCADE, primary_key=True,
+                                 related_name='context_snapshot')
+    context_version = models.PositiveSmallIntegerField(help_text="core.context.CONTEXT_VERSION it was built with")
+    version = models.PositiveIntegerField(default=1, help_text="Bumped whenever the content changes")
+    digest = models.CharField(max_length=64)
+    data = models.JSONField(default=dict)
+    built_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Context of {self.child_id} v{self.version}"
+
+
+# ==================== BACKGROUND JOBS ====================
+class Job(models.Model):
+    """A unit of background work, claimed by `manage.py run_workers` (see core.jobs)."""
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+    ACTIVE_STATUSES = ('QUEUED', 'RUNNING')
+
+    job_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='QUEUED')
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    run_at = models.DateTimeField(default=timezone.now)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    dedup_key = models.CharField(max_length=200, blank=True, null=True,
+                                 help_text="At most one queued or running job per key")
+
+    result = models.JSONField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The claim query: ready jobs by priority, then age
+            models.Index(models.F('priority').desc(), 'run_at', name='core_job_ready_idx',
+                         condition=models.Q(status='QUEUED')),
+            models.Index(fields=['status', 'locked_at']),
+            models.Index(fields=['created_by', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['dedup_key'], name='core_job_active_dedup_key',
+                                    condition=models.Q(status__in=['QUEUED', 'RUNNING'])),
+        ]
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
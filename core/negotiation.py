@@ -0,0 +1,30 @@
+"""
+Content negotiation for the core API.
+"""
+from django.conf import settings
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer
+
+
+class StaffBrowsableAPINegotiation(DefaultContentNegotiation):
+    """
+    Only offer the browsable API in DEBUG or to staff users.
+
+    The check uses the Django session user set by AuthenticationMiddleware
+    (the one logged in through /api-auth/), so negotiation never triggers JWT
+    authentication. Everyone else gets the next matching renderer (JSON).
+    """
+
+    def browsable_api_allowed(self, request):
+        if settings.DEBUG:
+            return True
+        user = getattr(getattr(request, '_request', request), 'user', None)
+        return bool(user is not None and user.is_authenticated and user.is_staff)
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        if not self.browsable_api_allowed(request):
+            renderers = [
+                renderer for renderer in renderers
+                if not isinstance(renderer, BrowsableAPIRenderer)
+            ] or renderers
+        return super().select_renderer(request, renderers, format_suffix)
@@ -0,0 +1,211 @@
+"""
+Pagination for the core API.
+"""
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db import connections
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class OptionalCountPagination(PageNumberPagination):
+    """
+    PageNumberPagination with an opt-in, count-free mode.
+
+    By default this behaves exactly like PageNumberPagination. Clients that do
+    not need an exact total can pass `?count=`:
+
+    - `none`: no COUNT(*); fetch page_size + 1 rows to decide whether a next
+      page exists. `count` is null.
+    - `estimate`: as `none`, plus the PostgreSQL planner's row estimate for the
+      filtered query (or `pg_class.reltuples` when unfiltered).
+    - `cached`: as `none`, plus an exact COUNT(*) cached for
+      `count_cache_timeout` seconds per distinct query.
+
+    Responses in these modes add `"count_exact": false`.
+    """
+    count_query_param = 'count'
+    count_modes = ('none', 'estimate', 'cached')
+    count_cache_timeout = 60
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, '').lower()
+        return mode if mode in self.count_modes else None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode is None:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        offset = self.start_window(request, page_size)
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.check_window(rows)
+        return self.end_window(rows, page_size, self.get_approximate_count(queryset, self.count_mode))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() with the async ORM, for the async views (core.async_views)."""
+        self.count_mode = self.get_count_mode(request)
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        if self.count_mode is None:
+            self.request = request
+            paginator = self.django_paginator_class(queryset, page_size)
+            paginator.count = await queryset.acount()  # so page() does not count again
+            page_number = self.get_page_number(request, paginator)
+            try:
+                self.page = paginator.page(page_number)
+            except InvalidPage as exc:
+                raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+            if paginator.num_pages > 1 and self.template is not None:
+                self.display_page_controls = True
+            self.page.object_list = [row async for row in self.page.object_list]
+            return list(self.page)
+
+        offset = self.start_window(request, page_size)
+        rows = [row async for row in queryset[offset:offset + page_size + 1]]
+        self.check_window(rows)
+        count = await sync_to_async(self.get_approximate_count)(queryset, self.count_mode)
+        return self.end_window(rows, page_size, count)
+
+    # ---- count-free pages ----
+    def start_window(self, request, page_size):
+        """Validate ?page= and return the offset of the page's first row."""
+        self.request = request
+        page_number = request.query_params.get(self.page_query_param) or 1
+        try:
+            self.page_number = int(page_number)
+            if self.page_number < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message='Invalid page.'
+            ))
+        return (self.page_number - 1) * page_size
+
+    def check_window(self, rows):
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=self.page_number, message='That page contains no results'
+            ))
+
+    def end_window(self, rows, page_size, count):
+        """The page's rows, from page_size + 1 fetched to tell whether a next page exists."""
+        self.has_next = len(rows) > page_size
+        self.count = count
+        self.display_page_controls = False
+        return rows[:page_size]
+
+    # ---- counts ----
+    def get_approximate_count(self, queryset, mode):
+        if mode == 'estimate':
+            estimate = estimate_count(queryset)
+            if estimate is not None:
+                return estimate
+            mode = 'cached'
+        if mode == 'cached':
+            return cached_count(queryset, self.count_cache_timeout)
+        return None
+
+    # ---- links ----
+    def get_next_link(self):
+        if self.count_mode is None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.count_mode is None:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+    def get_paginated_response(self, data):
+        if self.count_mode is None:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.count,
+            'count_exact': False,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count']['nullable'] = True
+        schema['properties']['count_exact'] = {
+            'type': 'boolean',
+            'description': 'Present and false when ?count=none|estimate|cached is used.',
+        }
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = super().get_schema_operation_parameters(view)
+        parameters.append({
+            'name': self.count_query_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Skip the exact COUNT(*): none, estimate or cached.',
+            'schema': {'type': 'string', 'enum': list(self.count_modes)},
+        })
+        return parameters
+
+
+def _count_query(queryset):
+    """The queryset stripped of ordering, which never changes a count."""
+    return queryset.order_by()
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for a queryset on PostgreSQL, else None.
+
+    Unfiltered querysets read pg_class.reltuples directly; filtered ones use
+    EXPLAIN's top-level row estimate.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    query = _count_query(queryset).query
+    with connection.cursor() as cursor:
+        if not query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return row[0]
+        sql, params = query.sql_with_params()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def cached_count(queryset, timeout):
+    """Exact count cached per distinct SQL statement."""
+    sql, params = _count_query(queryset).query.sql_with_params()
+    digest = hashlib.sha1(f'{sql}|{params!r}'.encode()).hexdigest()
+    key = f'pagination:count:{queryset.model._meta.label_lower}:{digest}'
+    return cache.get_or_set(key, queryset.count, timeout)
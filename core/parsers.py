@@ -0,0 +1,42 @@
+"""
+Parsers for the core API.
+"""
+import codecs
+import decimal
+
+import msgpack
+import orjson
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from core.renderers import ORJSONRenderer, msgpack_ext_hook
+
+
+class ORJSONParser(parsers.JSONParser):
+    """JSONParser backed by orjson; non-UTF-8 bodies are transcoded first."""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            body = stream.read()
+            if codecs.lookup(encoding).name != 'utf-8':
+                body = body.decode(encoding).encode('utf-8')
+            return orjson.loads(body)
+        except (ValueError, UnicodeError) as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(parsers.BaseParser):
+    """Decodes the extension types MessagePackRenderer packs back to UUID, date, Decimal and datetime."""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False,
+                                   ext_hook=msgpack_ext_hook, timestamp=3)
+        except (ValueError, decimal.InvalidOperation, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % (str(exc) or type(exc).__name__))
@@ -0,0 +1,98 @@
+"""
+Renderers for the core API.
+
+ORJSONRenderer is a drop-in replacement for DRF's JSONRenderer backed by
+orjson. UUIDs, dates and nested dict/list subclasses (ReturnDict, ErrorDetail)
+are encoded natively; datetimes, Decimals, lazy translation strings and other
+types fall back to DRF's JSONEncoder so the output matches the stock renderer.
+
+MessagePackRenderer emits `application/msgpack` for bandwidth-constrained
+clients. Types JSON can only carry as strings keep their type instead:
+
+    aware datetime   timestamp extension (-1), decoded as a UTC datetime
+    UUID             extension 1, the 16 raw bytes
+    date             extension 2, the ISO 8601 date in ASCII
+    Decimal          extension 3, the decimal string in ASCII (exact)
+
+core.parsers.MessagePackParser decodes them back (msgpack_ext_hook), so a
+msgpack body re-encoded as JSON is the JSON response. Naive datetimes,
+times, lazy strings and other types take the JSON fallback and arrive as
+the same strings the JSON response carries. Serializers mostly emit dates
+and decimals as strings already; the extensions matter for values they pass
+through, such as primary keys of related objects.
+"""
+import datetime
+import decimal
+import uuid
+
+import msgpack
+import orjson
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_fallback_encoder = JSONEncoder()
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+)
+
+
+def orjson_default(obj):
+    """Encode types orjson does not handle (or passes through) like DRF does."""
+    return _fallback_encoder.default(obj)
+
+
+EXT_UUID = 1
+EXT_DATE = 2
+EXT_DECIMAL = 3
+
+
+def msgpack_default(obj):
+    """Pack UUIDs, dates, Decimals and aware datetimes as extension types (see above)."""
+    if isinstance(obj, datetime.datetime):
+        if obj.utcoffset() is not None:
+            return msgpack.Timestamp.from_datetime(obj)
+    elif isinstance(obj, datetime.date):
+        return msgpack.ExtType(EXT_DATE, obj.isoformat().encode('ascii'))
+    elif isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(EXT_UUID, obj.bytes)
+    elif isinstance(obj, decimal.Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(obj).encode('ascii'))
+    return orjson_default(obj)
+
+
+def msgpack_ext_hook(code, data):
+    """Decode the extension types msgpack_default packs; unknown ones stay ExtType."""
+    if code == EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == EXT_DATE:
+        return datetime.date.fromisoformat(data.decode('ascii'))
+    if code == EXT_DECIMAL:
+        return decimal.Decimal(data.decode('ascii'))
+    return msgpack.ExtType(code, data)
+
+
+class ORJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=orjson_default, option=options)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=msgpack_default, use_bin_type=True, datetime=False)
@@ -0,0 +1,228 @@
+"""
+Read replicas.
+
+Requests with a safe method (GET, HEAD, OPTIONS) read from one of the
+streaming replicas in settings.DATABASE_REPLICAS. Everything else, and all
+code outside a request (jobs, management commands, the shell), uses
+'default'. ReplicaMiddleware makes the decision per request and
+ReplicaRouter applies it:
+
+- Writes always go to 'default'. Once a request has written, the rest of
+  it reads from 'default' as well, and so does every read inside a
+  transaction on 'default' (select_for_update, get_or_create,
+  refresh_snapshots).
+- A client that wrote is pinned to 'default' for REPLICA_STICKY_SECONDS, so
+  its next requests read its own writes while the replicas catch up.
+  Clients are identified by the user id in their access token or session,
+  or by address when anonymous. The pin lives in the shared cache, so it
+  holds across workers; ReplicaMiddleware refuses to start on a
+  per-process cache (core.checks, core.E002).
+- Each process checks a replica's replay lag at most every
+  REPLICA_LAG_CHECK_INTERVAL seconds. A replica more than REPLICA_MAX_LAG
+  seconds behind, or unreachable within REPLICA_CONNECT_TIMEOUT, is skipped
+  until the next check. With no
+  replica left, reads fall back to 'default'.
+- A view opts out with `read_from_primary = True` on the view class or
+  function, for data written by someone other than the client (job status
+  polled while a worker updates it).
+
+The router and middleware are only installed when replicas are configured
+(DATABASE_REPLICA_URLS, see settings).
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core.cache import is_shared
+
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_PREFIX = 'replica:sticky'
+
+# Seconds the replica is behind. Zero when it has replayed everything it
+# received from a live primary; otherwise the age of the last replayed
+# transaction (which also grows when the primary is idle, erring towards
+# the primary).
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+             AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 'Infinity')
+    END
+"""
+
+# The routing decision of the current request: {'replica': bool, 'alias': str|None, 'wrote': bool}.
+# None outside a request.
+_route = contextvars.ContextVar('replica_route', default=None)
+
+_health = {}  # alias -> (checked at, usable); per process
+_health_lock = threading.Lock()
+
+
+# ---- replica health ----
+def replica_lag(alias):
+    """Replay lag of `alias` in seconds (0 for non-PostgreSQL replicas)."""
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def replica_usable(alias):
+    """Whether `alias` is reachable and within REPLICA_MAX_LAG; cached per process."""
+    now = time.monotonic()
+    checked = _health.get(alias)
+    if checked and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+        return checked[1]
+    try:
+        lag = replica_lag(alias)
+    except DatabaseError as exc:
+        connections[alias].close()
+        usable, reason = False, f'unreachable ({exc})'
+    else:
+        usable, reason = lag <= settings.REPLICA_MAX_LAG, f'{lag:.1f}s behind'
+    with _health_lock:
+        previous = _health.get(alias)
+        _health[alias] = (now, usable)
+    if previous and previous[1] and not usable:
+        logger.warning('Read replica %s is %s; reading from %s', alias, reason, DEFAULT_DB_ALIAS)
+    elif previous and not previous[1] and usable:
+        logger.info('Read replica %s is back (%s)', alias, reason)
+    return usable
+
+
+def choose_replica():
+    """A random usable replica, or None when all are lagging or down."""
+    usable = [alias for alias in settings.DATABASE_REPLICAS if replica_usable(alias)]
+    return random.choice(usable) if usable else None
+
+
+# ---- router ----
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        route = _route.get()
+        if route is None or not route['replica'] or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if route['alias'] is None:
+            # Chosen on the first read, so requests that never read skip the lag check.
+            route['alias'] = choose_replica() or DEFAULT_DB_ALIAS
+        return route['alias']
+
+    def db_for_write(self, model, **hints):
+        route = _route.get()
+        if route is not None:
+            route['replica'] = False
+            route['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False  # replicas receive the schema from the primary
+        return None
+
+
+# ---- middleware ----
+_jwt = JWTAuthentication()
+_ident = BaseThrottle()  # get_ident honours NUM_PROXIES, like the throttles
+
+
+def client_keys(request):
+    """Cache keys that identify the client: its user id when known, and its address."""
+    keys = [f'{STICKY_PREFIX}:addr:{_ident.get_ident(request)}']
+    user_id = None
+    header = _jwt.get_header(request)
+    if header is not None:
+        raw = _jwt.get_raw_token(header)
+        if raw is not None:
+            try:
+                user_id = _jwt.get_validated_token(raw)[jwt_settings.USER_ID_CLAIM]
+            except (InvalidToken, TokenError, KeyError):
+                pass
+    if user_id is None and hasattr(request, 'session'):
+        user_id = request.session.get('_auth_user_id')
+    if user_id is not None:
+        keys.insert(0, f'{STICKY_PREFIX}:user:{user_id}')
+    return keys
+
+
+class ReplicaMiddleware:
+    """Route safe requests to a replica unless the client wrote recently; pin clients that write."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not is_shared():
+            raise ImproperlyConfigured(
+                'Read replicas need a shared cache for read-your-writes pins (core.E002); set REDIS_URL.'
+            )
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        keys = client_keys(request)
+        route = self.start(request, pinned=bool(cache.get_many(keys)))
+        token = _route.set(route)
+        try:
+            response = self.get_response(request)
+        finally:
+            _route.reset(token)
+        if self.must_pin(request, route):
+            cache.set(keys[0], 1, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        keys = await sync_to_async(client_keys)(request)  # may read the session
+        route = self.start(request, pinned=bool(await cache.aget_many(keys)))
+        token = _route.set(route)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _route.reset(token)
+        if self.must_pin(request, route):
+            await cache.aset(keys[0], 1, settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    def start(self, request, pinned):
+        route = {'replica': request.method in SAFE_METHODS and not pinned, 'alias': None, 'wrote': False}
+        request.replica_route = route
+        return route
+
+    def must_pin(self, request, route):
+        # Raw SQL writes (COPY imports) bypass the router, so unsafe methods pin regardless.
+        return route['wrote'] or request.method not in SAFE_METHODS
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route = getattr(request, 'replica_route', None)
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if route is not None and (
+            getattr(view_func, 'read_from_primary', False) or getattr(view_class, 'read_from_primary', False)
+        ):
+            route['replica'] = False
+        return None
@@ -0,0 +1,405 @@
+"""
+Bulk roster import: parent accounts and their children from one CSV file
+(PostgreSQL only).
+
+Columns, in any order after a header row:
+
+    parent_email, parent_first_name, parent_last_name, child_first_name,
+    child_last_name, child_date_of_birth (YYYY-MM-DD)        required
+    parent_phone, parent_password, child_gender,
+    child_grade_level, child_primary_language                optional
+
+All of it happens in one transaction, with a constant number of statements
+however many rows there are:
+
+1. The file is read with the csv module and streamed with COPY into a
+   temporary staging table, one row per record, padded or cut to the
+   header's width. Blank lines are skipped; a record with too few or too
+   many fields becomes a row error rather than a COPY failure.
+2. A few set-based UPDATEs trim, normalize and validate every row, and mark
+   repeats of the same parent email + child name + date of birth as
+   duplicates of the first occurrence.
+3. Parents are matched case-insensitively by email to existing PARENT
+   accounts. The first valid row of a new email supplies the account
+   details.
+4. New parents with a parent_password get it hashed: in-process by
+   default, across a process pool when the caller asks for one
+   (manage.py import_roster does; the admin upload, a web request, must
+   not fork). The others get an unusable password and an invite token
+   (make_invite_token) to choose one at /api/auth/invite/accept/.
+   The new accounts are inserted with one INSERT ... SELECT.
+5. Children are inserted with one INSERT ... SELECT. A child the parent
+   already has (same names and date of birth) is left alone, so re-running
+   an import is safe.
+
+Bulk statements bypass model signals. Rows that did not exist before cannot
+be in any cached payload or snapshot, but they are in lists: after commit,
+bulk_written() bumps the user and child collection stamps the list ETags
+are built from.
+"""
+import csv
+import io
+import multiprocessing
+import os
+import secrets
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.core import signing
+from django.db import connection, transaction
+
+from core.models import Child, User
+from core.signals import bulk_written
+
+
+REQUIRED_COLUMNS = [
+    'parent_email', 'parent_first_name', 'parent_last_name',
+    'child_first_name', 'child_last_name', 'child_date_of_birth',
+]
+OPTIONAL_COLUMNS = [
+    'parent_phone', 'parent_password', 'child_gender', 'child_grade_level', 'child_primary_language',
+]
+COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+
+# column -> max length, from the model fields it lands in
+MAX_LENGTHS = {
+    'parent_email': User._meta.get_field('email').max_length,
+    'parent_first_name': User._meta.get_field('first_name').max_length,
+    'parent_last_name': User._meta.get_field('last_name').max_length,
+    'parent_phone': User._meta.get_field('phone').max_length,
+    'child_first_name': Child._meta.get_field('first_name').max_length,
+    'child_last_name': Child._meta.get_field('last_name').max_length,
+    'child_grade_level': Child._meta.get_field('grade_level').max_length,
+    'child_primary_language': Child._meta.get_field('primary_language').max_length,
+}
+
+HASH_POOL_THRESHOLD = 50  # fewer new passwords than this are hashed in-process
+INVITE_SALT = 'core.roster.invite'
+
+
+class RosterError(Exception):
+    """The file cannot be imported at all (as opposed to per-row errors)."""
+
+
+# ---- invites ----
+def make_invite_token(user):
+    """
+    A signed token that lets `user` set a first password. It is tied to the
+    current (unusable) password, so it stops working once a password is set.
+    """
+    return signing.dumps([str(user.pk), user.password[-12:]], salt=INVITE_SALT)
+
+
+def check_invite_token(token):
+    """The user an unexpired, unused invite token belongs to, or None."""
+    try:
+        pk, fingerprint = signing.loads(token, salt=INVITE_SALT, max_age=settings.ROSTER_INVITE_MAX_AGE)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+    user = User.objects.filter(pk=pk, is_active=True).first()
+    if user is None or user.has_usable_password() or user.password[-12:] != fingerprint:
+        return None
+    return user
+
+
+# ---- import ----
+def _read_header(stream):
+    header = next(csv.reader([stream.readline()]), [])
+    columns = [name.strip().lower().lstrip('\ufeff') for name in header]
+    unknown = [name for name in columns if name not in COLUMNS]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if unknown or missing or len(set(columns)) != len(columns):
+        problems = []
+        if missing:
+            problems.append(f'missing column(s): {", ".join(missing)}')
+        if unknown:
+            problems.append(f'unknown column(s): {", ".join(unknown)}')
+        if len(set(columns)) != len(columns):
+            problems.append('repeated column(s)')
+        raise RosterError('; '.join(problems))
+    return columns
+
+
+class _CsvStream:
+    """A file-like object that reads `rows` back as CSV text, for COPY."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def read(self, size=-1):
+        for row in self.rows:
+            self.writer.writerow(row)
+            if 0 <= size <= self.buffer.tell():
+                break
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def _staged_rows(reader, width):
+    """(row_number, error, *fields) per record, fields padded or cut to `width`."""
+    for row_number, fields in enumerate(reader, start=1):
+        if not any(field.strip() for field in fields):
+            continue  # blank line; still numbered, so row numbers match the file
+        errors = []
+        if len(fields) != width:
+            errors.append(f'row has {len(fields)} fields; the header has {width}')
+        if any('\x00' in field for field in fields):  # text columns cannot hold NUL
+            errors.append('row contains a NUL character')
+            fields = [field.replace('\x00', '') for field in fields]
+        yield [row_number, '; '.join(errors) or None, *fields[:width], *[None] * (width - len(fields))]
+
+
+def _copy_in(cursor, sql, stream):
+    """COPY ... FROM STDIN with psycopg2 or psycopg 3."""
+    if hasattr(cursor, 'copy_expert'):
+        cursor.copy_expert(sql, stream)
+        return
+    with cursor.copy(sql) as copy:
+        while data := stream.read(1 << 16):
+            copy.write(data)
+
+
+def _hash_passwords(passwords, processes):
+    if len(passwords) < HASH_POOL_THRESHOLD or processes == 1:
+        return [make_password(password) for password in passwords]
+    context = multiprocessing.get_context('fork')  # workers inherit the configured settings
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), mp_context=context) as pool:
+        return list(pool.map(make_password, passwords, chunksize=16))
+
+
+def _validation_sql():
+    checks = ['error'] + [  # the row's shape, checked by _staged_rows()
+        f"CASE WHEN {column} IS NULL THEN '{column} is required' END"
+        for column in REQUIRED_COLUMNS
+    ] + [
+        f"CASE WHEN length({column}) > {limit} THEN '{column} is longer than {limit} characters' END"
+        for column, limit in MAX_LENGTHS.items()
+    ] + [
+        r"""CASE WHEN parent_email !~ '^[^@\s]+@[^@\s]+\.[^@\s]+$'
+                 THEN 'parent_email is not a valid email address' END""",
+        # CASE evaluates its branches in order, OR operands in any order:
+        # make_date() only runs once the month is known to be valid.
+        r"""CASE WHEN child_date_of_birth !~ '^\d{4}-\d{2}-\d{2}$'
+                      THEN 'child_date_of_birth must be YYYY-MM-DD'
+                 WHEN substr(child_date_of_birth, 1, 4)::int < 1900
+                      OR substr(child_date_of_birth, 6, 2)::int NOT BETWEEN 1 AND 12
+                      OR substr(child_date_of_birth, 9, 2)::int < 1
+                      THEN 'child_date_of_birth is not a valid date'
+                 WHEN substr(child_date_of_birth, 9, 2)::int > extract(day from
+                          make_date(substr(child_date_of_birth, 1, 4)::int,
+                                    substr(child_date_of_birth, 6, 2)::int, 1)
+                          + interval '1 month - 1 day')
+                      THEN 'child_date_of_birth is not a valid date'
+                 WHEN child_date_of_birth::date > current_date
+                      THEN 'child_date_of_birth is in the future' END""",
+        """CASE WHEN child_gender IS NOT NULL AND gender IS NULL
+                 THEN 'child_gender must be one of ' || array_to_string(%(genders)s::text[], ', ') END""",
+        """CASE WHEN parent_password IS NOT NULL AND NOT (
+                     length(parent_password) >= 8 AND parent_password ~ '[A-Z]'
+                     AND parent_password ~ '[a-z]' AND parent_password ~ '[0-9]')
+                 THEN 'parent_password needs 8+ characters with upper and lower case letters and a digit' END""",
+    ]
+    return f"UPDATE roster_staging SET error = NULLIF(concat_ws('; ', {', '.join(checks)}), '')"
+
+
+def import_roster(stream, *, dry_run=False, processes=1):
+    """
+    Import a roster CSV from a text stream; returns a report:
+
+        {'rows', 'parents_created', 'parents_matched', 'children_created',
+         'children_existing', 'errors': [{'row', 'error'}],
+         'invites': [{'email', 'token'}]}
+
+    Rows are numbered from 1 after the header. Rows with errors are skipped
+    and the rest are imported. With `dry_run`, everything is rolled back and
+    no invites are issued. `processes` > 1, or None for one per CPU, hashes
+    many passwords in a forked process pool.
+    """
+    if connection.vendor != 'postgresql':
+        raise RosterError('Roster import needs PostgreSQL (COPY)')
+    columns = _read_header(stream)
+    genders = [value for value, _ in Child.GENDER_CHOICES]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"""
+            CREATE TEMP TABLE roster_staging (
+                row_number bigint PRIMARY KEY,
+                {', '.join(f'{column} text' for column in COLUMNS)},
+                gender text, dob date, error text, existing boolean NOT NULL DEFAULT false
+            ) ON COMMIT DROP
+        """)
+        reader = csv.reader(stream)
+        try:
+            _copy_in(
+                cursor,
+                f"COPY roster_staging (row_number, error, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                _CsvStream(_staged_rows(reader, len(columns))),
+            )
+        except csv.Error as exc:
+            raise RosterError(f'line {reader.line_num + 1}: {exc}')  # the header is line 1
+
+        cursor.execute(f"""
+            UPDATE roster_staging SET
+                {', '.join(f"{column} = NULLIF(btrim({column}), '')" for column in COLUMNS if column != 'parent_password')},
+                parent_password = NULLIF(parent_password, '')
+        """)
+        cursor.execute("""
+            UPDATE roster_staging SET
+                parent_email = lower(parent_email),
+                gender = CASE WHEN upper(replace(child_gender, ' ', '_')) = ANY(%s::text[])
+                              THEN upper(replace(child_gender, ' ', '_')) END
+        """, [genders])
+        cursor.execute(_validation_sql(), {'genders': genders})
+        # Only cast rows that passed validation (a WHERE is applied before SET).
+        cursor.execute("UPDATE roster_staging SET dob = child_date_of_birth::date WHERE error IS NULL")
+        cursor.execute("""
+            UPDATE roster_staging s SET error = 'parent_email belongs to a non-parent account'
+            FROM core_user u
+            WHERE s.error IS NULL AND lower(u.email) = s.parent_email AND u.role <> 'PARENT'
+        """)
+        cursor.execute("""
+            UPDATE roster_staging s SET error = 'duplicate of row ' || d.first_row
+            FROM (
+                SELECT row_number, min(row_number) OVER (
+                    PARTITION BY parent_email, lower(child_first_name), lower(child_last_name), dob
+                ) AS first_row
+                FROM roster_staging WHERE error IS NULL
+            ) d
+            WHERE s.row_number = d.row_number AND d.first_row <> d.row_number
+        """)
+
+        # One row per parent email: the existing account, or the first valid row's details.
+        cursor.execute("""
+            CREATE TEMP TABLE roster_parents ON COMMIT DROP AS
+            SELECT DISTINCT ON (parent_email)
+                   parent_email AS email, parent_first_name AS first_name, parent_last_name AS last_name,
+                   parent_phone AS phone, parent_password AS raw_password, NULL::uuid AS user_id
+            FROM roster_staging WHERE error IS NULL
+            ORDER BY parent_email, row_number
+        """)
+        cursor.execute("ALTER TABLE roster_parents ADD PRIMARY KEY (email)")
+        cursor.execute("""
+            UPDATE roster_parents p SET user_id = u.user_id
+            FROM core_user u WHERE lower(u.email) = p.email AND u.role = 'PARENT'
+        """)
+        cursor.execute("SELECT count(*) FROM roster_parents WHERE user_id IS NOT NULL")
+        parents_matched = cursor.fetchone()[0]
+
+        # Usernames are the email address; refuse one taken by another account.
+        cursor.execute("""
+            SELECT p.email FROM roster_parents p
+            WHERE p.user_id IS NULL
+              AND EXISTS (SELECT 1 FROM core_user u WHERE lower(u.username) = p.email)
+        """)
+        taken = [email for email, in cursor.fetchall()]
+        if taken:
+            cursor.execute("""
+                UPDATE roster_staging SET error = 'parent_email is already used as a username'
+                WHERE error IS NULL AND parent_email = ANY(%s::text[])
+            """, [taken])
+            cursor.execute("DELETE FROM roster_parents WHERE email = ANY(%s::text[])", [taken])
+
+        cursor.execute("SELECT email, raw_password FROM roster_parents WHERE user_id IS NULL ORDER BY email")
+        new_parents = cursor.fetchall()
+        with_password = [(email, raw) for email, raw in new_parents if raw is not None]
+        hashed = dict(zip(
+            (email for email, _ in with_password),
+            _hash_passwords([raw for _, raw in with_password], processes),
+        ))
+        accounts = []
+        invites = []
+        for email, _ in new_parents:
+            user = User(user_id=uuid.uuid4(), email=email)
+            if email in hashed:
+                user.password = hashed[email]
+            else:
+                # set_unusable_password() draws its 40 characters one at a time; at
+                # tens of thousands of rows that is most of the import.
+                user.password = UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(30)
+                invites.append({'email': email, 'token': make_invite_token(user)})
+            accounts.append(user)
+
+        if accounts:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows((user.email, user.user_id, user.password) for user in accounts)
+            buffer.seek(0)
+            cursor.execute("""
+                CREATE TEMP TABLE roster_accounts (email text PRIMARY KEY, user_id uuid, password text)
+                ON COMMIT DROP
+            """)
+            _copy_in(cursor, "COPY roster_accounts FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute("""
+                INSERT INTO core_user (
+                    user_id, password, username, email, first_name, last_name, phone, role,
+                    is_superuser, is_staff, is_active, date_joined, created_at, updated_at,
+                    specialist_title, specialist_bio, focus_areas, accepts_new_assessments
+                )
+                SELECT a.user_id, a.password, p.email, p.email, p.first_name, p.last_name, p.phone, 'PARENT',
+                       false, false, true, now(), now(), now(),
+                       '', '', '[]'::jsonb, true
+                FROM roster_accounts a JOIN roster_parents p USING (email)
+            """)
+            cursor.execute("""
+                UPDATE roster_parents p SET user_id = a.user_id
+                FROM roster_accounts a WHERE a.email = p.email
+            """)
+
+        cursor.execute("""
+            UPDATE roster_staging s SET existing = true
+            FROM roster_parents p
+            WHERE s.error IS NULL AND p.email = s.parent_email AND EXISTS (
+                SELECT 1 FROM core_child c
+                WHERE c.parent_id = p.user_id
+                  AND lower(c.first_name) = lower(s.child_first_name)
+                  AND lower(c.last_name) = lower(s.child_last_name)
+                  AND c.date_of_birth = s.dob
+            )
+        """)
+        cursor.execute("""
+            INSERT INTO core_child (
+                child_id, first_name, last_name, date_of_birth, gender, primary_language, grade_level,
+                medical_alerts, medications, parent_id, created_at, updated_at,
+                intake_status, assessment_status, enrollment_status
+            )
+            SELECT gen_random_uuid(), s.child_first_name, s.child_last_name, s.dob,
+                   coalesce(s.gender, ''), coalesce(s.child_primary_language, ''),
+                   coalesce(s.child_grade_level, ''), '', '', p.user_id, now(), now(),
+                   %s, %s, %s
+            FROM roster_staging s JOIN roster_parents p ON p.email = s.parent_email
+            WHERE s.error IS NULL AND NOT s.existing
+            ORDER BY s.row_number
+        """, [Child._meta.get_field(name).default
+              for name in ('intake_status', 'assessment_status', 'enrollment_status')])
+        children_created = cursor.rowcount
+
+        cursor.execute("""
+            SELECT count(*), count(*) FILTER (WHERE existing) FROM roster_staging
+        """)
+        rows, children_existing = cursor.fetchone()
+        cursor.execute("SELECT row_number, error FROM roster_staging WHERE error IS NOT NULL ORDER BY row_number")
+        errors = [{'row': row, 'error': error} for row, error in cursor.fetchall()]
+        # ON COMMIT DROP waits for the outermost commit, which may be a
+        # caller's transaction that runs another import first.
+        cursor.execute("DROP TABLE IF EXISTS roster_staging, roster_parents, roster_accounts")
+
+        if dry_run:
+            transaction.set_rollback(True)
+            invites = []
+        else:
+            transaction.on_commit(lambda: [bulk_written(model) for model in (User, Child)])
+
+    return {
+        'rows': rows,
+        'parents_created': len(accounts),
+        'parents_matched': parents_matched,
+        'children_created': children_created,
+        'children_existing': children_existing,
+        'errors': errors,
+        'invites': invites,
+    }
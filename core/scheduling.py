@@ -0,0 +1,168 @@
+"""
+Specialist scheduling: open slots and atomic booking.
+
+Open slots are the specialist's weekly SpecialistAvailability windows cut
+into `slot_minutes` pieces, minus AvailabilityException time off and BOOKED
+AssessmentBooking rows. Whatever the date range, a lookup is three queries;
+the blocked time is merged into a sorted IntervalSet so each candidate slot
+is tested in O(log n).
+
+Booking locks the assessment request and the specialist row, re-checks the
+slot and writes the booking, the request approval and the child's schedule
+in one transaction. On PostgreSQL the booking_no_overlap exclusion
+constraint (migration 0009) backs the check up.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.models import (
+    AssessmentBooking, AssessmentRequest, AvailabilityException, Child,
+    SpecialistAvailability, User,
+)
+from core.workflows import CHILD_FIELDS, REQUEST_FIELDS, schedule
+
+
+MAX_RANGE_DAYS = 90
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+class IntervalSet:
+    """Merged, sorted half-open [start, end) intervals."""
+
+    def __init__(self, intervals):
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def overlaps(self, start, end):
+        # The only candidate is the last interval starting before `end`.
+        i = bisect_left(self.starts, end) - 1
+        return i >= 0 and self.ends[i] > start
+
+
+def _at(day, moment, tz):
+    return datetime.combine(day, moment, tzinfo=tz)
+
+
+def _day_slots(templates, day, tz):
+    slots = set()
+    for template in templates:
+        if template.valid_from and day < template.valid_from:
+            continue
+        if template.valid_until and day > template.valid_until:
+            continue
+        step = timedelta(minutes=template.slot_minutes)
+        start, window_end = _at(day, template.start_time, tz), _at(day, template.end_time, tz)
+        while start + step <= window_end:
+            slots.add((start, start + step))
+            start += step
+    return sorted(slots)
+
+
+def _blocked(specialist_id, range_start, range_end, tz, exclude_booking=None):
+    intervals = []
+    exceptions = AvailabilityException.objects.filter(
+        specialist_id=specialist_id,
+        date__range=(range_start.date(), range_end.date()),
+    ).values_list('date', 'start_time', 'end_time')
+    for day, start, end in exceptions:
+        intervals.append((
+            _at(day, start or time.min, tz),
+            _at(day, end, tz) if end else _at(day + timedelta(days=1), time.min, tz),
+        ))
+
+    bookings = AssessmentBooking.objects.filter(
+        specialist_id=specialist_id, status='BOOKED',
+        starts_at__lt=range_end, ends_at__gt=range_start,
+    )
+    if exclude_booking is not None:
+        bookings = bookings.exclude(pk=exclude_booking)
+    intervals.extend(bookings.values_list('starts_at', 'ends_at'))
+    return IntervalSet(intervals)
+
+
+def open_slots(specialist_id, start=None, days=14, limit=10, exclude_booking=None):
+    """Return up to `limit` free (starts_at, ends_at) pairs from `start` on."""
+    tz = timezone.get_current_timezone()
+    now = timezone.now()
+    start = max(start or now, now)
+    first_day = start.astimezone(tz).date()
+    last_day = first_day + timedelta(days=min(days, MAX_RANGE_DAYS) - 1)
+
+    by_weekday = defaultdict(list)
+    for template in SpecialistAvailability.objects.filter(specialist_id=specialist_id, is_active=True):
+        by_weekday[template.weekday].append(template)
+    if not by_weekday:
+        return []
+
+    blocked = _blocked(
+        specialist_id, _at(first_day, time.min, tz),
+        _at(last_day + timedelta(days=1), time.min, tz), tz, exclude_booking,
+    )
+    slots = []
+    day = first_day
+    while day <= last_day and len(slots) < limit:
+        for slot_start, slot_end in _day_slots(by_weekday[day.weekday()], day, tz):
+            if slot_start >= start and not blocked.overlaps(slot_start, slot_end):
+                slots.append((slot_start, slot_end))
+                if len(slots) == limit:
+                    break
+        day += timedelta(days=1)
+    return slots
+
+
+def find_slot(specialist_id, starts_at, exclude_booking=None):
+    """The open slot beginning exactly at `starts_at`, or None."""
+    slots = open_slots(specialist_id, start=starts_at, days=1, limit=100,
+                       exclude_booking=exclude_booking)
+    return next((slot for slot in slots if slot[0] == starts_at), None)
+
+
+def book_slot(assessment_request_id, starts_at):
+    """
+    Book the request's specialist at `starts_at` and schedule the child.
+
+    Raises SlotUnavailable, or core.workflows.InvalidTransition when the
+    request can no longer be scheduled. Rebooking moves the existing booking.
+    """
+    with transaction.atomic():
+        assessment_request = AssessmentRequest.objects.select_for_update().get(pk=assessment_request_id)
+        # Serialises bookings per specialist on every database backend.
+        list(User.objects.select_for_update().filter(pk=assessment_request.specialist_id).values_list('pk'))
+        child = Child.objects.select_for_update().get(pk=assessment_request.child_id)
+
+        booking = AssessmentBooking.objects.filter(assessment_request=assessment_request).first()
+        slot = find_slot(assessment_request.specialist_id, starts_at,
+                         exclude_booking=booking.pk if booking else None)
+        if slot is None:
+            raise SlotUnavailable('That slot is not available.')
+
+        now = timezone.now()
+        schedule(assessment_request, child, slot[0], now)
+        if booking is None:
+            booking = AssessmentBooking(
+                assessment_request=assessment_request,
+                specialist_id=assessment_request.specialist_id,
+                child_id=assessment_request.child_id,
+            )
+        booking.starts_at, booking.ends_at, booking.status = slot[0], slot[1], 'BOOKED'
+        try:
+            with transaction.atomic():
+                booking.save()
+        except IntegrityError:
+            raise SlotUnavailable('That slot was just booked.')
+        assessment_request.save(update_fields=REQUEST_FIELDS)
+        child.save(update_fields=CHILD_FIELDS)
+    return booking
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from core.models import (
     User, Child, ChildrenEligibility, DevelopmentalHistory,
@@ -7,7 +8,9 @@ from core.models import (
     IEPGoals, IEPObjectives, PlannedActivitiesServices,
     Accommodations, WeeklyProgressReport, WeeklyServicesProvided,
     WeeklyGoalsProgress, WeeklyProgressSummary, ProgressReportAggregate,
-    AuditLog, AIGenerationLog, AssessmentRequest
+    AuditLog, AIGenerationLog, AssessmentRequest,
+    SpecialistAvailability, AvailabilityException, AssessmentBooking, Job,
+    ChildContextSnapshot
 )
 
 
@@ -57,6 +60,10 @@ class SpecialistListSerializer(serializers.ModelSerializer):
             "accepts_new_assessments",
         ]
         read_only_fields = fields  # directory is read-only for parents
+        computed_from = {
+            "full_name": ["first_name", "last_name", "username"],
+            "display_title": ["specialist_title", "specialization"],
+        }
 
     def get_full_name(self, obj):
         name = obj.get_full_name()
@@ -111,11 +118,32 @@ class ChildSerializer(serializers.ModelSerializer):
             'assessment_scheduled_date', 'enrollment_status',
         ]
         read_only_fields = ['child_id', 'created_at', 'updated_at']
+        computed_from = {'age': ['date_of_birth']}
     
     def get_age(self, obj):
         return obj.age_calculated
 
 
+class ChildListSerializer(ChildSerializer):
+    """Compact row for child tables; nested sections are available via ?expand=."""
+    class Meta(ChildSerializer.Meta):
+        fields = [
+            'child_id', 'first_name', 'last_name', 'date_of_birth', 'age',
+            'gender', 'grade_level', 'parent', 'parent_name',
+            'intake_status', 'assessment_status', 'assessment_scheduled_date',
+            'enrollment_status', 'updated_at',
+        ]
+
+
+class ChildContextSnapshotSerializer(serializers.ModelSerializer):
+    context = serializers.JSONField(source='data')
+
+    class Meta:
+        model = ChildContextSnapshot
+        fields = ['child', 'version', 'context_version', 'built_at', 'context']
+        read_only_fields = fields
+
+
 # ==================== ASSESSMENT SERIALIZERS ====================
 class AssessmentSkillAreaSerializer(serializers.ModelSerializer):
     class Meta:
@@ -152,6 +180,15 @@ class AssessmentSerializer(serializers.ModelSerializer):
         read_only_fields = ['assessment_id', 'created_at', 'updated_at']
 
 
+class AssessmentListSerializer(AssessmentSerializer):
+    """Compact row for assessment tables; skill areas and screenings via ?expand=."""
+    class Meta(AssessmentSerializer.Meta):
+        fields = [
+            'assessment_id', 'child', 'assessment_type', 'assessment_date',
+            'completed_by', 'completed_by_name', 'is_complete', 'updated_at'
+        ]
+
+
 class AssessmentRequestSerializer(serializers.ModelSerializer):
     child_name = serializers.CharField(source="child.first_name", read_only=True)
     specialist_name = serializers.CharField(source="specialist.get_full_name", read_only=True)
@@ -189,6 +226,103 @@ class AssessmentRequestSerializer(serializers.ModelSerializer):
         if request and hasattr(request, "user"):
             validated_data["parent"] = request.user
         return super().create(validated_data)
+
+
+class AssessmentRequestTransitionSerializer(serializers.Serializer):
+    """Body of approve / reject"""
+    admin_notes = serializers.CharField(required=False, allow_blank=True, default="")
+    scheduled_date = serializers.DateTimeField(
+        required=False, allow_null=True, default=None,
+        help_text="Approve only; defaults to the preferred date and time.",
+    )
+
+
+class AssessmentRequestBulkTransitionSerializer(serializers.Serializer):
+    """Body of bulk_approve / bulk_reject"""
+    ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=500
+    )
+    admin_notes = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+# ==================== SCHEDULING SERIALIZERS ====================
+class SpecialistAvailabilitySerializer(serializers.ModelSerializer):
+    weekday_display = serializers.CharField(source="get_weekday_display", read_only=True)
+
+    class Meta:
+        model = SpecialistAvailability
+        fields = "__all__"
+        read_only_fields = ["availability_id", "created_at", "updated_at"]
+        extra_kwargs = {"specialist": {"required": False}}
+
+    def validate(self, data):
+        start = data.get("start_time", getattr(self.instance, "start_time", None))
+        end = data.get("end_time", getattr(self.instance, "end_time", None))
+        if start and end and end <= start:
+            raise serializers.ValidationError("end_time must be after start_time.")
+        return data
+
+
+class AvailabilityExceptionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AvailabilityException
+        fields = "__all__"
+        read_only_fields = ["exception_id", "created_at", "updated_at"]
+        extra_kwargs = {"specialist": {"required": False}}
+
+    def validate(self, data):
+        start = data.get("start_time", getattr(self.instance, "start_time", None))
+        end = data.get("end_time", getattr(self.instance, "end_time", None))
+        if (start is None) != (end is None):
+            raise serializers.ValidationError("Give both start_time and end_time, or neither for the whole day.")
+        if start and end and end <= start:
+            raise serializers.ValidationError("end_time must be after start_time.")
+        return data
+
+
+class AssessmentBookingSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AssessmentBooking
+        fields = [
+            "booking_id", "specialist", "child", "assessment_request",
+            "starts_at", "ends_at", "status", "created_at", "updated_at",
+        ]
+        read_only_fields = fields
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """Query parameters of /specialists/{id}/availability/"""
+    start = serializers.DateTimeField(required=False, default=None)
+    days = serializers.IntegerField(required=False, default=14, min_value=1, max_value=90)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+
+class SpecialistRankingQuerySerializer(serializers.Serializer):
+    """Query parameters of /specialists/ranked/"""
+    child = serializers.UUIDField()
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+
+class WorkQueueQuerySerializer(serializers.Serializer):
+    """Query parameters of /specialists/me/queue/"""
+    limit = serializers.IntegerField(required=False, default=50, min_value=1, max_value=200)
+
+
+class WorkQueueItemSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=["request", "assessment", "report"])
+    id = serializers.UUIDField(help_text="Assessment request id, or child id for reports")
+    due = serializers.DateTimeField()
+    overdue = serializers.BooleanField()
+    child = serializers.UUIDField()
+    child_name = serializers.CharField()
+    preferred_date = serializers.DateField(required=False)
+    last_report = serializers.DateField(required=False)
+
+
+class BookSlotSerializer(serializers.Serializer):
+    """Body of /specialists/{id}/book/"""
+    assessment_request = serializers.UUIDField()
+    starts_at = serializers.DateTimeField()
     
 # ==================== INPUT SERIALIZERS ====================
 class ParentInputSerializer(serializers.ModelSerializer):
@@ -375,6 +509,15 @@ class IEPSerializer(serializers.ModelSerializer):
         read_only_fields = ['iep_id', 'created_at', 'updated_at']
 
 
+class IEPListSerializer(IEPSerializer):
+    """Compact row for IEP tables; goals, levels and accommodations via ?expand=."""
+    class Meta(IEPSerializer.Meta):
+        fields = [
+            'iep_id', 'child', 'child_name', 'iep_start_date', 'iep_review_date',
+            'created_by', 'created_by_name', 'is_ai_generated', 'status', 'updated_at'
+        ]
+
+
 # ==================== WEEKLY PROGRESS REPORT SERIALIZERS ====================
 class WeeklyServicesProvidedSerializer(serializers.ModelSerializer):
     class Meta:
@@ -425,6 +568,16 @@ class WeeklyProgressReportSerializer(serializers.ModelSerializer):
         read_only_fields = ['report_id', 'created_at', 'updated_at']
 
 
+class WeeklyProgressReportListSerializer(WeeklyProgressReportSerializer):
+    """Compact row for report tables; services, goal progress and summary via ?expand=."""
+    class Meta(WeeklyProgressReportSerializer.Meta):
+        fields = [
+            'report_id', 'child', 'child_name', 'report_type', 'submitted_by',
+            'submitted_by_name', 'report_date', 'week_start_date', 'week_end_date',
+            'sessions_attended', 'updated_at'
+        ]
+
+
 class ProgressReportAggregateSerializer(serializers.ModelSerializer):
     child_name = serializers.CharField(source='child.first_name', read_only=True)
     
@@ -438,6 +591,50 @@ class ProgressReportAggregateSerializer(serializers.ModelSerializer):
         read_only_fields = ['aggregate_id', 'generated_at']
 
 
+class ProgressReportAggregateGenerateSerializer(serializers.Serializer):
+    """Body of /progress-report-aggregates/generate/"""
+    iep = serializers.PrimaryKeyRelatedField(queryset=IEP.objects.all())
+    report_period_start_date = serializers.DateField()
+    report_period_end_date = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['report_period_end_date'] < attrs['report_period_start_date']:
+            raise serializers.ValidationError('The period must end on or after its start.')
+        return attrs
+
+
+class AIGenerationRequestSerializer(serializers.Serializer):
+    generation_type = serializers.ChoiceField(choices=AIGenerationLog.GENERATION_TYPES)
+    child = serializers.PrimaryKeyRelatedField(queryset=Child.objects.all(), required=False, allow_null=True)
+    instructions = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        if attrs['generation_type'] == 'GRAMMAR_CORRECTION':
+            if not str(attrs['instructions'].get('text', '')).strip():
+                raise serializers.ValidationError({'instructions': 'Grammar correction needs instructions.text.'})
+        elif attrs.get('child') is None:
+            raise serializers.ValidationError({'child': 'This generation type needs a child.'})
+        return attrs
+
+
+class AIGenerateSerializer(serializers.Serializer):
+    """Body of /ai-generation-logs/generate/"""
+    requests = AIGenerationRequestSerializer(many=True, allow_empty=False,
+                                             max_length=settings.AI_GENERATION_MAX_REQUESTS)
+
+
+# ==================== JOB SERIALIZERS ====================
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            'job_id', 'task', 'status', 'priority', 'run_at', 'attempts', 'max_attempts',
+            'dedup_key', 'result', 'last_error', 'created_by', 'created_at', 'updated_at',
+            'finished_at',
+        ]
+        read_only_fields = fields
+
+
 # ==================== AUDIT & LOGGING SERIALIZERS ====================
 class AuditLogSerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.get_full_name', read_only=True, allow_null=True)
@@ -460,6 +657,7 @@ class AIGenerationLogSerializer(serializers.ModelSerializer):
         fields = [
             'ai_log_id', 'generation_type', 'source_data_id', 'generated_content_id',
             'ai_model_version', 'confidence_score', 'human_review_status',
-            'reviewer', 'reviewer_name', 'generated_at'
+            'reviewer', 'reviewer_name', 'requested_by', 'cache_hit', 'duration_ms',
+            'generated_at'
         ]
-        read_only_fields = ['ai_log_id', 'generated_at']
+        read_only_fields = ['ai_log_id', 'requested_by', 'cache_hit', 'duration_ms', 'generated_at']
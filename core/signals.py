@@ -0,0 +1,262 @@
+"""
+Signal handlers for the core app.
+
+Fragment cache invalidation: when a row that is embedded in a cached parent
+payload changes, bump the parent's fragment version (see core.cache). When
+a user is saved, the rows whose cached payload names them are bumped. Any
+saved or deleted core row bumps its model's collection stamp, which list
+ETags are built from. Bulk writes send no signals; bulk_written() does the
+same for the rows they wrote.
+Specialist load counters (core.matching) are dropped when a request changes,
+for its previous specialist too when it is reassigned, and work queue counts
+(core.worklist) when a request, child or report does.
+
+Child context snapshots (core.context): a source row change queues a
+rebuild of its section of the child's snapshot, unless the save only wrote
+fields the context does not read.
+
+Status events (core.events): a new request, or a change to
+AssessmentRequest.status or Child.assessment_status, is published to the
+people who can see the row.
+
+Changes are detected against the values a row had when it was loaded
+(TRACKED_FIELDS, remembered by post_init), so a save costs no extra query
+to find the previous status, and a child save only touches the work queue
+counts when a field they depend on changed.
+"""
+import functools
+
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from core.cache import bump_collection, bump_version, bump_versions
+from core.checks import serializer_relations
+from core.context import SOURCES as CONTEXT_SOURCES, mark_stale
+from core.events import STATUS_EVENTS, publish, status_event
+from core.matching import invalidate_loads
+from core.worklist import invalidate_queue_counts
+from core.models import (
+    User, Child, ChildrenEligibility, DevelopmentalHistory,
+    Assessment, AssessmentSkillArea, DisorderScreening,
+    IEP, IEPGoals, IEPObjectives, IEPPerformanceLevels,
+    PlannedActivitiesServices, Accommodations, AssessmentRequest,
+    WeeklyProgressReport,
+)
+
+
+def _goal_iep(goal_id):
+    return IEPGoals.objects.filter(pk=goal_id).values_list('iep_id', flat=True).first()
+
+
+# Dependent model -> callable returning the (parent model, parent pk) pairs
+# whose cached payload embeds it.
+FRAGMENT_PARENTS = {
+    ChildrenEligibility: lambda obj: [(Child, obj.child_id)],
+    DevelopmentalHistory: lambda obj: [(Child, obj.child_id)],
+    AssessmentSkillArea: lambda obj: [(Assessment, obj.assessment_id)],
+    DisorderScreening: lambda obj: [(Assessment, obj.assessment_id)],
+    IEPGoals: lambda obj: [(IEP, obj.iep_id)],
+    IEPPerformanceLevels: lambda obj: [(IEP, obj.iep_id)],
+    Accommodations: lambda obj: [(IEP, obj.iep_id)],
+    IEPObjectives: lambda obj: [(IEP, _goal_iep(obj.goal_id))],
+    PlannedActivitiesServices: lambda obj: [(IEP, _goal_iep(obj.goal_id))],
+    # IEP payloads embed child_name
+    Child: lambda obj: [
+        (IEP, iep_id) for iep_id in IEP.objects.filter(child=obj).values_list('pk', flat=True)
+    ],
+}
+
+
+def _bump_parents(sender, instance, **kwargs):
+    for model, pk in FRAGMENT_PARENTS[sender](instance):
+        if pk is not None:
+            bump_version(model._meta.label_lower, pk)
+
+
+for _model in FRAGMENT_PARENTS:
+    post_save.connect(_bump_parents, sender=_model, dispatch_uid=f'fragment-save-{_model.__name__}')
+    post_delete.connect(_bump_parents, sender=_model, dispatch_uid=f'fragment-delete-{_model.__name__}')
+
+
+# User fields no payload renders
+USER_HIDDEN_FIELDS = {'last_login', 'password'}
+
+
+def _renders_user(sender, update_fields):
+    return sender is not User or update_fields is None or not set(update_fields) <= USER_HIDDEN_FIELDS
+
+
+@receiver(post_save, dispatch_uid='collection-save')
+@receiver(post_delete, dispatch_uid='collection-delete')
+def bump_list_version(sender, instance, update_fields=None, **kwargs):
+    if sender._meta.app_label == 'core' and _renders_user(sender, update_fields):
+        bump_collection(sender._meta.label_lower)
+
+
+@functools.cache
+def user_lookups():
+    """
+    {model: [lookups to User]} for every model whose detail payload is
+    fragment-cached, following what its serializer renders.
+    """
+    from core.mixins import FragmentCacheMixin
+    from core.urls import router
+
+    lookups = {}
+    for _, viewset, _ in router.registry:
+        if not issubclass(viewset, FragmentCacheMixin):
+            continue
+        model = viewset.queryset.model
+        for _, path in serializer_relations(viewset.serializer_class(), model):
+            current = model
+            for attr in path.split('__'):
+                current = current._meta.get_field(attr).related_model
+            if current is User:
+                lookups.setdefault(model, []).append(path)
+    return lookups
+
+
+@receiver(post_save, sender=User, dispatch_uid='fragment-save-user')
+def bump_user_fragments(sender, instance, created=False, update_fields=None, **kwargs):
+    """Bump the rows whose payload names this user; a new user is in none yet."""
+    if created or not _renders_user(sender, update_fields):
+        return
+    for model, paths in user_lookups().items():
+        embeds = Q()
+        for path in paths:
+            embeds |= Q(**{path: instance.pk})
+        pks = model.objects.filter(embeds).values_list('pk', flat=True).distinct()
+        bump_versions(model._meta.label_lower, list(pks))
+
+
+def bulk_written(model, instances=()):
+    """
+    Do what the save signals would have for rows written by bulk_create,
+    bulk_update, QuerySet.update() or raw SQL: bump the collection stamp and
+    the fragment versions of the parents that embed `instances`.
+    """
+    bump_collection(model._meta.label_lower)
+    if model in FRAGMENT_PARENTS:
+        for instance in instances:
+            _bump_parents(model, instance)
+
+
+@receiver(post_save, sender=AssessmentRequest, dispatch_uid='specialist-load-save')
+@receiver(post_delete, sender=AssessmentRequest, dispatch_uid='specialist-load-delete')
+def drop_specialist_load(sender, instance, **kwargs):
+    invalidate_loads(request_specialists(instance))
+
+
+@receiver(post_save, sender=AssessmentRequest, dispatch_uid='queue-count-save-request')
+@receiver(post_delete, sender=AssessmentRequest, dispatch_uid='queue-count-delete-request')
+def drop_request_queue_count(sender, instance, **kwargs):
+    invalidate_queue_counts(request_specialists(instance))
+
+
+def request_specialists(instance):
+    """The request's specialist, and the one it was loaded with if it was reassigned."""
+    return {instance.specialist_id, loaded_value(instance, 'specialist_id')} - {None}
+
+
+@receiver(post_save, sender=Child, dispatch_uid='queue-count-save-child')
+def drop_child_queue_counts(sender, instance, created, update_fields=None, **kwargs):
+    """A new child has no requests yet; otherwise only queue-relevant changes count."""
+    if created or not changed_fields(instance, update_fields):
+        return
+    invalidate_queue_counts(
+        AssessmentRequest.objects.filter(child=instance).values_list('specialist_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=WeeklyProgressReport, dispatch_uid='queue-count-save-report')
+@receiver(post_delete, sender=WeeklyProgressReport, dispatch_uid='queue-count-delete-report')
+def drop_report_queue_count(sender, instance, **kwargs):
+    invalidate_queue_counts([instance.submitted_by_id])
+
+
+# ---- child context snapshots ----
+def _mark_context_stale(sender, instance, update_fields=None, **kwargs):
+    section, child_of, fields = CONTEXT_SOURCES[sender]
+    if update_fields is not None and fields is not None and not fields.intersection(update_fields):
+        return  # e.g. a status update: nothing the context reads
+    mark_stale(child_of(instance), section)
+
+
+for _model in CONTEXT_SOURCES:
+    post_save.connect(_mark_context_stale, sender=_model, dispatch_uid=f'context-save-{_model.__name__}')
+    post_delete.connect(_mark_context_stale, sender=_model, dispatch_uid=f'context-delete-{_model.__name__}')
+
+
+# ---- loaded values ----
+# Model -> fields whose loaded value saves are compared against
+TRACKED_FIELDS = {
+    # the status event; the specialist whose load and queue count a reassignment changes
+    AssessmentRequest: ('status', 'specialist_id'),
+    # the status event, and what the work queue counts read (core.worklist)
+    Child: ('assessment_status', 'assessment_scheduled_date', 'enrollment_status'),
+}
+
+
+def _remember_loaded(sender, instance, **kwargs):
+    # Deferred fields are not in __dict__; reading them here would query.
+    instance._loaded_values = {
+        field: instance.__dict__[field] for field in TRACKED_FIELDS[sender] if field in instance.__dict__
+    }
+
+
+def _written(sender, update_fields):
+    fields = TRACKED_FIELDS[sender]
+    if update_fields is None:
+        return fields
+    # update_fields may name a foreign key by its field or its attname
+    return [f for f in fields if f in update_fields or sender._meta.get_field(f).name in update_fields]
+
+
+def _load_assigned(sender, instance, update_fields=None, **kwargs):
+    """Fetch the stored value of deferred fields assigned since loading (rare)."""
+    if instance._state.adding:
+        return
+    loaded = instance._loaded_values
+    missing = [f for f in _written(sender, update_fields) if f in instance.__dict__ and f not in loaded]
+    if missing:
+        loaded.update(sender.objects.filter(pk=instance.pk).values(*missing).first() or {})
+
+
+def _remember_saved(sender, instance, update_fields=None, **kwargs):
+    for field in _written(sender, update_fields):
+        if field in instance.__dict__:
+            instance._loaded_values[field] = instance.__dict__[field]
+
+
+def loaded_value(instance, field):
+    return instance._loaded_values.get(field, instance.__dict__.get(field))
+
+
+def changed_fields(instance, update_fields=None):
+    """Tracked fields this save writes with a value other than the loaded one."""
+    return {
+        field for field in _written(type(instance), update_fields)
+        if field in instance.__dict__ and loaded_value(instance, field) != instance.__dict__[field]
+    }
+
+
+# ---- status events ----
+def _publish_status(sender, instance, created, update_fields=None, **kwargs):
+    field = STATUS_EVENTS[sender][0]
+    if created:
+        if sender is AssessmentRequest:
+            publish(*status_event(sender, instance, None))
+        return
+    if field in changed_fields(instance, update_fields):
+        publish(*status_event(sender, instance, loaded_value(instance, field)))
+
+
+for _model in STATUS_EVENTS:
+    post_save.connect(_publish_status, sender=_model, dispatch_uid=f'status-event-{_model.__name__}')
+
+# Connected last, so every post_save receiver above still sees the old values.
+for _model in TRACKED_FIELDS:
+    post_init.connect(_remember_loaded, sender=_model, dispatch_uid=f'loaded-init-{_model.__name__}')
+    pre_save.connect(_load_assigned, sender=_model, dispatch_uid=f'loaded-pre-{_model.__name__}')
+    post_save.connect(_remember_saved, sender=_model, dispatch_uid=f'loaded-save-{_model.__name__}')
@@ -0,0 +1,51 @@
+"""
+Static files for the ASGI deployment.
+
+WhiteNoise's middleware is sync-only. As the outermost middleware it made
+Django adapt the whole chain with SyncToAsync, so every request, the async
+views included, held a thread from start to finish. WhiteNoiseMiddleware
+here is async-capable as well: under ASGI the lookup is the same in-memory
+dict WhiteNoise builds at start-up (a disk scan with WHITENOISE_AUTOREFRESH,
+in a thread), and a file is opened and read off the event loop.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+
+async def read_chunks(file, block_size):
+    """A file's content, each read in a thread; closes the file."""
+    if file is None:  # HEAD, 304
+        return
+    try:
+        while chunk := await sync_to_async(file.read, thread_sensitive=False)(block_size):
+            yield chunk
+    finally:
+        await sync_to_async(file.close, thread_sensitive=False)()
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that keeps the middleware chain async under ASGI."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        response = await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        response.streaming_content = read_chunks(response.file_to_stream, response.block_size)
+        return response
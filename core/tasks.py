@@ -0,0 +1,90 @@
+"""
+Background tasks (see core.jobs). Imported by CoreConfig.ready so every
+process, web or worker, has the same registry.
+"""
+import uuid
+from collections import defaultdict
+from datetime import date
+
+from core.context import refresh_snapshots
+from core.generation import generate
+from core.jobs import task
+from core.models import IEP, User, ProgressReportAggregate, WeeklyGoalsProgress, WeeklyProgressReport
+
+
+PROGRESSING = {'ON_TRACK', 'AHEAD_OF_SCHEDULE'}
+
+
+@task(name='progress.aggregate', max_attempts=3)
+def aggregate_progress(iep, start, end):
+    """Summarize an IEP's weekly goal progress for [start, end] into a ProgressReportAggregate."""
+    iep = IEP.objects.select_related('child').get(pk=iep)
+    start, end = date.fromisoformat(start), date.fromisoformat(end)
+    reports = WeeklyProgressReport.objects.filter(
+        child=iep.child, week_start_date__gte=start, week_end_date__lte=end,
+    )
+    weeks = reports.order_by().values('week_start_date').distinct().count()
+
+    entries = defaultdict(list)
+    rows = (
+        WeeklyGoalsProgress.objects.filter(report__in=reports, iep_goal__iep=iep)
+        .order_by('report__week_start_date')
+        .values_list('iep_goal_id', 'iep_goal__goal_number', 'progress_percentage', 'progress_status')
+    )
+    for goal_id, number, percentage, status in rows:
+        entries[(goal_id, number)].append((percentage, status))
+
+    goals = {}
+    for (goal_id, number), values in sorted(entries.items(), key=lambda item: item[0][1]):
+        percentages = [p for p, _ in values if p is not None]
+        statuses = [s for _, s in values if s]
+        goals[str(goal_id)] = {
+            'goal_number': number,
+            'entries': len(values),
+            'latest_percentage': percentages[-1] if percentages else None,
+            'average_percentage': round(sum(percentages) / len(percentages), 1) if percentages else None,
+            'latest_status': statuses[-1] if statuses else '',
+        }
+
+    progressing = sorted(g['goal_number'] for g in goals.values() if g['latest_status'] in PROGRESSING)
+    behind = sorted(g['goal_number'] for g in goals.values() if g['latest_status'] == 'BELOW_TARGET')
+    summary = (
+        f"{weeks} week(s) reported; {len(progressing)} of {len(goals)} goal(s) on track or ahead."
+    )
+    aggregate = ProgressReportAggregate.objects.create(
+        child=iep.child, iep=iep,
+        report_period_start_date=start, report_period_end_date=end,
+        weeks_included=weeks,
+        overall_progress_summary=summary,
+        goals_progress_status=goals,
+        adjustments_recommended=(
+            'Review goal(s) ' + ', '.join(map(str, behind)) + ' (below target).' if behind else ''
+        ),
+    )
+    return {'aggregate': str(aggregate.pk), 'weeks_included': weeks, 'goals': len(goals)}
+
+
+@task(name='ai.generate', max_attempts=3, backoff=60)
+def run_generation(requests, user=None):
+    """Run a batch of AI generation requests (core.generation.generate)."""
+    user = User.objects.filter(pk=user).first() if user else None
+    return [
+        {
+            'generation_type': result['generation_type'],
+            'child': str(result['child']) if result['child'] else None,
+            'content': result['content'],
+            'confidence_score': float(result['confidence_score'])
+                if result['confidence_score'] is not None else None,
+            'cached': result['cached'],
+            'content_id': str(result['content_id']),
+            'log': str(result['log']),
+        }
+        for result in generate(requests, user=user)
+    ]
+
+
+@task(name='context.refresh')
+def refresh_context(child, sections=None):
+    """Rebuild stale sections of a child's context snapshot (core.context.mark_stale)."""
+    snapshot = refresh_snapshots([child], sections).get(uuid.UUID(child))
+    return {'version': snapshot.version} if snapshot else None
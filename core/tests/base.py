@@ -0,0 +1,30 @@
+"""
+Shared fixtures for the core and accounts test suites.
+"""
+import datetime
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import test
+
+from core.models import Child, User
+
+
+def make_user(username, role='PARENT', **fields):
+    fields.setdefault('email', f'{username}@example.com')
+    return User.objects.create_user(username=username, role=role, password='Secret123', **fields)
+
+
+def make_child(parent, first_name='Ana', last_name='Cruz', **fields):
+    fields.setdefault('date_of_birth', datetime.date(2018, 5, 1))
+    return Child.objects.create(parent=parent, first_name=first_name, last_name=last_name, **fields)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class APITestCase(test.APITestCase):
+    """APITestCase over plain HTTP with an empty cache (rate limits, fragments, pins)."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
@@ -0,0 +1,103 @@
+from asgiref.sync import async_to_sync
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from core import admission
+from core.models import User
+
+
+def export_view(request):
+    return None
+
+
+export_view.throttle_scope = 'exports'
+
+
+@override_settings(ADMISSION_LIMITS={'exports': 1})
+class AdmissionSlotTests(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(admission.slots.in_use.clear)
+
+    def request(self, response):
+        """Run a request to export_view that returns `response`; the middleware's result."""
+        def get_response(request):
+            shed = middleware.process_view(request, export_view, (), {})
+            return shed or response
+
+        middleware = admission.AdmissionControlMiddleware(get_response)
+        return middleware(RequestFactory().get('/export/'))
+
+    def in_use(self):
+        return admission.slots.in_use.get('exports', 0)
+
+    def test_a_streamed_response_holds_its_slot_until_the_body_is_sent(self):
+        response = self.request(StreamingHttpResponse(iter([b'a', b'b'])))
+        self.assertEqual(self.in_use(), 1)
+        self.assertEqual(self.request(HttpResponse()).status_code, 503)
+        self.assertEqual(b''.join(response), b'ab')
+        response.close()
+        self.assertEqual(self.in_use(), 0)
+
+    def test_closing_an_unsent_stream_releases_its_slot(self):
+        response = self.request(StreamingHttpResponse(iter([b'a'])))
+        response.close()
+        self.assertEqual(self.in_use(), 0)
+        self.assertEqual(self.request(HttpResponse()).status_code, 200)
+
+    def test_a_rendered_response_releases_its_slot_at_once(self):
+        self.request(HttpResponse())
+        self.assertEqual(self.in_use(), 0)
+
+    def test_async_streams_hold_their_slot_too(self):
+        async def chunks():
+            yield b'a'
+
+        async def consume(response):
+            return [part async for part in response]
+
+        response = self.request(StreamingHttpResponse(chunks()))
+        self.assertEqual(self.in_use(), 1)
+        self.assertEqual(async_to_sync(consume)(response), [b'a'])
+        self.assertEqual(self.in_use(), 0)
+
+
+class BudgetMixin:
+    def setUp(self):
+        super().setUp()
+        admission.install_statement_timeout(None, connection)
+
+    def use_budget(self, timeout):
+        token = admission._budget.set({'timeout': timeout})
+        self.addCleanup(admission._budget.reset, token)
+
+    def statement_timeout(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            return cursor.fetchone()[0]
+
+
+class SavepointRollbackTests(BudgetMixin, TestCase):
+    def test_a_budget_undone_by_a_savepoint_rollback_is_set_again(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.use_budget(1234)
+            User.objects.exists()  # SETs the budget inside the savepoint
+            raise RuntimeError
+        self.assertEqual(self.statement_timeout(), '1234ms')
+
+
+class TransactionRollbackTests(BudgetMixin, TransactionTestCase):
+    def test_a_budget_undone_by_a_rollback_is_set_again(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.use_budget(1234)
+            User.objects.exists()
+            raise RuntimeError
+        self.assertEqual(self.statement_timeout(), '1234ms')
+
+    def test_a_committed_budget_is_not_sent_again(self):
+        with transaction.atomic():
+            self.use_budget(1234)
+            User.objects.exists()
+        self.statement_timeout()
+        self.assertEqual(admission._applied[connection.connection], (1234, False))
+        self.assertEqual(self.statement_timeout(), '1234ms')
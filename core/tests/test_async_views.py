@@ -0,0 +1,94 @@
+import datetime
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import IEP
+from core.tests.base import APITestCase, make_child, make_user
+from core.throttling import UserSlidingWindowThrottle
+
+
+class AsyncMirrorTests(APITestCase):
+    """The async endpoints answer exactly as the viewsets they mirror."""
+
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent')
+        self.child = make_child(self.parent, first_name='Ana', grade_level='Grade 1')
+        make_child(self.parent, first_name='Ben', grade_level='Grade 2')
+        make_child(make_user('other'), first_name='Cara')
+        for name, specialization in (('speech', 'Speech'), ('ot', 'Occupational')):
+            make_user(name, role='SPECIALIST', first_name=name.title(), specialization=specialization,
+                      accepts_new_assessments=True)
+        self.client.force_authenticate(self.parent)
+
+    def get(self, path, user=None, **params):
+        user = user or self.parent
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        return async_to_sync(AsyncClient().get)(f'/api/async/{path}', params, headers=headers)
+
+    def assertMirrors(self, path, sync_path, **params):
+        response = self.get(path, **params)
+        expected = self.client.get(f'/api/{sync_path}', params)
+        self.assertEqual(response.status_code, expected.status_code, response.content)
+        self.assertEqual(response.json(), expected.json())
+        return response
+
+    def test_children_are_filtered_searched_and_ordered_like_the_viewset(self):
+        response = self.assertMirrors('children/', 'children/')
+        self.assertEqual(response.json()['count'], 2)
+        self.assertMirrors('children/', 'children/', grade_level='Grade 2')
+        self.assertMirrors('children/', 'children/', search='ben', ordering='-date_of_birth,created_at')
+        self.assertMirrors('children/', 'children/', fields='child_id,first_name', count='none')
+        self.assertMirrors('children/', 'children/', parent='not-a-uuid')
+        self.assertMirrors('children/', 'children/', page=9)
+
+    def test_specialist_directory(self):
+        self.assertMirrors('specialists/', 'specialists/', specialization='speech')
+        self.assertMirrors('specialists/', 'specialists/', ordering='last_name', search='ot')
+        self.assertMirrors('specialists/', 'specialists/', ordering='password')  # not orderable
+
+    def test_me_and_iep_detail(self):
+        self.assertMirrors('me/', 'users/me/')
+        iep = IEP.objects.create(child=self.child, created_by=self.parent, iep_start_date=datetime.date(2026, 9, 1))
+        self.assertMirrors(f'ieps/{iep.pk}/', f'ieps/{iep.pk}/')
+        self.assertEqual(self.get('ieps/00000000-0000-0000-0000-000000000000/').status_code, 404)
+
+    def test_authentication_is_required(self):
+        response = async_to_sync(AsyncClient().get)('/api/async/children/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+
+    def test_an_invalid_token_is_refused_like_the_viewset(self):
+        headers = {'Authorization': 'Bearer not-a-token'}
+        response = async_to_sync(AsyncClient().get)('/api/async/children/', headers=headers)
+        self.client.force_authenticate(None)
+        expected = self.client.get('/api/children/', headers=headers)
+        self.assertEqual((response.status_code, response.json()), (expected.status_code, expected.json()))
+
+    def test_throttles_apply(self):
+        with mock.patch.dict(UserSlidingWindowThrottle.THROTTLE_RATES, {'user': '2/hour'}):
+            self.assertEqual([self.get('me/').status_code for _ in range(3)], [200, 200, 429])
+            self.assertIn('Retry-After', self.get('children/'))
+
+
+class AsyncChainTests(SimpleTestCase):
+    def test_no_middleware_needs_a_sync_adapter(self):
+        # Django logs each adaptation on django.request, with DEBUG on.
+        with override_settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    def test_static_files_are_served_asynchronously(self):
+        path = 'rest_framework/css/bootstrap.min.css'
+        response = async_to_sync(AsyncClient().get)(f'{settings.STATIC_URL}{path}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        with open(settings.STATIC_ROOT / path, 'rb') as f:
+            self.assertEqual(b''.join(async_to_sync(self.read)(response)), f.read())
+
+    async def read(self, response):
+        return [chunk async for chunk in response.streaming_content]
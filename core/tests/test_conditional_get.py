@@ -0,0 +1,99 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import AssessmentRequest, ChildrenEligibility, WeeklyProgressReport, WeeklyServicesProvided
+from core.tests.base import APITestCase, make_child, make_user
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent', first_name='Maria', last_name='Cruz')
+        self.child = make_child(self.parent)
+        self.client.force_authenticate(self.parent)
+
+    def etag(self, path='/api/children/', **params):
+        response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_list_revalidates_without_a_query(self):
+        etag = self.etag()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/children/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(len(captured), 0, [query['sql'] for query in captured])
+
+    def test_list_etag_follows_the_rows(self):
+        etag = self.etag()
+        self.child.grade_level = 'Grade 2'
+        self.child.save()
+        changed = self.etag()
+        self.assertNotEqual(changed, etag)
+
+        make_child(self.parent, first_name='Ben')
+        self.assertNotEqual(self.etag(), changed)
+
+    def test_list_etag_follows_expanded_child_rows(self):
+        etag = self.etag(expand='eligibilities')
+        ChildrenEligibility.objects.create(
+            child=self.child, eligibility_type='ADHD_ADD', date_identified=datetime.date(2024, 2, 1)
+        )
+        self.assertNotEqual(self.etag(expand='eligibilities'), etag)
+
+    def test_list_etag_follows_embedded_user_names(self):
+        etag = self.etag()
+        self.parent.last_name = 'Santos'
+        self.parent.save()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_list_etag_varies_with_the_representation(self):
+        etags = {
+            self.etag(),
+            self.etag(fields='child_id'),
+            self.etag(expand='eligibilities'),
+            self.client.get('/api/children/', HTTP_ACCEPT='application/msgpack')['ETag'],
+        }
+        self.assertEqual(len(etags), 4)
+
+    def test_detail_revalidates(self):
+        path = f'/api/children/{self.child.pk}/'
+        response = self.client.get(path)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        ChildrenEligibility.objects.create(
+            child=self.child, eligibility_type='ADHD_ADD', date_identified=datetime.date(2024, 2, 1)
+        )
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['eligibilities']), 1)
+
+    def test_detail_etag_follows_related_rows_on_uncached_viewsets(self):
+        report = WeeklyProgressReport.objects.create(
+            child=self.child, report_type='TEACHER_INPUT', report_date=datetime.date(2024, 3, 8),
+            week_start_date=datetime.date(2024, 3, 4), week_end_date=datetime.date(2024, 3, 8),
+        )
+        path = f'/api/weekly-progress-reports/{report.pk}/'
+        etag = self.etag(path)
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        WeeklyServicesProvided.objects.create(report=report, service_type='ACADEMIC_SUPPORT', session_count=2)
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['services_provided']), 1)
+
+        request = AssessmentRequest.objects.create(
+            child=self.child, parent=self.parent, specialist=make_user('speech', role='SPECIALIST'),
+        )
+        path = f'/api/assessment-requests/{request.pk}/'
+        etag = self.etag(path)
+        self.child.first_name = 'Anabel'
+        self.child.save()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['child_name'], 'Anabel')
@@ -0,0 +1,54 @@
+import io
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+
+from core.context import get_contexts
+from core.models import ChildContextSnapshot, Job, ParentInput
+from core.tests.base import make_child, make_user
+
+
+class SnapshotRefreshTests(TestCase):
+    def setUp(self):
+        self.parent = make_user('parent')
+        self.child = make_child(self.parent, primary_language='English')
+        self.run_jobs()
+        self.snapshot = ChildContextSnapshot.objects.get(child=self.child)
+
+    def run_jobs(self):
+        call_command('run_workers', once=True, stdout=io.StringIO())
+
+    def queued(self):
+        return list(Job.objects.filter(task='context.refresh', status='QUEUED').values_list('payload', flat=True))
+
+    def test_saves_queue_one_rebuild_per_section_and_the_worker_runs_it(self):
+        ParentInput.objects.create(child=self.child, parent=self.parent, areas_of_concern=['Speech'])
+        ParentInput.objects.create(child=self.child, parent=self.parent, areas_of_concern=['Motor'])
+        self.assertEqual(self.queued(), [{'child': str(self.child.pk), 'sections': ['parent']}])
+        self.assertEqual(get_contexts([self.child.pk])[self.child.pk].get('parent'), None)  # not yet rebuilt
+
+        self.run_jobs()
+        self.assertEqual(self.queued(), [])
+        context = get_contexts([self.child.pk])[self.child.pk]
+        self.assertEqual(context['parent']['areas_of_concern'], ['Motor'])  # the latest submission
+        self.assertEqual(ChildContextSnapshot.objects.get(child=self.child).version, self.snapshot.version + 1)
+
+    def test_rolled_back_saves_queue_nothing(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            ParentInput.objects.create(child=self.child, parent=self.parent, areas_of_concern=['Speech'])
+            raise RuntimeError
+        self.assertEqual(self.queued(), [])
+
+    def test_saves_of_fields_outside_the_context_queue_nothing(self):
+        self.child.assessment_status = 'for_assessment'
+        self.child.save(update_fields=['assessment_status'])
+        self.assertEqual(self.queued(), [])
+        self.child.primary_language = 'Filipino'
+        self.child.save(update_fields=['primary_language', 'assessment_status'])
+        self.assertEqual(self.queued(), [{'child': str(self.child.pk), 'sections': ['child']}])
+
+    def test_unchanged_content_keeps_the_version(self):
+        self.child.save()
+        self.run_jobs()
+        self.assertEqual(ChildContextSnapshot.objects.get(child=self.child).version, self.snapshot.version)
@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+class PoolSettingsTests(SimpleTestCase):
+    def load(self, **env):
+        """CONN_MAX_AGE and 'default''s pool options, as ara.settings sets them under `env`."""
+        script = (
+            'import json, django; django.setup(); from django.conf import settings; '
+            "db = settings.DATABASES['default']; "
+            "print(json.dumps([db['CONN_MAX_AGE'], db['OPTIONS'].get('pool')]))"
+        )
+        base = {key: value for key, value in os.environ.items()
+                if not key.startswith('DATABASE_') and key != 'DJANGO_SETTINGS_MODULE'}
+        output = subprocess.run([sys.executable, '-c', script], cwd=settings.BASE_DIR, capture_output=True,
+                                text=True, check=True, env={**base, 'DJANGO_SETTINGS_MODULE': 'ara.settings', **env})
+        return json.loads(output.stdout)
+
+    def test_postgresql_is_pooled_by_default(self):
+        conn_max_age, pool = self.load()
+        self.assertEqual((conn_max_age, pool['max_size']), (0, 10))
+
+    def test_without_the_pool_connections_persist(self):
+        self.assertEqual(self.load(DATABASE_POOL='False'), [600, None])
+        self.assertEqual(self.load(DATABASE_POOL='False', DATABASE_CONN_MAX_AGE='60'), [60, None])
+
+    def test_pool_options_from_the_url_are_numbers(self):
+        url = 'postgres://ara@localhost/ara?pool_min_size=1&pool_max_size=4&pool_timeout=2.5&pool_max_idle=60'
+        conn_max_age, pool = self.load(DATABASE_URL=url, DATABASE_POOL='False')
+        self.assertEqual(conn_max_age, 0)
+        self.assertEqual({key: pool[key] for key in ('min_size', 'max_size', 'timeout', 'max_idle')},
+                         {'min_size': 1, 'max_size': 4, 'timeout': 2.5, 'max_idle': 60.0})
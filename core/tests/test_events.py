@@ -0,0 +1,103 @@
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.db import connection
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import events
+from core.events import aredeem_ticket
+from core.tests.base import APITestCase, make_user
+
+
+@override_settings(EVENTS_BROKER='local')
+class EventStreamTicketTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('parent')
+
+    def ticket(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/events/ticket/')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['expires_in'], 60)
+        return response.data['ticket']
+
+    def stream(self, **params):
+        return async_to_sync(AsyncClient().get)('/api/events/', params)
+
+    def test_a_ticket_opens_one_stream(self):
+        ticket = self.ticket()
+        response = self.stream(ticket=ticket)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        async_to_sync(self.close)(response)
+
+        self.assertEqual(self.stream(ticket=ticket).status_code, 401)
+
+    async def close(self, response):
+        frames = aiter(response.streaming_content)
+        self.assertEqual(await anext(frames), b'retry: 3000\n\n')
+        await frames.aclose()
+
+    def test_tickets_are_single_use(self):
+        ticket = self.ticket()
+        self.assertEqual(async_to_sync(aredeem_ticket)(ticket), self.user.pk)
+        self.assertIsNone(async_to_sync(aredeem_ticket)(ticket))
+        self.assertIsNone(async_to_sync(aredeem_ticket)('made-up'))
+
+    def test_access_tokens_are_not_accepted_in_the_query_string(self):
+        self.assertEqual(self.stream(token=str(AccessToken.for_user(self.user))).status_code, 401)
+
+    def test_tickets_need_authentication(self):
+        self.assertEqual(self.client.post('/api/events/ticket/').status_code, 401)
+
+
+@override_settings(EVENTS_BROKER='postgres')
+class HubListenTests(TransactionTestCase):
+    """The LISTEN connection, with notifications delivered at COMMIT (so no TestCase transaction)."""
+
+    def test_the_listener_connects_without_blocking_the_loop(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('LISTEN needs PostgreSQL')
+        user = make_user('parent')
+        connect = events._connect_listener
+
+        def slow_connect():
+            time.sleep(0.3)  # a slow or unreachable database
+            return connect()
+
+        async def scenario():
+            hub = events.Hub()
+            with mock.patch('core.events._connect_listener', slow_connect):
+                started = time.monotonic()
+                subscription = hub.subscribe(user)
+                await asyncio.sleep(0.05)  # the loop still runs other work
+                self.assertLess(time.monotonic() - started, 0.2)
+                while isinstance(hub.listener, asyncio.Future):
+                    await asyncio.sleep(0.01)
+            try:
+                await sync_to_async(events.publish)({'type': 'ping'}, [user.pk])
+                event = await asyncio.wait_for(subscription.queue.get(), 5)
+                self.assertEqual((event['type'], event['audience']), ('ping', [str(user.pk)]))
+            finally:
+                hub._stop_listening()
+
+        async_to_sync(scenario)()
+
+    def test_a_connection_that_arrives_after_listening_stopped_is_closed(self):
+        user = make_user('parent')
+        conn = mock.Mock()
+
+        async def scenario():
+            hub = events.Hub()
+            with mock.patch('core.events._connect_listener', return_value=conn):
+                hub.subscribe(user)
+                hub._stop_listening()
+                await asyncio.sleep(0.1)
+            self.assertIsNone(hub.listener)
+
+        async_to_sync(scenario)()
+        conn.close.assert_called_once_with()
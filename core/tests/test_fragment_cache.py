@@ -0,0 +1,41 @@
+from core.cache import fragment_version
+from core.models import Child
+from core.signals import bulk_written
+from core.tests.base import APITestCase, make_child, make_user
+
+
+class FragmentVersionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent', first_name='Maria', last_name='Cruz')
+        self.other = make_user('other', first_name='Rosa', last_name='Lim')
+        self.child = make_child(self.parent)
+        self.others_child = make_child(self.other, first_name='Ben')
+
+    def versions(self):
+        return [fragment_version('core.child', child.pk) for child in (self.child, self.others_child)]
+
+    def test_renaming_a_user_bumps_only_the_rows_naming_them(self):
+        mine, theirs = self.versions()
+        self.parent.last_name = 'Santos'
+        self.parent.save()
+        self.assertNotEqual(self.versions()[0], mine)
+        self.assertEqual(self.versions()[1], theirs)
+
+        self.client.force_authenticate(self.parent)
+        response = self.client.get(f'/api/children/{self.child.pk}/')
+        self.assertEqual(response.data['parent_name'], 'Maria Santos')
+
+    def test_login_bumps_nothing(self):
+        before = self.versions()
+        self.parent.save(update_fields=['last_login'])
+        self.assertEqual(self.versions(), before)
+
+    def test_bulk_writes_bump_explicitly(self):
+        self.client.force_authenticate(self.parent)
+        etag = self.client.get('/api/children/')['ETag']
+        Child.objects.filter(pk=self.child.pk).update(grade_level='Grade 3')
+        self.assertEqual(self.client.get('/api/children/')['ETag'], etag)
+
+        bulk_written(Child, [self.child])
+        self.assertNotEqual(self.client.get('/api/children/')['ETag'], etag)
@@ -0,0 +1,116 @@
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.generation import StubGenerator, generate
+from core.models import AIGeneratedContent, AIGenerationLog, Job, ParentInput
+from core.tests.base import APITestCase, make_child, make_user
+
+
+class StubGeneratorTests(TestCase):
+    def test_goals_follow_concerns_then_weak_skill_areas(self):
+        context = {
+            'parent': {'areas_of_concern': ['Speech']},
+            'assessments': [{'skill_areas': [
+                {'skill_name': 'Fine motor', 'rating': 'POOR'},
+                {'skill_name': 'Speech', 'rating': 'FAIR'},
+                {'skill_name': 'Reading', 'rating': 'GOOD'},
+            ]}],
+        }
+        output = StubGenerator().generate_one(
+            {'generation_type': 'GOAL_CREATION', 'context': context, 'instructions': {}}
+        )
+        self.assertEqual([goal['goal_category'] for goal in output['content']['goals']], ['Speech', 'Fine motor'])
+        self.assertEqual(output['confidence'], 0.5)  # two of the four sources
+
+    def test_grammar_correction_needs_no_context(self):
+        output = StubGenerator().generate_one({
+            'generation_type': 'GRAMMAR_CORRECTION', 'context': None,
+            'instructions': {'text': 'he  reads well. needs help with math!'},
+        })
+        self.assertEqual(output['content'], {'text': 'He reads well. Needs help with math.'})
+        self.assertEqual(output['confidence'], 0.25)
+
+
+class GenerateTests(TestCase):
+    def setUp(self):
+        self.parent = make_user('parent')
+        self.child = make_child(self.parent)
+        ParentInput.objects.create(child=self.child, parent=self.parent, areas_of_concern=['Speech'])
+        self.generator = StubGenerator()
+        self.generator.batch_size = 2
+        self.calls = mock.patch.object(self.generator, 'generate', wraps=self.generator.generate).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def request(self, generation_type='GOAL_CREATION', **instructions):
+        return {'generation_type': generation_type, 'child': self.child.pk, 'instructions': instructions}
+
+    def test_identical_requests_reach_the_generator_once(self):
+        requests = [self.request(), self.request(), self.request(max_goals=1), self.request('PROGRESS_REPORT')]
+        results = generate(requests, user=self.parent, generator=self.generator)
+
+        self.assertEqual([len(call.args[0]) for call in self.calls.call_args_list], [2, 1])
+        self.assertEqual(AIGeneratedContent.objects.count(), 3)
+        self.assertEqual(results[0]['content_id'], results[1]['content_id'])
+        self.assertEqual(results[0]['content']['goals'][0]['goal_category'], 'Speech')
+        self.assertFalse(any(result['cached'] for result in results))
+        self.assertEqual(AIGenerationLog.objects.filter(requested_by=self.parent, cache_hit=False).count(), 4)
+
+    def test_repeats_are_served_from_the_cache(self):
+        first, = generate([self.request()], generator=self.generator)
+        second, = generate([self.request()], generator=self.generator)
+        self.assertEqual(self.calls.call_count, 1)
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['content'], first['content'])
+        self.assertEqual(AIGeneratedContent.objects.get().hits, 1)
+
+    def test_new_input_or_model_version_misses_the_cache(self):
+        first, = generate([self.request()], generator=self.generator)
+        ParentInput.objects.create(child=self.child, parent=self.parent, areas_of_concern=['Behavior'])
+        call_command('run_workers', once=True, stdout=io.StringIO())  # the queued snapshot refresh
+        changed, = generate([self.request()], generator=self.generator)
+        self.assertFalse(changed['cached'])
+        self.assertNotEqual(changed['content'], first['content'])
+
+        self.generator.model_version = 'stub-2'
+        upgraded, = generate([self.request()], generator=self.generator)
+        self.assertFalse(upgraded['cached'])
+        self.assertEqual(upgraded['content'], changed['content'])
+        self.assertEqual(AIGeneratedContent.objects.get(pk=upgraded['content_id']).ai_model_version, 'stub-2')
+
+
+class GenerateEndpointTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.specialist = make_user('speech', role='SPECIALIST')
+        self.child = make_child(make_user('parent'))
+        self.client.force_authenticate(self.specialist)
+
+    def post(self, *requests):
+        return self.client.post('/api/ai-generation-logs/generate/', {'requests': list(requests)}, format='json')
+
+    def test_generation_is_queued_and_run_by_a_worker(self):
+        response = self.post(
+            {'generation_type': 'IEP_GENERATION', 'child': str(self.child.pk)},
+            {'generation_type': 'GRAMMAR_CORRECTION', 'instructions': {'text': 'good day'}},
+        )
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(response.data['task'], 'ai.generate')
+
+        call_command('run_workers', once=True, stdout=io.StringIO())
+        job = Job.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, 'SUCCEEDED', job.last_error)
+        iep, grammar = job.result
+        self.assertEqual(iep['child'], str(self.child.pk))
+        self.assertEqual(set(iep['content']), {'present_levels', 'goals', 'accommodations'})
+        self.assertEqual(grammar['content'], {'text': 'Good day.'})
+
+    def test_invalid_requests_are_refused(self):
+        response = self.post({'generation_type': 'GOAL_CREATION'})
+        self.assertEqual(response.status_code, 400)
+        response = self.post({'generation_type': 'GRAMMAR_CORRECTION', 'instructions': {}})
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(self.child.parent)
+        self.assertEqual(self.post({'generation_type': 'GOAL_CREATION', 'child': str(self.child.pk)}).status_code, 403)
@@ -0,0 +1,85 @@
+import time
+
+from django.test import TransactionTestCase, override_settings
+
+from core import jobs
+from core.models import Job
+from core.tests.base import APITestCase, make_user
+
+
+REAPED = []
+
+
+@jobs.task(name='tests.noop')
+def noop():
+    return 'done'
+
+
+@jobs.task(name='tests.slow', max_attempts=2)
+def slow(seconds, reap_after):
+    """Sleeps past a short lock timeout, reaping halfway through."""
+    time.sleep(reap_after)
+    REAPED.append(jobs.reap_stale(timeout=0.3))
+    time.sleep(seconds - reap_after)
+    return 'done'
+
+
+class HeartbeatTests(TransactionTestCase):
+    """The heartbeat writes from its own thread, so the rows must be committed."""
+
+    def setUp(self):
+        REAPED.clear()
+
+    def run_slow_job(self):
+        jobs.enqueue('tests.slow', {'seconds': 0.8, 'reap_after': 0.5})
+        job, = jobs.claim('test-worker')
+        jobs.run(job)
+        job.refresh_from_db()
+        return job
+
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0.1)
+    def test_a_renewed_lock_is_not_reaped(self):
+        job = self.run_slow_job()
+        self.assertEqual(REAPED, [0])
+        self.assertEqual((job.status, job.result), ('SUCCEEDED', 'done'))
+
+    @override_settings(JOB_HEARTBEAT_INTERVAL=60)
+    def test_an_unrenewed_lock_is_reaped(self):
+        job = self.run_slow_job()
+        self.assertEqual(REAPED, [1])
+        # Requeued by the reaper; the late finish must not overwrite that.
+        self.assertEqual((job.status, job.result, job.locked_by), ('QUEUED', None, ''))
+        self.assertEqual(Job.objects.count(), 1)
+
+
+class JobListETagTests(APITestCase):
+    """Workers change jobs with QuerySet.update(), which sends no signals."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user('parent')
+        self.client.force_authenticate(self.user)
+
+    def list_jobs(self, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get('/api/jobs/', **headers)
+
+    def test_the_job_list_changes_as_a_job_runs(self):
+        jobs.enqueue('tests.noop', user=self.user)
+        etag = self.list_jobs()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            job, = jobs.claim('test-worker')
+        response = self.list_jobs(etag)
+        self.assertEqual((response.status_code, response.data['results'][0]['status']), (200, 'RUNNING'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.run(job)
+        response = self.list_jobs(response['ETag'])
+        self.assertEqual((response.status_code, response.data['results'][0]['status']), (200, 'SUCCEEDED'))
+
+    def test_cancelling_changes_the_job_list(self):
+        job = jobs.enqueue('tests.noop', user=self.user)
+        etag = self.list_jobs()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.cancel(job.pk)
+        self.assertEqual(self.list_jobs(etag).status_code, 200)
@@ -0,0 +1,49 @@
+from core.matching import specialist_loads
+from core.models import AssessmentRequest, ParentInput
+from core.tests.base import APITestCase, make_child, make_user
+
+
+class RankedSpecialistsTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent')
+        self.child = make_child(self.parent)
+        ParentInput.objects.create(child=self.child, parent=self.parent, areas_of_concern=['Speech', 'Motor'])
+        self.speech = make_user('speech', role='SPECIALIST', focus_areas=['speech'], years_experience=2)
+        self.motor = make_user('motor', role='SPECIALIST', focus_areas=['Motor', 'Speech'], years_experience=2)
+
+    def ranked(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get('/api/specialists/ranked/', {'child': str(self.child.pk)})
+
+    def test_specialists_are_ranked_by_concerns_then_load(self):
+        response = self.ranked(self.parent)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['email'] for row in response.data], [self.motor.email, self.speech.email])
+        self.assertEqual(response.data[0]['score_breakdown']['matched_areas'], ['Motor', 'Speech'])
+
+        AssessmentRequest.objects.create(child=self.child, parent=self.parent, specialist=self.motor)
+        AssessmentRequest.objects.create(child=self.child, parent=self.parent, specialist=self.motor)
+        response = self.ranked(self.parent)
+        self.assertEqual(response.data[0]['score_breakdown']['open_requests'], 2)
+
+    def test_only_children_the_user_can_see_are_ranked_for(self):
+        self.assertEqual(self.ranked(make_user('stranger')).status_code, 404)
+        self.assertEqual(self.ranked(self.speech).status_code, 404)  # not ready for assessment
+        self.child.assessment_status, self.child.intake_status = 'for_assessment', 'completed'
+        self.child.save()
+        self.assertEqual(self.ranked(self.speech).status_code, 200)
+
+
+class SpecialistLoadTests(APITestCase):
+    def test_reassigning_a_request_drops_both_specialists_loads(self):
+        parent = make_user('parent')
+        speech = make_user('speech', role='SPECIALIST')
+        motor = make_user('motor', role='SPECIALIST')
+        request = AssessmentRequest.objects.create(child=make_child(parent), parent=parent, specialist=speech)
+        self.assertEqual(specialist_loads([speech.pk, motor.pk]), {speech.pk: 1, motor.pk: 0})
+
+        request = AssessmentRequest.objects.get(pk=request.pk)
+        request.specialist = motor
+        request.save(update_fields=['specialist'])
+        self.assertEqual(specialist_loads([speech.pk, motor.pk]), {speech.pk: 0, motor.pk: 1})
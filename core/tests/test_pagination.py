@@ -0,0 +1,72 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Child
+from core.tests.base import APITestCase, make_user
+
+
+PAGE_SIZE = 50
+
+
+class OptionalCountPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent')
+        Child.objects.bulk_create(
+            Child(parent=self.parent, first_name=f'Child{i}', last_name='Cruz',
+                  date_of_birth=datetime.date(2018, 1, 1))
+            for i in range(PAGE_SIZE + 3)
+        )
+        self.client.force_authenticate(self.parent)
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/children/', params)
+        self.assertEqual(response.status_code, 200)
+        counted = any('AS "__count"' in query['sql'] for query in captured)
+        return response.data, counted
+
+    def test_default_is_an_exact_count(self):
+        data, counted = self.get()
+        self.assertTrue(counted)
+        self.assertEqual(data['count'], PAGE_SIZE + 3)
+        self.assertNotIn('count_exact', data)
+        self.assertEqual(len(data['results']), PAGE_SIZE)
+
+    def test_none_skips_the_count(self):
+        data, counted = self.get(count='none')
+        self.assertFalse(counted)
+        self.assertIsNone(data['count'])
+        self.assertIs(data['count_exact'], False)
+        self.assertEqual(len(data['results']), PAGE_SIZE)
+        self.assertIn('page=2', data['next'])
+        self.assertIsNone(data['previous'])
+
+        data, _ = self.get(count='none', page=2)
+        self.assertEqual(len(data['results']), 3)
+        self.assertIsNone(data['next'])
+        self.assertNotIn('page=', data['previous'])
+
+    def test_estimate_uses_the_planner(self):
+        data, counted = self.get(count='estimate')
+        self.assertFalse(counted)
+        self.assertIsInstance(data['count'], int)
+        self.assertIs(data['count_exact'], False)
+
+    def test_cached_counts_once(self):
+        data, counted = self.get(count='cached')
+        self.assertTrue(counted)
+        self.assertEqual(data['count'], PAGE_SIZE + 3)
+
+        Child.objects.filter(first_name='Child0').delete()
+        data, counted = self.get(count='cached')
+        self.assertFalse(counted)
+        self.assertEqual(data['count'], PAGE_SIZE + 3)
+
+    def test_pages_past_the_end_are_not_found(self):
+        for params in ({'page': 3}, {'page': 0}, {'page': 'x'}):
+            with self.subTest(**params):
+                response = self.client.get('/api/children/', {'count': 'none', **params})
+                self.assertEqual(response.status_code, 404)
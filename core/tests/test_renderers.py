@@ -0,0 +1,85 @@
+import datetime
+import io
+import json
+import uuid
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import msgpack
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from core.tests.base import APITestCase, make_child, make_user
+
+
+def round_trip(renderer, parser, data):
+    body = renderer.render(data, renderer.media_type, {})
+    return parser.parse(io.BytesIO(body), parser.media_type, {})
+
+
+class MessagePackRoundTripTests(SimpleTestCase):
+    renderer = MessagePackRenderer()
+    parser = MessagePackParser()
+
+    def test_extension_types_keep_their_type(self):
+        data = {
+            'id': uuid.UUID('7c9e6679-7425-40de-944b-e07fc1f90ae7'),
+            'date_of_birth': datetime.date(2019, 3, 1),
+            'score': Decimal('0.8700'),
+            'scheduled': datetime.datetime(2025, 1, 6, 9, 30, 15, 250000, tzinfo=ZoneInfo('Asia/Manila')),
+            'nested': [{'ids': [uuid.UUID(int=1), uuid.UUID(int=2)]}],
+        }
+        parsed = round_trip(self.renderer, self.parser, data)
+        self.assertEqual(parsed, data)
+        self.assertIsInstance(parsed['score'], Decimal)
+        self.assertEqual(str(parsed['score']), '0.8700')
+        self.assertEqual(parsed['scheduled'].utcoffset(), datetime.timedelta(0))
+
+    def test_other_types_match_the_json_response(self):
+        data = {
+            'naive': datetime.datetime(2025, 1, 6, 9, 30),
+            'time': datetime.time(14, 5),
+            'duration': datetime.timedelta(minutes=45),
+        }
+        self.assertEqual(
+            round_trip(self.renderer, self.parser, data),
+            round_trip(ORJSONRenderer(), ORJSONParser(), data),
+        )
+
+    def test_unknown_extension_types_are_left_alone(self):
+        body = msgpack.packb({'x': msgpack.ExtType(42, b'raw')})
+        self.assertEqual(self.parser.parse(io.BytesIO(body)), {'x': msgpack.ExtType(42, b'raw')})
+
+    def test_malformed_extension_is_a_parse_error(self):
+        for code, data in ((1, b'short'), (2, b'2025-13-01'), (3, b'not a number')):
+            with self.subTest(code=code), self.assertRaises(ParseError):
+                self.parser.parse(io.BytesIO(msgpack.packb(msgpack.ExtType(code, data))))
+
+
+class MessagePackAPITests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent')
+        self.client.force_authenticate(self.parent)
+
+    def test_msgpack_response_re_encodes_to_the_json_response(self):
+        make_child(self.parent)
+        as_json = self.client.get('/api/children/', HTTP_ACCEPT='application/json')
+        as_msgpack = self.client.get('/api/children/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(as_msgpack['Content-Type'], 'application/msgpack')
+
+        parsed = MessagePackParser().parse(io.BytesIO(as_msgpack.content))
+        self.assertEqual(json.loads(ORJSONRenderer().render(parsed)), json.loads(as_json.content))
+
+    def test_msgpack_request_body(self):
+        body = MessagePackRenderer().render({
+            'first_name': 'Lia', 'last_name': 'Santos', 'date_of_birth': datetime.date(2020, 5, 17),
+            'parent': self.parent.pk,  # a UUID, packed as extension 1
+        })
+        response = self.client.post('/api/children/', body, content_type='application/msgpack',
+                                    HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['date_of_birth'], '2020-05-17')
+        self.assertEqual(response.json()['parent'], str(self.parent.pk))
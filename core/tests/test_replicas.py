@@ -0,0 +1,165 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import dj_database_url
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import replicas
+from core.checks import check_replica_pins
+from core.models import Child
+from core.tests.base import make_child, make_user
+
+
+# A streaming standby of the database the tests run against, e.g.
+# postgres://postgres@%2Ftmp%2Fpgsock:5433/ara_db (the name is ignored: the
+# standby replays the test database the runner creates on the primary).
+REPLICA_URL = os.getenv('TEST_REPLICA_URL')
+
+
+def shared_cache(test):
+    location = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, location, ignore_errors=True)
+    return override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+    }})
+
+
+class ReplicaSettingsTests(SimpleTestCase):
+    def test_replicas_require_a_shared_cache(self):
+        with override_settings(DATABASE_REPLICAS=['replica1']):
+            self.assertEqual([e.id for e in check_replica_pins()], ['core.E002'])
+            with self.assertRaises(ImproperlyConfigured):
+                replicas.ReplicaMiddleware(lambda request: None)
+            with shared_cache(self):
+                self.assertEqual(check_replica_pins(), [])
+                replicas.ReplicaMiddleware(lambda request: None)
+        self.assertEqual(check_replica_pins(), [])
+
+    def test_replica_connections_give_up_quickly(self):
+        script = (
+            'import json, django; django.setup(); from django.conf import settings; '
+            "options = settings.DATABASES['replica1']['OPTIONS']; "
+            "print(json.dumps([options['connect_timeout'], options.get('pool', {}).get('timeout')]))"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'ara.settings', 'DATABASE_POOL': 'True',
+               'DATABASE_REPLICA_URLS': 'postgres://reader@replica.internal:5432/ara_db'}
+        output = subprocess.run([sys.executable, '-c', script], env=env, cwd=settings.BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout
+        self.assertEqual(json.loads(output), [settings.REPLICA_CONNECT_TIMEOUT] * 2)
+
+
+@unittest.skipUnless(REPLICA_URL, 'TEST_REPLICA_URL (a streaming standby of the test database) is not set')
+class StandbyTests(TransactionTestCase):
+    """Reads against a real standby: routing, read-your-writes and lag fallback."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A connection made here rather than in DATABASES, so the test runner
+        # neither creates a database on it nor forbids it.
+        url = dj_database_url.parse(REPLICA_URL)
+        primary = connections['default']
+        connections['standby'] = type(primary)({
+            **primary.settings_dict,
+            **{key: url[key] for key in ('HOST', 'PORT', 'USER', 'PASSWORD')},
+            'OPTIONS': {'connect_timeout': settings.REPLICA_CONNECT_TIMEOUT},
+        }, alias='standby')
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['standby'].close()
+        del connections['standby']
+        super().tearDownClass()
+
+    def setUp(self):
+        overrides = override_settings(
+            DATABASE_REPLICAS=['standby'],
+            DATABASE_ROUTERS=['core.replicas.ReplicaRouter'],
+            MIDDLEWARE=[*settings.MIDDLEWARE, 'core.replicas.ReplicaMiddleware'],
+            REPLICA_LAG_CHECK_INTERVAL=0,
+            SECURE_SSL_REDIRECT=False,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        cache = shared_cache(self)
+        cache.enable()
+        self.addCleanup(cache.disable)
+        replicas._health.clear()
+
+        self.parent = make_user('parent')
+        self.other = make_user('other', role='ADMIN')
+        self.child = make_child(self.parent)
+        self.wait_for_standby(lambda: Child.objects.using('standby').filter(pk=self.child.pk).exists())
+
+    def wait_for_standby(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail('The standby did not catch up')
+            time.sleep(0.05)
+
+    def standby(self, sql):
+        with connections['standby'].cursor() as cursor:
+            cursor.execute(sql)
+
+    def list_children(self, client):
+        """GET /api/children/ and the alias its SELECT ran on."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['standby']) as standby:
+            response = client.get('/api/children/')
+        self.assertEqual(response.status_code, 200)
+        ran_on = {alias for alias, captured in (('default', primary), ('standby', standby))
+                  if any('FROM "core_child"' in query['sql'] for query in captured)}
+        return response, ran_on
+
+    def client_for(self, user):
+        # A real token: the middleware pins by the user id in it (by address without one).
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def test_safe_requests_read_from_the_standby(self):
+        self.assertLess(replicas.replica_lag('standby'), settings.REPLICA_MAX_LAG)
+        response, ran_on = self.list_children(self.client_for(self.parent))
+        self.assertEqual(ran_on, {'standby'})
+        self.assertEqual(response.data['count'], 1)
+
+    def test_a_client_that_wrote_reads_its_writes_from_the_primary(self):
+        writer = self.client_for(self.parent)
+        self.standby('SELECT pg_wal_replay_pause()')  # the write cannot reach the standby
+        self.addCleanup(self.standby, 'SELECT pg_wal_replay_resume()')
+        response = writer.post('/api/children/', {
+            'first_name': 'Ben', 'last_name': 'Cruz', 'date_of_birth': '2019-03-01', 'parent': str(self.parent.pk),
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+
+        response, ran_on = self.list_children(writer)
+        self.assertEqual(ran_on, {'default'})
+        self.assertEqual(response.data['count'], 2)
+
+        # Another client is not pinned; the standby is still within REPLICA_MAX_LAG.
+        _, ran_on = self.list_children(self.client_for(self.other))
+        self.assertEqual(ran_on, {'standby'})
+
+    @override_settings(REPLICA_MAX_LAG=0.5)
+    def test_a_lagging_standby_is_skipped(self):
+        self.standby('SELECT pg_wal_replay_pause()')
+        self.addCleanup(self.standby, 'SELECT pg_wal_replay_resume()')
+        make_child(self.parent, first_name='Ben')
+        time.sleep(1)
+        self.assertGreater(replicas.replica_lag('standby'), 0.5)
+        response, ran_on = self.list_children(self.client_for(self.other))
+        self.assertEqual(ran_on, {'default'})
+        self.assertEqual(response.data['count'], 2)
@@ -0,0 +1,128 @@
+import csv
+import io
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from core.models import Child, User
+from core.roster import RosterError, check_invite_token, import_roster
+from core.tests.base import make_child, make_user
+
+
+HEADER = 'parent_email,parent_first_name,parent_last_name,child_first_name,child_last_name,child_date_of_birth'
+
+
+def roster(*rows, header=HEADER):
+    return io.StringIO('\n'.join([header, *rows]) + '\n')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RosterImportTests(TestCase):
+    def test_imports_parents_and_children_and_reports_row_errors(self):
+        existing = make_user('maria', email='maria@example.com')
+        make_child(existing, first_name='Ana', last_name='Cruz', date_of_birth='2018-05-01')
+        make_user('teacher', role='TEACHER', email='teacher@example.com')
+
+        report = import_roster(roster(
+            'Maria@Example.com ,Maria,Cruz,Ana,Cruz,2018-05-01',  # 1: already there
+            'maria@example.com,Maria,Cruz,Ben,Cruz,2019-02-28',   # 2
+            'rosa@example.com,Rosa,Lim,Cara,Lim,2020-02-29',      # 3: leap day
+            'rosa@example.com,Rosa,Lim,cara,LIM,2020-02-29',      # 4: repeat of 3
+            'rosa@example.com,Rosa,Lim,Dan,Lim,2019-02-29',       # 5
+            'rosa@example.com,Rosa,Lim,Eve,Lim,2019-13-01',       # 6
+            'rosa@example.com,Rosa,Lim,Fay,Lim,2019-00-10',       # 7
+            'rosa@example.com,Rosa,Lim,Gil,Lim,01/02/2019',       # 8
+            'rosa@example.com,Rosa,Lim,Hal,Lim,2999-01-01',       # 9
+            'teacher@example.com,Tom,Reyes,Ivy,Reyes,2018-01-01',  # 10
+            'not-an-email,,Lim,Jo,Lim,2018-01-01',                # 11
+        ))
+
+        self.assertEqual(report['rows'], 11)
+        self.assertEqual((report['parents_created'], report['parents_matched']), (1, 1))
+        self.assertEqual((report['children_created'], report['children_existing']), (2, 1))
+        self.assertEqual({error['row']: error['error'] for error in report['errors']}, {
+            4: 'duplicate of row 3',
+            5: 'child_date_of_birth is not a valid date',
+            6: 'child_date_of_birth is not a valid date',
+            7: 'child_date_of_birth is not a valid date',
+            8: 'child_date_of_birth must be YYYY-MM-DD',
+            9: 'child_date_of_birth is in the future',
+            10: 'parent_email belongs to a non-parent account',
+            11: 'parent_first_name is required; parent_email is not a valid email address',
+        })
+        self.assertEqual(
+            sorted(Child.objects.values_list('first_name', 'parent__email')),
+            [('Ana', 'maria@example.com'), ('Ben', 'maria@example.com'), ('Cara', 'rosa@example.com')],
+        )
+
+        rosa = User.objects.get(email='rosa@example.com')
+        self.assertEqual((rosa.role, rosa.username, rosa.has_usable_password()), ('PARENT', rosa.email, False))
+        invite, = report['invites']
+        self.assertEqual(invite['email'], rosa.email)
+        self.assertEqual(check_invite_token(invite['token']), rosa)
+
+    def test_rerunning_an_import_changes_nothing(self):
+        rows = ('rosa@example.com,Rosa,Lim,Cara,Lim,2020-02-29',)
+        import_roster(roster(*rows))
+        report = import_roster(roster(*rows))
+        self.assertEqual((report['parents_created'], report['children_created']), (0, 0))
+        self.assertEqual((report['parents_matched'], report['children_existing']), (1, 1))
+        self.assertEqual(Child.objects.count(), 1)
+
+    def test_dry_run_rolls_back(self):
+        report = import_roster(roster('rosa@example.com,Rosa,Lim,Cara,Lim,2020-02-29'), dry_run=True)
+        self.assertEqual((report['parents_created'], report['children_created'], report['invites']), (1, 1, []))
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Child.objects.exists())
+
+    def test_passwords_are_hashed_in_process_by_default(self):
+        header = HEADER + ',parent_password'
+        rows = [f'p{i}@example.com,P,L,C,L,2018-01-01,Secret123' for i in range(60)]
+        with mock.patch('core.roster.ProcessPoolExecutor') as pool:
+            report = import_roster(roster(*rows, 'weak@example.com,P,L,C,L,2018-01-01,secret', header=header))
+        pool.assert_not_called()
+        self.assertEqual(report['parents_created'], 60)
+        self.assertEqual(report['invites'], [])
+        self.assertEqual(report['errors'][0]['row'], 61)
+        self.assertTrue(User.objects.get(email='p7@example.com').check_password('Secret123'))
+
+    def test_malformed_lines_are_row_errors(self):
+        report = import_roster(roster(
+            'rosa@example.com,Rosa,Lim,Cara,Lim,2020-02-29',          # 1
+            '',                                                       # 2: blank, skipped
+            'rosa@example.com,Rosa,Lim,Dan,Lim',                      # 3: short
+            'rosa@example.com,Rosa,Lim,Eve,Lim,2019-01-01,extra',     # 4: long
+            'rosa@example.com,Rosa,Lim,Fay\x00,Lim,2019-01-01',       # 5
+            '"rosa@example.com",Rosa,Lim,"Gil\nJr",Lim,2018-01-01',   # 6: quoted newline
+        ))
+        self.assertEqual(report['rows'], 5)
+        self.assertEqual({error['row']: error['error'] for error in report['errors']}, {
+            3: 'row has 5 fields; the header has 6; child_date_of_birth is required',
+            4: 'row has 7 fields; the header has 6',
+            5: 'row contains a NUL character',
+        })
+        self.assertEqual(sorted(Child.objects.values_list('first_name', flat=True)), ['Cara', 'Gil\nJr'])
+
+    def test_unreadable_csv_names_the_line(self):
+        with self.assertRaisesMessage(RosterError, 'line 3:'):
+            import_roster(roster('rosa@example.com,Rosa,Lim,Cara,Lim,2020-02-29', 'x' * (csv.field_size_limit() + 1)))
+
+    def test_a_bad_header_refuses_the_file(self):
+        with self.assertRaisesMessage(RosterError, 'missing column(s): child_date_of_birth'):
+            import_roster(roster(header=HEADER.rsplit(',', 1)[0] + ',shoe_size'))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class RosterAdminTests(TestCase):
+    def test_upload_imports_and_shows_the_invites(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'Secret123', role='ADMIN')
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile('roster.csv', roster('rosa@example.com,Rosa,Lim,Cara,Lim,2020-02-29')
+                                    .getvalue().encode())
+        with mock.patch('core.roster.ProcessPoolExecutor') as pool:
+            response = self.client.post('/admin/core/child/import-roster/', {'csv_file': upload})
+        pool.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report']['children_created'], 1)
+        self.assertIn('rosa@example.com,', response.context['invites_csv'])
@@ -0,0 +1,96 @@
+import datetime
+
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from core.models import AssessmentBooking, AssessmentRequest, AvailabilityException, SpecialistAvailability
+from core.scheduling import IntervalSet, open_slots
+from core.tests.base import APITestCase, make_child, make_user
+
+
+class IntervalSetTests(SimpleTestCase):
+    def test_overlaps_merged_half_open_intervals(self):
+        blocked = IntervalSet([(5, 7), (1, 3), (2, 4), (10, 12)])
+        self.assertEqual((blocked.starts, blocked.ends), ([1, 5, 10], [4, 7, 12]))
+        self.assertTrue(blocked.overlaps(3, 5))
+        self.assertTrue(blocked.overlaps(0, 20))
+        self.assertFalse(blocked.overlaps(4, 5))  # touching ends do not overlap
+        self.assertFalse(blocked.overlaps(7, 10))
+        self.assertFalse(IntervalSet([]).overlaps(0, 1))
+
+
+class SchedulingTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent')
+        self.specialist = make_user('speech', role='SPECIALIST')
+        self.child = make_child(self.parent)
+        today = timezone.localdate()
+        self.monday = today + datetime.timedelta(days=7 - today.weekday())
+        SpecialistAvailability.objects.create(
+            specialist=self.specialist, weekday=0, start_time=datetime.time(9), end_time=datetime.time(12),
+        )
+
+    def at(self, hour, day=None):
+        return timezone.make_aware(datetime.datetime.combine(day or self.monday, datetime.time(hour)))
+
+    def slots(self):
+        return [start.hour for start, _ in open_slots(self.specialist.pk, start=self.at(0), days=1)]
+
+    def make_request(self):
+        return AssessmentRequest.objects.create(child=self.child, parent=self.parent, specialist=self.specialist)
+
+    def book(self, request, hour):
+        return self.client.post(f'/api/specialists/{self.specialist.pk}/book/', {
+            'assessment_request': str(request.pk), 'starts_at': self.at(hour).isoformat(),
+        }, format='json')
+
+    def test_open_slots_skip_time_off_and_bookings(self):
+        self.assertEqual(self.slots(), [9, 10, 11])
+        AvailabilityException.objects.create(
+            specialist=self.specialist, date=self.monday, start_time=datetime.time(9), end_time=datetime.time(10),
+        )
+        AssessmentBooking.objects.create(
+            specialist=self.specialist, child=self.child, assessment_request=self.make_request(),
+            starts_at=self.at(11), ends_at=self.at(12),
+        )
+        self.assertEqual(self.slots(), [10])
+
+    def test_booking_takes_the_slot(self):
+        self.client.force_authenticate(self.parent)
+        request = self.make_request()
+        response = self.book(request, 10)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(self.slots(), [9, 11])
+        request.refresh_from_db()
+        self.child.refresh_from_db()
+        self.assertEqual(request.status, 'APPROVED')
+        self.assertEqual(self.child.assessment_scheduled_date, self.at(10))
+
+        # Rebooking moves the booking rather than adding one.
+        self.assertEqual(self.book(request, 11).status_code, 201)
+        self.assertEqual(self.slots(), [9, 10])
+        self.assertEqual(AssessmentBooking.objects.count(), 1)
+
+    def test_a_taken_slot_is_a_conflict(self):
+        self.client.force_authenticate(self.parent)
+        self.assertEqual(self.book(self.make_request(), 10).status_code, 201)
+        other = AssessmentRequest.objects.create(
+            child=make_child(self.parent, first_name='Ben'), parent=self.parent, specialist=self.specialist,
+        )
+        response = self.book(other, 10)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error'], 'That slot is not available.')
+        self.assertEqual(self.book(other, 12).status_code, 409)  # outside the availability window
+
+    def test_the_database_refuses_overlapping_bookings(self):
+        AssessmentBooking.objects.create(
+            specialist=self.specialist, child=self.child, assessment_request=self.make_request(),
+            starts_at=self.at(9), ends_at=self.at(11),
+        )
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AssessmentBooking.objects.create(
+                specialist=self.specialist, child=self.child, assessment_request=self.make_request(),
+                starts_at=self.at(10), ends_at=self.at(12),
+            )
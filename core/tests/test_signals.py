@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import AssessmentRequest, Child
+from core.tests.base import make_child, make_user
+from core.worklist import queue_count
+
+
+@mock.patch('core.signals.publish')
+class StatusTrackingTests(TestCase):
+    def setUp(self):
+        self.parent = make_user('parent')
+        self.specialist = make_user('speech', role='SPECIALIST')
+        self.child = make_child(self.parent)
+        self.request = AssessmentRequest.objects.create(
+            child=self.child, parent=self.parent, specialist=self.specialist,
+        )
+
+    def save_queries(self, instance, **kwargs):
+        with CaptureQueriesContext(connection) as captured:
+            instance.save(**kwargs)
+        return [query['sql'] for query in captured]
+
+    def test_status_change_publishes_the_loaded_value(self, publish):
+        request = AssessmentRequest.objects.get(pk=self.request.pk)
+        request.status = 'REJECTED'
+        queries = self.save_queries(request)
+        self.assertFalse(any(q.startswith('SELECT') and 'core_assessmentrequest' in q for q in queries))
+        event, _ = publish.call_args.args
+        self.assertEqual((event['status'], event['previous']), ('REJECTED', 'PENDING'))
+
+        publish.reset_mock()
+        request.admin_notes = 'noted'
+        request.save()  # the saved status is now the loaded one
+        publish.assert_not_called()
+
+    def test_unwritten_fields_are_not_changes(self, publish):
+        request = AssessmentRequest.objects.get(pk=self.request.pk)
+        request.status = 'REJECTED'
+        request.save(update_fields=['admin_notes'])
+        publish.assert_not_called()
+        request.save(update_fields=['status'])
+        self.assertEqual(publish.call_args.args[0]['previous'], 'PENDING')
+
+    def test_deferred_status_is_read_before_the_save(self, publish):
+        child = Child.objects.only('pk').get(pk=self.child.pk)
+        child.assessment_status = 'for_assessment'
+        child.save(update_fields=['assessment_status'])
+        self.assertEqual(publish.call_args.args[0]['previous'], 'none')
+
+    def test_child_saves_touch_queue_counts_only_when_they_matter(self, publish):
+        self.assertEqual(queue_count(self.specialist.pk), 1)
+        child = Child.objects.get(pk=self.child.pk)
+        child.grade_level = 'Grade 2'
+        queries = self.save_queries(child)
+        self.assertFalse(any('core_assessmentrequest' in q for q in queries))
+
+        with mock.patch('core.signals.invalidate_queue_counts') as invalidate:
+            child.enrollment_status = 'enrolled'
+            child.save()
+        invalidate.assert_called_once()
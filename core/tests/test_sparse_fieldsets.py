@@ -0,0 +1,53 @@
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.tests.base import APITestCase, make_child, make_user
+from core.views import ParentInputViewSet
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent')
+        make_user('speech', role='SPECIALIST', first_name='Sam', last_name='Reyes')
+        self.client.force_authenticate(self.parent)
+
+    def test_fields_keeps_only_the_named_fields(self):
+        response = self.client.get('/api/specialists/', {'fields': 'user_id,full_name'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'][0]), {'user_id', 'full_name'})
+        self.assertEqual(response.data['results'][0]['full_name'], 'Sam Reyes')
+
+    def test_omit_drops_fields(self):
+        response = self.client.get('/api/specialists/', {'omit': 'email,phone'})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('email', response.data['results'][0])
+        self.assertIn('full_name', response.data['results'][0])
+
+    def test_expand_adds_declared_fields(self):
+        child = make_child(self.parent)
+        response = self.client.get('/api/children/', {'expand': 'eligibilities'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['child_id'], str(child.pk))
+        self.assertEqual(response.data['results'][0]['eligibilities'], [])
+
+    def test_unknown_fields_are_rejected(self):
+        for param in ('fields', 'omit', 'expand'):
+            with self.subTest(param=param):
+                response = self.client.get('/api/specialists/', {param: 'full_name,first_name'})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data[param], ['Unknown field(s): first_name.'])
+
+    def test_get_queryset_is_not_trimmed(self):
+        # ParentInputViewSet.get_queryset reads and saves every row it returns,
+        # so only the queryset handed to the serializer may be deferred.
+        request = APIRequestFactory().get('/api/parent-inputs/', {'fields': 'parent_input_id'})
+        force_authenticate(request, self.parent)
+        view = ParentInputViewSet(action_map={'get': 'list'}, format_kwarg=None, args=(), kwargs={})
+        view.request = view.initialize_request(request)
+
+        queryset = view.get_queryset()
+        self.assertEqual(queryset.query.deferred_loading, (frozenset(), True))
+        deferred, defer = view.filter_queryset(queryset).query.deferred_loading
+        self.assertFalse(defer)
+        self.assertIn('parent_input_id', deferred)
+        self.assertNotIn('first_name', deferred)
@@ -0,0 +1,66 @@
+import threading
+
+from django.core import checks
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_shared_cache
+from core.throttling import SlidingWindow, parse_rate
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'throttling-tests'}})
+class SlidingWindowTests(SimpleTestCase):
+    def setUp(self):
+        self.window = SlidingWindow('test', 3, 60)
+        self.addCleanup(self.window.reset, 'key', 600)
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('5/15m'), (5, 900))
+        self.assertEqual(parse_rate('100/hour'), (100, 3600))
+        with self.assertRaises(ValueError):
+            parse_rate('often')
+
+    def test_refused_attempts_do_not_count(self):
+        self.assertEqual([self.window.attempt('key', 600) for _ in range(3)], [0, 0, 0])
+        for _ in range(5):
+            self.assertEqual(self.window.attempt('key', 630), 30)
+        # Half the first window still weighs in: 3 * 0.5 + 1 is still under 3.
+        self.assertEqual([self.window.attempt('key', 690) for _ in range(2)], [0, 0])
+        self.assertGreater(self.window.attempt('key', 690), 0)
+
+    def test_concurrent_attempts_never_exceed_the_limit(self):
+        window = SlidingWindow('test', 25, 60)
+        self.addCleanup(window.reset, 'key', 600)
+        allowed, barrier = [], threading.Barrier(8)
+
+        def hammer():
+            barrier.wait()
+            for _ in range(20):
+                if not window.attempt('key', 600):
+                    allowed.append(1)
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(allowed), 25)
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_per_process_caches_are_refused(self):
+        for backend in ('locmem.LocMemCache', 'dummy.DummyCache'):
+            with self.subTest(backend=backend), override_settings(
+                CACHES={'default': {'BACKEND': f'django.core.cache.backends.{backend}'}}
+            ):
+                self.assertEqual([e.id for e in check_shared_cache()], ['core.E001'])
+
+    def test_shared_caches_pass(self):
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://localhost:6379',
+        }}):
+            self.assertEqual(check_shared_cache(), [])
+
+    def test_registered_as_a_deployment_check(self):
+        self.assertIn(check_shared_cache, checks.registry.registry.get_checks(include_deployment_checks=True))
+        self.assertNotIn(check_shared_cache, checks.registry.registry.get_checks())
@@ -0,0 +1,86 @@
+import datetime
+import uuid
+
+from django.utils import timezone
+
+from core.models import AssessmentRequest
+from core.tests.base import APITestCase, make_child, make_user
+
+
+class AssessmentRequestTransitionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.parent = make_user('parent')
+        self.specialist = make_user('speech', role='SPECIALIST')
+        self.child = make_child(self.parent)
+        self.client.force_authenticate(self.specialist)
+
+    def make_request(self, child=None, **fields):
+        return AssessmentRequest.objects.create(
+            child=child or self.child, parent=self.parent, specialist=self.specialist, **fields
+        )
+
+    def post(self, path, data=None):
+        return self.client.post(f'/api/assessment-requests/{path}', data or {}, format='json')
+
+    def test_approve_schedules_the_child(self):
+        request = self.make_request(preferred_date=datetime.date(2026, 11, 3))
+        response = self.post(f'{request.pk}/approve/', {'admin_notes': 'See you then'})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['status'], 'approved')
+
+        request.refresh_from_db()
+        self.child.refresh_from_db()
+        self.assertEqual(request.status, 'APPROVED')
+        self.assertEqual(request.admin_notes, 'See you then')
+        self.assertEqual(self.child.assessment_status, 'scheduled')
+        self.assertEqual(
+            timezone.localtime(self.child.assessment_scheduled_date),
+            timezone.make_aware(datetime.datetime(2026, 11, 3, 9, 0)),
+        )
+
+    def test_reject_leaves_the_child_alone(self):
+        request = self.make_request()
+        self.assertEqual(self.post(f'{request.pk}/reject/').status_code, 200)
+        self.child.refresh_from_db()
+        self.assertEqual(self.child.assessment_status, 'none')
+
+    def test_finished_requests_cannot_move_again(self):
+        request = self.make_request(status='REJECTED')
+        self.client.force_authenticate(make_user('admin', role='ADMIN', is_staff=True))  # specialists see pending only
+        response = self.post(f'{request.pk}/approve/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['error'], 'Request is rejected; it cannot be approved.')
+
+    def test_a_scheduled_child_cannot_be_approved_twice(self):
+        first, second = self.make_request(), self.make_request()
+        self.assertEqual(self.post(f'{first.pk}/approve/').status_code, 200)
+        self.assertEqual(self.post(f'{second.pk}/approve/').status_code, 409)
+
+    def test_parents_cannot_transition(self):
+        request = self.make_request()
+        self.client.force_authenticate(self.parent)
+        self.assertEqual(self.post(f'{request.pk}/approve/').status_code, 403)
+
+    def test_bulk_approve_reports_what_it_skipped(self):
+        other_child = make_child(self.parent, first_name='Ben')
+        pending = self.make_request(other_child)
+        approvable = self.make_request()
+        rejected = self.make_request(status='REJECTED')
+        missing = uuid.uuid4()
+
+        self.client.force_authenticate(make_user('admin', role='ADMIN', is_staff=True))
+        etag = self.client.get('/api/children/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post('bulk-approve/', {'ids': [str(pending.pk), str(approvable.pk),
+                                                           str(rejected.pk), str(missing)]})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(set(response.data['approved']), {str(pending.pk), str(approvable.pk)})
+        self.assertEqual(set(response.data['errors']), {str(rejected.pk), str(missing)})
+
+        self.assertEqual(
+            set(AssessmentRequest.objects.filter(status='APPROVED').values_list('pk', flat=True)),
+            {pending.pk, approvable.pk},
+        )
+        # bulk_update sends no signals; the list ETag still follows the children it scheduled.
+        self.assertNotEqual(self.client.get('/api/children/')['ETag'], etag)
@@ -0,0 +1,173 @@
+"""
+Rate limiting backed by the shared cache.
+
+`SlidingWindow` approximates a true sliding log with two fixed-window
+counters: the previous window's count is weighted by how much of it still
+overlaps the sliding window. Each key costs two integers in the cache, no
+matter how many requests it sees, and the counters are shared by every
+worker that points at the same cache (Redis in production, see CACHES).
+A per-process cache would give every worker its own limit, so a deployment
+check (core.checks) refuses LocMemCache and DummyCache.
+
+An attempt counts itself first, with an atomic add/incr, and takes its
+count back (decr) if that put the key over the limit. Concurrent attempts
+therefore each see a distinct count and cannot all slip under the limit
+between a read and a write.
+
+The DRF throttles below are drop-in replacements for AnonRateThrottle,
+UserRateThrottle and ScopedRateThrottle built on it.
+"""
+import hashlib
+import math
+import re
+import time
+
+from django.core.cache import cache
+from rest_framework.throttling import (
+    AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+)
+
+
+RATE_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d*)\s*([smhd])', re.IGNORECASE)
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse '<requests>/<period>' into (requests, seconds).
+
+    Accepts DRF's forms ('100/hour', '5/min') and a multiplier ('5/15m').
+    """
+    if rate is None:
+        return None, None
+    match = RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f'Invalid rate: {rate!r}')
+    num, multiplier, unit = match.groups()
+    return int(num), int(multiplier or 1) * PERIODS[unit.lower()]
+
+
+class SlidingWindow:
+    """At most `limit` events per `window` seconds for each key."""
+
+    def __init__(self, name, limit, window):
+        self.name = name
+        self.limit = limit
+        self.window = window
+
+    def _keys(self, key, now):
+        digest = hashlib.sha1(str(key).encode()).hexdigest()
+        index = int(now // self.window)
+        base = f'ratelimit:{self.name}:{digest}'
+        return f'{base}:{index - 1}', f'{base}:{index}', now - index * self.window
+
+    def _state(self, key, now):
+        previous_key, current_key, elapsed = self._keys(key, now)
+        counts = cache.get_many([previous_key, current_key])
+        return counts.get(previous_key, 0), counts.get(current_key, 0), elapsed
+
+    def _retry_after(self, previous, current, elapsed):
+        """Seconds until the weighted count drops below the limit."""
+        window, limit = self.window, self.limit
+        if previous * (window - elapsed) / window + current < limit:
+            return 0
+        if current < limit:
+            wait = (window - elapsed) - (limit - current) * window / previous
+        else:
+            # Only the next window's decay of this window's count can help.
+            wait = (window - elapsed) + window * (1 - limit / current)
+        return max(1, math.ceil(wait))
+
+    def retry_after(self, key, now=None):
+        """0 if another event is allowed now, else seconds to wait."""
+        now = time.time() if now is None else now
+        return self._retry_after(*self._state(key, now))
+
+    def _incr(self, current_key):
+        # The counter must outlive the next window, which still reads it.
+        while not cache.add(current_key, 1, self.window * 2):
+            try:
+                return cache.incr(current_key)
+            except ValueError:
+                continue  # expired between add() and incr()
+        return 1
+
+    def add(self, key, now=None):
+        """Count one event unconditionally; return this window's count."""
+        now = time.time() if now is None else now
+        _, current_key, _ = self._keys(key, now)
+        return self._incr(current_key)
+
+    def attempt(self, key, now=None):
+        """Count an event if it is allowed; return 0 or seconds to wait."""
+        now = time.time() if now is None else now
+        previous_key, current_key, elapsed = self._keys(key, now)
+        current = self._incr(current_key)
+        previous = cache.get(previous_key, 0)
+        wait = self._retry_after(previous, current - 1, elapsed)
+        if wait:
+            try:
+                cache.decr(current_key)
+            except ValueError:
+                pass  # expired meanwhile; nothing left to take back
+        return wait
+
+    def reset(self, key, now=None):
+        now = time.time() if now is None else now
+        previous_key, current_key, _ = self._keys(key, now)
+        cache.delete_many([previous_key, current_key])
+
+
+# ==================== DRF THROTTLES ====================
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle with a shared SlidingWindow instead of a history list."""
+
+    def parse_rate(self, rate):
+        return parse_rate(rate)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        window = SlidingWindow(self.scope, self.num_requests, self.duration)
+        self._wait = window.attempt(self.key)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
+
+
+class AnonSlidingWindowThrottle(SlidingWindowRateThrottle, AnonRateThrottle):
+    pass
+
+
+class UserSlidingWindowThrottle(SlidingWindowRateThrottle, UserRateThrottle):
+    pass
+
+
+class ScopedSlidingWindowThrottle(SlidingWindowRateThrottle, ScopedRateThrottle):
+    """
+    Per-view scopes: set `throttle_scope = 'exports'` (or 'bulk', ...) on a
+    view and a matching entry in DEFAULT_THROTTLE_RATES.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+class AuthRateThrottle(SlidingWindowRateThrottle):
+    """Per-client limit on the unauthenticated auth endpoints."""
+    scope = 'auth'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
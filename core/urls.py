@@ -8,7 +8,14 @@ from core.views import (
     ServicesAndTherapiesViewSet, IEPViewSet, IEPGoalsViewSet,
     IEPPerformanceLevelsViewSet, AccommodationsViewSet,
     WeeklyProgressReportViewSet, ProgressReportAggregateViewSet,
-    AuditLogViewSet, AIGenerationLogViewSet, AssessmentRequestViewSet
+    AuditLogViewSet, AIGenerationLogViewSet, AssessmentRequestViewSet,
+    SpecialistAvailabilityViewSet, AvailabilityExceptionViewSet, JobViewSet,
+    fragment_cache_stats_view,
+    db_pool_stats_view,
+    event_ticket_view,
+)
+from core.async_views import (
+    me_view, specialist_directory_view, child_list_view, iep_detail_view, event_stream_view
 )
 
 router = DefaultRouter()
@@ -35,6 +42,8 @@ router.register(r'specialist-inputs', SpecialistInputViewSet, basename='speciali
 # Services and Therapies
 router.register(r'services', ServicesAndTherapiesViewSet, basename='service')
 router.register(r"specialists", SpecialistDirectoryViewSet, basename="specialist-directory")
+router.register(r'specialist-availability', SpecialistAvailabilityViewSet, basename='specialist-availability')
+router.register(r'availability-exceptions', AvailabilityExceptionViewSet, basename='availability-exception')
 
 # IEP management
 router.register(r'ieps', IEPViewSet, basename='iep')
@@ -50,6 +59,18 @@ router.register(r'progress-report-aggregates', ProgressReportAggregateViewSet, b
 router.register(r'audit-logs', AuditLogViewSet, basename='audit-log')
 router.register(r'ai-generation-logs', AIGenerationLogViewSet, basename='ai-generation-log')
 
+# Background jobs
+router.register(r'jobs', JobViewSet, basename='job')
+
 urlpatterns = [
+    path('fragment-cache/stats/', fragment_cache_stats_view, name='fragment-cache-stats'),
+    path('db-pool/stats/', db_pool_stats_view, name='db-pool-stats'),
+    path('events/', event_stream_view, name='event-stream'),
+    path('events/ticket/', event_ticket_view, name='event-ticket'),
+    # Async-native mirrors of the hottest reads (see core.async_views)
+    path('async/me/', me_view, name='async-me'),
+    path('async/specialists/', specialist_directory_view, name='async-specialist-directory'),
+    path('async/children/', child_list_view, name='async-child-list'),
+    path('async/ieps/<uuid:pk>/', iep_detail_view, name='async-iep-detail'),
     path('', include(router.urls)),
 ]
@@ -1,7 +1,9 @@
 from rest_framework import viewsets, permissions, filters, status
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db.models import Q
 from core.models import (
     User, Child, ChildrenEligibility, DevelopmentalHistory,
@@ -11,7 +13,8 @@ from core.models import (
     IEPGoals, IEPObjectives, PlannedActivitiesServices,
     Accommodations, WeeklyProgressReport, WeeklyServicesProvided,
     WeeklyGoalsProgress, WeeklyProgressSummary, ProgressReportAggregate,
-    AuditLog, AIGenerationLog, AssessmentRequest
+    AuditLog, AIGenerationLog, AssessmentRequest,
+    SpecialistAvailability, AvailabilityException, Job, ChildContextSnapshot
 )
 from core.serializers import (
     UserSerializer, UserCreateSerializer, ChildSerializer,
@@ -25,12 +28,30 @@ from core.serializers import (
     WeeklyProgressReportSerializer, WeeklyServicesProvidedSerializer,
     WeeklyGoalsProgressSerializer, WeeklyProgressSummarySerializer,
     ProgressReportAggregateSerializer, AuditLogSerializer,
-    AIGenerationLogSerializer, SpecialistListSerializer, AssessmentRequestSerializer
+    AIGenerationLogSerializer, SpecialistListSerializer, AssessmentRequestSerializer,
+    ChildListSerializer, AssessmentListSerializer, IEPListSerializer,
+    WeeklyProgressReportListSerializer, AssessmentRequestTransitionSerializer,
+    AssessmentRequestBulkTransitionSerializer, SpecialistAvailabilitySerializer,
+    AvailabilityExceptionSerializer, AssessmentBookingSerializer,
+    AvailabilityQuerySerializer, BookSlotSerializer, SpecialistRankingQuerySerializer,
+    WorkQueueQuerySerializer, WorkQueueItemSerializer, JobSerializer,
+    ProgressReportAggregateGenerateSerializer, AIGenerateSerializer, ChildContextSnapshotSerializer
 )
+from core.matching import child_concerns, rank_specialists
+from core.scheduling import SlotUnavailable, book_slot, open_slots
+from core.workflows import InvalidTransition, transition_request, transition_requests
+from core.worklist import queue_count, work_queue
+from core.cache import get_stats as fragment_cache_stats
+from core.dbpool import pool_stats
+from core.events import issue_ticket
+from core.jobs import cancel as cancel_job, enqueue
+from core.context import CONTEXT_VERSION, refresh_snapshots
+from core.generation import digest
+from core.mixins import ConditionalGetMixin, FragmentCacheMixin, SparseFieldsetMixin
 
 
 # ==================== USER VIEWSET ====================
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -60,7 +81,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(request.user)
         return Response(serializer.data)
     
-class SpecialistDirectoryViewSet(viewsets.ReadOnlyModelViewSet):
+class SpecialistDirectoryViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     Read-only directory of specialists for parent booking / selection.
     """
@@ -81,11 +102,85 @@ class SpecialistDirectoryViewSet(viewsets.ReadOnlyModelViewSet):
             qs = qs.filter(specialization__iexact=specialization)
         return qs
 
+    @action(detail=False, methods=["get"], serializer_class=SpecialistRankingQuerySerializer)
+    def ranked(self, request):
+        """Specialists ranked for a child (?child=) by concern match, workload and experience"""
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        # Only children the user can see in /api/children/: the breakdown names their concerns
+        children = ChildViewSet.visible_to(Child.objects.all(), request.user)
+        child = children.filter(pk=params.validated_data["child"]).first()
+        if child is None:
+            return Response({"error": "Child not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        specialists = self.filter_queryset(self.get_queryset())
+        ranked = rank_specialists(specialists, child_concerns(child))[:params.validated_data["limit"]]
+        context = self.get_serializer_context()
+        return Response([
+            {**SpecialistListSerializer(specialist, context=context).data, "score": score, "score_breakdown": breakdown}
+            for specialist, score, breakdown in ranked
+        ])
+
+    @action(detail=False, methods=["get"], url_path="me/queue", serializer_class=WorkQueueQuerySerializer)
+    def queue(self, request):
+        """The signed-in specialist's pending requests, scheduled assessments and overdue reports, most urgent first"""
+        if request.user.role != "SPECIALIST":
+            return Response({"error": "Only specialists have a work queue"}, status=status.HTTP_403_FORBIDDEN)
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        items = work_queue(request.user.pk, limit=params.validated_data["limit"])
+        return Response({
+            "count": queue_count(request.user.pk),
+            "results": WorkQueueItemSerializer(items, many=True).data,
+        })
+
+    @action(detail=False, methods=["get"], url_path="me/queue/count")
+    def queue_badge(self, request):
+        """Cached number of items in the signed-in specialist's work queue"""
+        if request.user.role != "SPECIALIST":
+            return Response({"error": "Only specialists have a work queue"}, status=status.HTTP_403_FORBIDDEN)
+        return Response({"count": queue_count(request.user.pk)})
+
+    @action(detail=True, methods=["get"], serializer_class=AvailabilityQuerySerializer)
+    def availability(self, request, pk=None):
+        """Next open assessment slots (?start=, ?days=, ?limit=)"""
+        specialist = self.get_object()
+        params = self.get_serializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        slots = open_slots(specialist.pk, **params.validated_data)
+        return Response({
+            "specialist": str(specialist.pk),
+            "slots": [{"starts_at": start, "ends_at": end} for start, end in slots],
+        })
+
+    @action(detail=True, methods=["post"], serializer_class=BookSlotSerializer)
+    def book(self, request, pk=None):
+        """Book an open slot for an assessment request; approves it if pending"""
+        specialist = self.get_object()
+        params = self.get_serializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        assessment_request = AssessmentRequest.objects.filter(
+            pk=params.validated_data["assessment_request"], specialist=specialist
+        ).first()
+        user = request.user
+        if assessment_request is None or not (
+            user.is_staff or user.pk in (assessment_request.parent_id, assessment_request.specialist_id)
+        ):
+            return Response({"error": "Assessment request not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            booking = book_slot(assessment_request.pk, params.validated_data["starts_at"])
+        except (SlotUnavailable, InvalidTransition) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response(AssessmentBookingSerializer(booking).data, status=status.HTTP_201_CREATED)
+
 
 # ==================== CHILD VIEWSET ====================
-class ChildViewSet(viewsets.ModelViewSet):
-    queryset = Child.objects.all()
+class ChildViewSet(ConditionalGetMixin, FragmentCacheMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Child.objects.select_related(
+        'parent', 'secondary_parent', 'developmental_history'
+    ).prefetch_related('eligibilities')
     serializer_class = ChildSerializer
+    list_serializer_class = ChildListSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['gender', 'grade_level', 'parent']
@@ -95,9 +190,11 @@ class ChildViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter children based on user role"""
-        queryset = Child.objects.all()
-        user = self.request.user
+        return self.visible_to(super().get_queryset(), self.request.user)
 
+    @classmethod
+    def visible_to(cls, queryset, user):
+        """The children in `queryset` that `user` may see"""
         if user.role == 'PARENT':
             queryset = queryset.filter(
                 Q(parent=user) | Q(secondary_parent=user)
@@ -152,6 +249,24 @@ class ChildViewSet(viewsets.ModelViewSet):
         serializer = ChildrenEligibilitySerializer(eligibilities, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def context(self, request, pk=None):
+        """The child's materialized context document (core.context); ETag follows its version"""
+        try:
+            snapshot = ChildContextSnapshot.objects.filter(
+                child=pk, context_version=CONTEXT_VERSION,
+                child__in=self.get_queryset().values('pk'),
+            ).first()
+        except ValidationError:
+            snapshot = None
+        if snapshot is None:
+            child = self.get_object()  # 404 unless visible
+            snapshot = refresh_snapshots([child.pk])[child.pk]
+        validators = (self._etag(snapshot.pk, snapshot.version, snapshot.digest), snapshot.built_at)
+        return self._conditional(
+            request, validators, lambda request: Response(ChildContextSnapshotSerializer(snapshot).data),
+        )
+
 
 # ==================== ASSESSMENT REQUEST VIEWSET ====================
 from rest_framework import permissions
@@ -169,14 +284,15 @@ class IsAdminOrSpecialist(permissions.BasePermission):
         )
 
 
-class AssessmentRequestViewSet(viewsets.ModelViewSet):
-    queryset = AssessmentRequest.objects.all()
+class AssessmentRequestViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = AssessmentRequest.objects.select_related('child', 'parent', 'specialist')
     serializer_class = AssessmentRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ["child", "specialist", "status"]
     ordering_fields = ["created_at"]
     ordering = ["-created_at"]
+    throttle_scope = None  # the bulk actions use the 'bulk' rate
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -190,23 +306,99 @@ class AssessmentRequestViewSet(viewsets.ModelViewSet):
         return qs
 
     # Specialist (and admin) can approve / reject
-    @action(detail=True, methods=["post"], permission_classes=[IsAdminOrSpecialist])
-    def approve(self, request, pk=None):
+    def _transition(self, request, target):
         obj = self.get_object()
-        obj.status = "APPROVED"
-        obj.save(update_fields=["status"])
-        return Response({"status": "approved"})
+        params = self.get_serializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            obj = transition_request(
+                obj.pk, target,
+                notes=params.validated_data["admin_notes"],
+                scheduled_date=params.validated_data["scheduled_date"],
+            )
+        except InvalidTransition as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({
+            "status": target.lower(),
+            "request": AssessmentRequestSerializer(obj, context=self.get_serializer_context()).data,
+        })
+
+    def _bulk_transition(self, request, target):
+        params = self.get_serializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        ids = params.validated_data["ids"]
+        visible = list(self.get_queryset().filter(pk__in=ids).values_list("pk", flat=True))
+        changed, errors = transition_requests(
+            visible, target, notes=params.validated_data["admin_notes"]
+        )
+        for pk in set(map(str, ids)) - set(map(str, visible)):
+            errors[pk] = "Not found."
+        return Response({
+            target.lower(): [str(obj.pk) for obj in changed],
+            "errors": errors,
+        })
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAdminOrSpecialist],
+            serializer_class=AssessmentRequestTransitionSerializer)
+    def approve(self, request, pk=None):
+        """Approve a pending request and schedule the child's assessment"""
+        return self._transition(request, "APPROVED")
 
-    @action(detail=True, methods=["post"], permission_classes=[IsAdminOrSpecialist])
+    @action(detail=True, methods=["post"], permission_classes=[IsAdminOrSpecialist],
+            serializer_class=AssessmentRequestTransitionSerializer)
     def reject(self, request, pk=None):
-        obj = self.get_object()
-        obj.status = "REJECTED"
-        obj.save(update_fields=["status"])
-        return Response({"status": "rejected"})
-    
+        """Reject a pending request"""
+        return self._transition(request, "REJECTED")
+
+    @action(detail=False, methods=["post"], url_path="bulk-approve", permission_classes=[IsAdminOrSpecialist],
+            serializer_class=AssessmentRequestBulkTransitionSerializer, throttle_scope="bulk")
+    def bulk_approve(self, request):
+        """Approve many pending requests in one transaction; invalid ones are reported, not fatal"""
+        return self._bulk_transition(request, "APPROVED")
+
+    @action(detail=False, methods=["post"], url_path="bulk-reject", permission_classes=[IsAdminOrSpecialist],
+            serializer_class=AssessmentRequestBulkTransitionSerializer, throttle_scope="bulk")
+    def bulk_reject(self, request):
+        """Reject many pending requests in one transaction; invalid ones are reported, not fatal"""
+        return self._bulk_transition(request, "REJECTED")
+
+
+# ==================== SPECIALIST AVAILABILITY VIEWSETS ====================
+class OwnSpecialistScheduleMixin:
+    """Specialists manage their own rows; staff manage everyone's."""
+    permission_classes = [IsAdminOrSpecialist]
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.request.user.is_staff:
+            return qs
+        return qs.filter(specialist=self.request.user)
+
+    def perform_create(self, serializer):
+        if self.request.user.is_staff and serializer.validated_data.get("specialist"):
+            serializer.save()
+        else:
+            serializer.save(specialist=self.request.user)
+
+
+class SpecialistAvailabilityViewSet(OwnSpecialistScheduleMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = SpecialistAvailability.objects.all()
+    serializer_class = SpecialistAvailabilitySerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ["specialist", "weekday", "is_active"]
+    ordering = ["weekday", "start_time"]
+
+
+class AvailabilityExceptionViewSet(OwnSpecialistScheduleMixin, ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = AvailabilityException.objects.all()
+    serializer_class = AvailabilityExceptionSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ["specialist", "date"]
+    ordering = ["date", "start_time"]
+
 
 # ==================== CHILD ELIGIBILITY VIEWSET ====================
-class ChildrenEligibilityViewSet(viewsets.ModelViewSet):
+class ChildrenEligibilityViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = ChildrenEligibility.objects.all()
     serializer_class = ChildrenEligibilitySerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -216,22 +408,26 @@ class ChildrenEligibilityViewSet(viewsets.ModelViewSet):
 
 
 # ==================== DEVELOPMENTAL HISTORY VIEWSET ====================
-class DevelopmentalHistoryViewSet(viewsets.ModelViewSet):
+class DevelopmentalHistoryViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = DevelopmentalHistory.objects.all()
     serializer_class = DevelopmentalHistorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
 # ==================== ASSESSMENT VIEWSET ====================
-class AssessmentViewSet(viewsets.ModelViewSet):
-    queryset = Assessment.objects.all()
+class AssessmentViewSet(ConditionalGetMixin, FragmentCacheMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Assessment.objects.select_related('completed_by').prefetch_related(
+        'skill_areas', 'disorder_screenings'
+    )
     serializer_class = AssessmentSerializer
+    list_serializer_class = AssessmentListSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['child', 'assessment_type', 'is_complete']
     search_fields = ['child__first_name', 'child__last_name']
     ordering_fields = ['assessment_date', 'created_at']
     ordering = ['-assessment_date']
+    statement_timeouts = {'list': 5000}  # ?search= is an unanchored match on child names
     
     @action(detail=True, methods=['post'])
     def mark_complete(self, request, pk=None):
@@ -243,7 +439,7 @@ class AssessmentViewSet(viewsets.ModelViewSet):
 
 
 # ==================== ASSESSMENT SKILL AREA VIEWSET ====================
-class AssessmentSkillAreaViewSet(viewsets.ModelViewSet):
+class AssessmentSkillAreaViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = AssessmentSkillArea.objects.all()
     serializer_class = AssessmentSkillAreaSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -252,7 +448,7 @@ class AssessmentSkillAreaViewSet(viewsets.ModelViewSet):
 
 
 # ==================== DISORDER SCREENING VIEWSET ====================
-class DisorderScreeningViewSet(viewsets.ModelViewSet):
+class DisorderScreeningViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = DisorderScreening.objects.all()
     serializer_class = DisorderScreeningSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -261,10 +457,11 @@ class DisorderScreeningViewSet(viewsets.ModelViewSet):
 
 
 # ==================== PARENT INPUT VIEWSET ====================
-class ParentInputViewSet(viewsets.ModelViewSet):
+class ParentInputViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for ParentInput with automatic Child creation and edit support
     """
+    queryset = ParentInput.objects.select_related('child', 'parent')
     serializer_class = ParentInputSerializer
     permission_classes = [permissions.IsAuthenticated]
     
@@ -277,7 +474,7 @@ class ParentInputViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by current user (parent) + auto-set intake_status"""
         user = self.request.user
-        queryset = ParentInput.objects.filter(parent=user)
+        queryset = super().get_queryset().filter(parent=user)
         
         # ✅ Auto-set intake_status based on completion
         for obj in queryset:
@@ -431,8 +628,8 @@ def perform_create(self, serializer):
 
 
 # ==================== TEACHER INPUT VIEWSET ====================
-class TeacherInputViewSet(viewsets.ModelViewSet):
-    queryset = TeacherInput.objects.all()
+class TeacherInputViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = TeacherInput.objects.select_related('child', 'teacher')
     serializer_class = TeacherInputSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -442,8 +639,8 @@ class TeacherInputViewSet(viewsets.ModelViewSet):
 
 
 # ==================== SPECIALIST INPUT VIEWSET ====================
-class SpecialistInputViewSet(viewsets.ModelViewSet):
-    queryset = SpecialistInput.objects.all()
+class SpecialistInputViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = SpecialistInput.objects.select_related('child', 'specialist')
     serializer_class = SpecialistInputSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -451,8 +648,8 @@ class SpecialistInputViewSet(viewsets.ModelViewSet):
 
 
 # ==================== SERVICES & THERAPIES VIEWSET ====================
-class ServicesAndTherapiesViewSet(viewsets.ModelViewSet):
-    queryset = ServicesAndTherapies.objects.all()
+class ServicesAndTherapiesViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = ServicesAndTherapies.objects.select_related('child', 'therapist')
     serializer_class = ServicesAndTherapiesSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -470,9 +667,15 @@ class ServicesAndTherapiesViewSet(viewsets.ModelViewSet):
 
 
 # ==================== IEP VIEWSET ====================
-class IEPViewSet(viewsets.ModelViewSet):
-    queryset = IEP.objects.all()
+class IEPViewSet(ConditionalGetMixin, FragmentCacheMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = IEP.objects.select_related('child', 'created_by').prefetch_related(
+        'goals__objective_details',
+        'goals__planned_activities__responsible_personnel',
+        'performance_levels',
+        'accommodations__responsible_person',
+    )
     serializer_class = IEPSerializer
+    list_serializer_class = IEPListSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['child', 'status', 'is_ai_generated']
@@ -506,8 +709,10 @@ class IEPViewSet(viewsets.ModelViewSet):
 
 
 # ==================== IEP GOALS VIEWSET ====================
-class IEPGoalsViewSet(viewsets.ModelViewSet):
-    queryset = IEPGoals.objects.all()
+class IEPGoalsViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = IEPGoals.objects.prefetch_related(
+        'objective_details', 'planned_activities__responsible_personnel'
+    )
     serializer_class = IEPGoalsSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
@@ -516,7 +721,7 @@ class IEPGoalsViewSet(viewsets.ModelViewSet):
 
 
 # ==================== IEP PERFORMANCE LEVELS VIEWSET ====================
-class IEPPerformanceLevelsViewSet(viewsets.ModelViewSet):
+class IEPPerformanceLevelsViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = IEPPerformanceLevels.objects.all()
     serializer_class = IEPPerformanceLevelsSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -525,8 +730,8 @@ class IEPPerformanceLevelsViewSet(viewsets.ModelViewSet):
 
 
 # ==================== ACCOMMODATIONS VIEWSET ====================
-class AccommodationsViewSet(viewsets.ModelViewSet):
-    queryset = Accommodations.objects.all()
+class AccommodationsViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = Accommodations.objects.select_related('responsible_person')
     serializer_class = AccommodationsSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
@@ -534,9 +739,12 @@ class AccommodationsViewSet(viewsets.ModelViewSet):
 
 
 # ==================== WEEKLY PROGRESS REPORT VIEWSET ====================
-class WeeklyProgressReportViewSet(viewsets.ModelViewSet):
-    queryset = WeeklyProgressReport.objects.all()
+class WeeklyProgressReportViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = WeeklyProgressReport.objects.select_related(
+        'child', 'submitted_by', 'summary'
+    ).prefetch_related('services_provided', 'goal_progress')
     serializer_class = WeeklyProgressReportSerializer
+    list_serializer_class = WeeklyProgressReportListSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['child', 'report_type', 'submitted_by']
@@ -561,19 +769,35 @@ class WeeklyProgressReportViewSet(viewsets.ModelViewSet):
 
 
 # ==================== PROGRESS REPORT AGGREGATE VIEWSET ====================
-class ProgressReportAggregateViewSet(viewsets.ModelViewSet):
-    queryset = ProgressReportAggregate.objects.all()
+class ProgressReportAggregateViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    queryset = ProgressReportAggregate.objects.select_related('child')
     serializer_class = ProgressReportAggregateSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['child', 'iep']
     ordering_fields = ['report_period_start_date', 'generated_at']
 
+    @action(detail=False, methods=['post'], serializer_class=ProgressReportAggregateGenerateSerializer)
+    def generate(self, request):
+        """Queue aggregate generation for an IEP and period; poll the returned job"""
+        params = self.get_serializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        iep = params.validated_data['iep']
+        start = params.validated_data['report_period_start_date'].isoformat()
+        end = params.validated_data['report_period_end_date'].isoformat()
+        job = enqueue(
+            'progress.aggregate', {'iep': str(iep.pk), 'start': start, 'end': end},
+            dedup_key=f'progress.aggregate:{iep.pk}:{start}:{end}', user=request.user,
+        )
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
 
 # ==================== AUDIT LOG VIEWSET ====================
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AuditLog.objects.all()
+class AuditLogViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = AuditLog.objects.select_related('user')
     serializer_class = AuditLogSerializer
+    last_modified_field = 'timestamp'  # audit rows are append-only
+    statement_timeout = 10000  # deep pages of a large table
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['user', 'action_type', 'table_name']
@@ -582,11 +806,92 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 # ==================== AI GENERATION LOG VIEWSET ====================
-class AIGenerationLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AIGenerationLog.objects.all()
+class AIGenerationLogViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = AIGenerationLog.objects.select_related('reviewer')
     serializer_class = AIGenerationLogSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
-    filterset_fields = ['generation_type', 'human_review_status']
-    ordering_fields = ['generated_at']
+    filterset_fields = ['generation_type', 'human_review_status', 'cache_hit', 'requested_by']
+    ordering_fields = ['generated_at', 'duration_ms']
     ordering = ['-generated_at']
+    statement_timeouts = {'list': 10000, 'retrieve': 10000}
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminOrSpecialist],
+            serializer_class=AIGenerateSerializer)
+    def generate(self, request):
+        """Queue a batch of generation requests; poll the returned job for the results"""
+        params = self.get_serializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        requests = [
+            {
+                'generation_type': item['generation_type'],
+                'child': str(item['child'].pk) if item.get('child') else None,
+                'instructions': item['instructions'],
+            }
+            for item in params.validated_data['requests']
+        ]
+        payload = {'requests': requests, 'user': str(request.user.pk)}
+        job = enqueue(
+            'ai.generate', payload, dedup_key=f'ai.generate:{digest(payload)}', user=request.user,
+        )
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+# ==================== JOB VIEWSET ====================
+class JobViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    """Status of background jobs; users see the jobs they queued, staff see all."""
+    read_from_primary = True  # workers update status; a lagging replica would hide it
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['task', 'status']
+    ordering_fields = ['created_at', 'run_at', 'priority']
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.request.user.is_staff:
+            return qs
+        return qs.filter(created_by=self.request.user)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a job that has not started yet"""
+        job = self.get_object()
+        if not cancel_job(job.pk):
+            return Response({'error': f'Job is {job.status.lower()}; only queued jobs can be cancelled.'},
+                            status=status.HTTP_409_CONFLICT)
+        job.refresh_from_db()
+        return Response(JobSerializer(job).data)
+
+
+# ==================== FRAGMENT CACHE STATS ====================
+FRAGMENT_CACHED_VIEWSETS = (ChildViewSet, AssessmentViewSet, IEPViewSet)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def fragment_cache_stats_view(request):
+    """Hit/miss counters for the serialized detail fragment cache"""
+    labels = [viewset.queryset.model._meta.label_lower for viewset in FRAGMENT_CACHED_VIEWSETS]
+    return Response(fragment_cache_stats(labels))
+
+
+# ==================== EVENT STREAM TICKETS ====================
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def event_ticket_view(request):
+    """Single-use ticket for opening /api/events/?ticket= with EventSource"""
+    return Response({
+        'ticket': issue_ticket(request.user),
+        'expires_in': settings.SSE_TICKET_SECONDS,
+    }, status=status.HTTP_201_CREATED)
+
+
+# ==================== DATABASE POOL STATS ====================
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def db_pool_stats_view(request):
+    """Connection pool size, usage and wait metrics of the worker process serving the request"""
+    return Response(pool_stats())
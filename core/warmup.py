@@ -0,0 +1,71 @@
+"""
+Process warm-up before forking server workers.
+
+With gunicorn's preload_app (see ara/gunicorn_conf.py) the master imports
+the project once and forks the workers from it. Whatever the master has
+built by then is shared copy-on-write by every worker, instead of being
+rebuilt in each worker by its first requests. warm_up() builds the lazy,
+process-wide state a request would otherwise build:
+
+- the URL resolvers: every pattern's compiled regex and the reverse
+  lookup tables for settings.LANGUAGE_CODE;
+- the translation catalogs of settings.LANGUAGE_CODE;
+- the field and relation caches of every model's _meta;
+- the browsable API template;
+- the modules Django imports on first use: the session serializer,
+  message storage and cache backends.
+
+It opens no database or cache connection, so nothing that must not cross
+a fork is created.
+"""
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.template import TemplateDoesNotExist, loader
+from django.urls import URLResolver, get_resolver
+from django.utils import translation
+from django.utils.module_loading import import_string
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.settings import api_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def _views(resolver):
+    """The view callbacks of every URL pattern under `resolver`."""
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _views(pattern)
+        else:
+            yield pattern.callback
+
+
+def warm_up():
+    """Build the URL resolvers, translations and model metadata, and import backends."""
+    started = time.perf_counter()
+    with translation.override(settings.LANGUAGE_CODE):
+        resolver = get_resolver()
+        resolver.reverse_dict  # populates every nested resolver, compiling its patterns
+        callbacks = list(_views(resolver))
+    translation.gettext('')  # the default catalog, used when no language is active
+
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+    if BrowsableAPIRenderer in api_settings.DEFAULT_RENDERER_CLASSES:
+        try:
+            loader.get_template(BrowsableAPIRenderer.template)
+        except TemplateDoesNotExist:
+            pass
+
+    for path in (settings.SESSION_SERIALIZER, settings.MESSAGE_STORAGE,
+                 *(options['BACKEND'] for options in caches.settings.values())):
+        import_string(path)  # the backends themselves connect per thread, after the fork
+
+    logger.info(
+        'Warmed up %d URL patterns in %.0f ms', len(callbacks), (time.perf_counter() - started) * 1000,
+    )
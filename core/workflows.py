@@ -0,0 +1,149 @@
+"""
+State transitions that move several rows together.
+
+Assessment requests: approving a PENDING request schedules its child
+(`assessment_status` and `assessment_scheduled_date`) in the same
+transaction; rejecting it leaves the child as is. Rows are locked with
+SELECT ... FOR UPDATE, requests before children and each in primary-key
+order, so concurrent single and bulk transitions cannot deadlock or
+interleave.
+"""
+from datetime import datetime, time
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.events import publish, status_event
+from core.matching import invalidate_loads
+from core.models import AssessmentRequest, Child
+from core.signals import bulk_written
+from core.worklist import invalidate_queue_counts
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+# Request status -> statuses it may move to
+REQUEST_TRANSITIONS = {
+    'PENDING': {'APPROVED', 'REJECTED'},
+}
+# Child assessment statuses an approval may schedule from
+SCHEDULABLE_CHILD_STATUSES = {'none', 'for_assessment'}
+DEFAULT_ASSESSMENT_TIME = time(9, 0)
+
+REQUEST_FIELDS = ['status', 'admin_notes', 'updated_at']
+CHILD_FIELDS = ['assessment_status', 'assessment_scheduled_date', 'updated_at']
+
+
+def default_schedule(assessment_request):
+    """The parent's preferred date and time, if they gave a date."""
+    if assessment_request.preferred_date is None:
+        return None
+    return timezone.make_aware(datetime.combine(
+        assessment_request.preferred_date,
+        assessment_request.preferred_time or DEFAULT_ASSESSMENT_TIME,
+    ))
+
+
+def _apply(assessment_request, child, target, notes, scheduled_date, now):
+    """Validate and apply one transition in memory."""
+    if target not in REQUEST_TRANSITIONS.get(assessment_request.status, ()):
+        raise InvalidTransition(
+            f'Request is {assessment_request.status.lower()}; it cannot be {target.lower()}.'
+        )
+    if target == 'APPROVED':
+        if child.assessment_status not in SCHEDULABLE_CHILD_STATUSES:
+            raise InvalidTransition(
+                f'The child\'s assessment is already {child.get_assessment_status_display().lower()}.'
+            )
+        child.assessment_status = 'scheduled'
+        child.assessment_scheduled_date = scheduled_date or default_schedule(assessment_request)
+        child.updated_at = now
+
+    assessment_request.status = target
+    if notes:
+        assessment_request.admin_notes = notes
+    assessment_request.updated_at = now
+
+
+def schedule(assessment_request, child, starts_at, now):
+    """Approve a pending request, or reschedule an approved one, in memory."""
+    if assessment_request.status == 'PENDING':
+        _apply(assessment_request, child, 'APPROVED', '', starts_at, now)
+        return
+    if assessment_request.status != 'APPROVED' or child.assessment_status == 'completed':
+        raise InvalidTransition(
+            f'Request is {assessment_request.status.lower()}; it cannot be scheduled.'
+        )
+    child.assessment_status = 'scheduled'
+    child.assessment_scheduled_date = starts_at
+    child.updated_at = now
+    assessment_request.updated_at = now
+
+
+def transition_request(pk, target, notes='', scheduled_date=None):
+    """Move one request (and its child) to `target`; raise InvalidTransition."""
+    with transaction.atomic():
+        assessment_request = AssessmentRequest.objects.select_for_update().get(pk=pk)
+        child = Child.objects.select_for_update().get(pk=assessment_request.child_id)
+        _apply(assessment_request, child, target, notes, scheduled_date, timezone.now())
+        assessment_request.save(update_fields=REQUEST_FIELDS)
+        if target == 'APPROVED':
+            child.save(update_fields=CHILD_FIELDS)
+    return assessment_request
+
+
+def transition_requests(pks, target, notes=''):
+    """
+    Move many requests to `target` in one transaction.
+
+    Invalid transitions are skipped, not fatal. Returns (changed requests,
+    {request id: error}); ids that do not exist are reported as errors too.
+    """
+    changed, errors = [], {}
+    with transaction.atomic():
+        requests = list(
+            AssessmentRequest.objects.select_for_update().filter(pk__in=pks).order_by('pk')
+        )
+        children = {
+            child.pk: child
+            for child in Child.objects.select_for_update().filter(
+                pk__in={r.child_id for r in requests}
+            ).order_by('pk')
+        }
+        now = timezone.now()
+        scheduled = {}
+        events = []
+        for assessment_request in requests:
+            child = children[assessment_request.child_id]
+            previous = assessment_request.status, child.assessment_status
+            try:
+                _apply(assessment_request, child, target, notes, None, now)
+            except InvalidTransition as exc:
+                errors[str(assessment_request.pk)] = str(exc)
+                continue
+            changed.append(assessment_request)
+            events.append(status_event(AssessmentRequest, assessment_request, previous[0]))
+            if target == 'APPROVED':
+                scheduled[child.pk] = child
+                if child.assessment_status != previous[1]:
+                    events.append(status_event(Child, child, previous[1]))
+
+        AssessmentRequest.objects.bulk_update(changed, REQUEST_FIELDS)
+        Child.objects.bulk_update(scheduled.values(), CHILD_FIELDS)
+        # bulk_update sends no signals, so publish, drop the cached counters and bump the
+        # fragment and list versions here.
+        for event, audience in events:
+            publish(event, audience)
+        specialist_ids = {r.specialist_id for r in changed}
+        transaction.on_commit(lambda: invalidate_loads(specialist_ids))
+        transaction.on_commit(lambda: invalidate_queue_counts(specialist_ids))
+        transaction.on_commit(lambda: bulk_written(AssessmentRequest, changed))
+        transaction.on_commit(lambda: bulk_written(Child, scheduled.values()))
+
+    found = {str(r.pk) for r in requests}
+    for pk in map(str, pks):
+        if pk not in found:
+            errors[pk] = 'Not found.'
+    return changed, errors
@@ -0,0 +1,135 @@
+"""
+A specialist's prioritized work queue.
+
+Three streams are merged, most urgent first, by due time:
+
+- request:    PENDING assessment requests assigned to the specialist, due
+              REQUEST_RESPONSE_DAYS after they were made
+- assessment: the specialist's approved requests whose child is scheduled,
+              due at the scheduled time
+- report:     enrolled children of the specialist whose last specialist
+              weekly report (or, failing that, assessment) is more than
+              REPORT_INTERVAL_DAYS old
+
+Each stream is one query, already ordered by due time where the database can
+do it (the (specialist, status, created_at) index on AssessmentRequest serves
+the first), so the merge is a heapq.merge over three sorted iterables.
+
+The item count behind the navigation badge is cached per specialist; request,
+child and weekly report saves drop it, and it expires after
+QUEUE_COUNT_TIMEOUT since reports become overdue with time alone.
+"""
+import heapq
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from core.models import AssessmentRequest, Child
+
+
+REQUEST_RESPONSE_DAYS = 2
+REPORT_INTERVAL_DAYS = 7
+QUEUE_COUNT_TIMEOUT = 300
+
+
+def _item(kind, due, now, child, **extra):
+    return {
+        'kind': kind,
+        'due': due,
+        'overdue': due < now,
+        'child': child.pk,
+        'child_name': f'{child.first_name} {child.last_name}',
+        **extra,
+    }
+
+
+def _requests(specialist_id, now):
+    rows = (
+        AssessmentRequest.objects.filter(specialist_id=specialist_id, status='PENDING')
+        .select_related('child').order_by('created_at')
+    )
+    for r in rows.iterator():
+        yield _item(
+            'request', r.created_at + timedelta(days=REQUEST_RESPONSE_DAYS), now, r.child,
+            id=r.pk, preferred_date=r.preferred_date,
+        )
+
+
+def _assessments(specialist_id, now):
+    rows = (
+        AssessmentRequest.objects.filter(
+            specialist_id=specialist_id, status='APPROVED',
+            child__assessment_status='scheduled', child__assessment_scheduled_date__isnull=False,
+        )
+        .select_related('child').order_by('child__assessment_scheduled_date')
+    )
+    for r in rows.iterator():
+        yield _item('assessment', r.child.assessment_scheduled_date, now, r.child, id=r.pk)
+
+
+def _reports(specialist_id, now):
+    tz = timezone.get_current_timezone()
+    children = Child.objects.filter(
+        enrollment_status='enrolled',
+        pk__in=AssessmentRequest.objects.filter(
+            specialist_id=specialist_id, status='APPROVED',
+        ).values('child_id'),
+    ).annotate(last_report=Max(
+        'weekly_progress_reports__week_end_date',
+        filter=Q(
+            weekly_progress_reports__report_type='SPECIALIST_INPUT',
+            weekly_progress_reports__submitted_by_id=specialist_id,
+        ),
+    )).order_by()
+
+    items = []
+    for child in children:
+        since = child.last_report
+        if since is None:
+            since = (child.assessment_scheduled_date or child.created_at).astimezone(tz).date()
+        due = datetime.combine(since + timedelta(days=REPORT_INTERVAL_DAYS), time.min, tzinfo=tz)
+        if due < now:
+            items.append(_item('report', due, now, child, id=child.pk, last_report=child.last_report))
+    items.sort(key=lambda item: item['due'])
+    return items
+
+
+def work_queue(specialist_id, limit=None):
+    """The specialist's queue items, most urgent first."""
+    now = timezone.now()
+    merged = heapq.merge(
+        _requests(specialist_id, now),
+        _assessments(specialist_id, now),
+        _reports(specialist_id, now),
+        key=lambda item: item['due'],
+    )
+    return list(islice(merged, limit))
+
+
+# ---- count badge ----
+def _count_key(specialist_id):
+    return f'specialist-queue-count:{specialist_id}'
+
+
+def queue_count(specialist_id):
+    key = _count_key(specialist_id)
+    count = cache.get(key)
+    if count is None:
+        now = timezone.now()
+        count = (
+            AssessmentRequest.objects.filter(specialist_id=specialist_id, status='PENDING').count()
+            + AssessmentRequest.objects.filter(
+                specialist_id=specialist_id, status='APPROVED',
+                child__assessment_status='scheduled', child__assessment_scheduled_date__isnull=False,
+            ).count()
+            + len(_reports(specialist_id, now))
+        )
+        cache.set(key, count, QUEUE_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate_queue_counts(specialist_ids):
+    cache.delete_many([_count_key(pk) for pk in set(specialist_ids) if pk is not None])